@@ -6,7 +6,7 @@
 USERNAMES = [
     "standard_user",
     # "problem_user",
-    # "performance_glitch_user",
+    "performance_glitch_user",
     # "locked_out_user",
     "visual_user",
     # "error_user",
@@ -20,6 +20,9 @@ POSTAL_CODE = '123456'
 # 排序选项
 SORT_OPTIONS = ["az", "za", "lohi", "hilo"]
 
+# 数据驱动测试矩阵文件 (CSV或JSONL)，每条数据包含用户、商品组合、结账信息和排序方式
+TEST_MATRIX_FILE = "data/test_matrix.jsonl"
+
 # ========== WebDriver配置 ==========
 EDGE_DRIVER_PATH = ''
 
@@ -32,18 +35,150 @@ BROWSER_OPTIONS = [
     "--window-size=1200,800" # 设置窗口大小
 ]
 
+# 异步WebDriver客户端配置 (一个事件循环驱动多个浏览器会话)
+ASYNC_WEBDRIVER_HOST = "127.0.0.1"
+ASYNC_WEBDRIVER_PORT = 9515
+ASYNC_MAX_SESSIONS = 5  # 同时存在的最大浏览器会话数
+ASYNC_POLL_INTERVAL = 0.1  # 异步查找元素的轮询间隔(秒)
+
+# 浏览器守护进程: 常驻的msedgedriver会话，多次pytest调用通过会话ID接管 (run_tests.py daemon start)
+BROWSER_DAEMON_HOST = "127.0.0.1"
+BROWSER_DAEMON_PORT = 9516
+BROWSER_DAEMON_STATE_FILE = "test_reports/browser_daemon.json"
+# 定位器审计: 在本地替身页面上基准测试页面类定位器，--apply时把更快的等价定位器写入覆盖文件
+LOCATOR_STANDIN_PAGE = "data/standin/saucedemo.html"
+LOCATOR_OVERRIDES_FILE = "data/locator_overrides.json"
+LOCATOR_AUDIT_REPORT = "test_reports/locator_audit.json"
+LOCATOR_AUDIT_ITERATIONS = 2000
+# 候选定位器至少快这么多倍才会被建议/注册
+LOCATOR_AUDIT_MIN_SPEEDUP = 1.2
+
 # ========== 等待时间配置 ==========
 DEFAULT_WAIT_TIME = 0.4
 IMPLICIT_WAIT_TIME = 0.4
+# 严格显式等待模式: 关闭隐式等待，所有元素查找只经过等待引擎的显式等待
+STRICT_EXPLICIT_WAIT = True
+WAIT_POLL_INTERVAL = 0.05  # 等待引擎轮询间隔(秒)
 PAGE_LOAD_TIMEOUT = 30
+PAGE_TRANSITION_TIMEOUT = 10  # 等待页面跳转/登录/排序完成的最长时间(秒)
+
+# ========== 延迟预算配置 ==========
+# 用户可感知操作的耗时上限(秒)，用于发现被测应用的性能退化
+# 开启强制检查时，用例期间 (含登录) 有操作超出预算则该用例判定为失败；关闭时只记录和汇总
+ENFORCE_LATENCY_BUDGETS = True
+LATENCY_BUDGETS = {
+    "login": 3.0,  # 点击登录到商品列表出现
+    "page_transition": 2.0,  # 点击后到目标页面就绪
+    "sort": 1.0,  # 选择排序方式到列表重新渲染
+}
+# 按用户覆盖的延迟预算 (performance_glitch_user会人为延迟页面响应)
+USER_LATENCY_BUDGETS = {
+    "performance_glitch_user": {
+        "login": 8.0,
+        "page_transition": 8.0,
+        "sort": 3.0,
+    },
+}
+# 每次页面导航/跳转后采集浏览器端的Navigation Timing和Resource Timing，按页面和用户汇总到报告
+NAVIGATION_TIMING = True
+
+# 自适应超时: 根据历史运行中各定位器/操作耗时的p99动态设置等待时间
+ADAPTIVE_TIMEOUTS = True
+LATENCY_STATS_FILE = "test_reports/latency_stats.json"
+ADAPTIVE_TIMEOUT_MULTIPLIER = 3.0  # 超时 = p99 × 安全倍数
+ADAPTIVE_TIMEOUT_MIN = DEFAULT_WAIT_TIME  # 自适应超时下限(秒)，不低于默认等待时间
+ADAPTIVE_TIMEOUT_MAX = 10  # 元素等待自适应超时上限(秒)，页面加载上限为PAGE_LOAD_TIMEOUT
+ADAPTIVE_MIN_SAMPLES = 20  # 样本数达到后才启用自适应超时，否则使用默认值
 
 # ========== 测试报告配置 ==========
 REPORTS_DIR = "test_reports"
 LOGS_DIR = "logs"
+# 并行执行时各worker的部分结果文件目录
+PARTIAL_RESULTS_DIR = "test_reports/partials"
+# 失败现场 (截图、页面源码、控制台日志、操作时间线) 保存目录
+ARTIFACTS_DIR = "test_reports/artifacts"
+# 失败现场编码压缩的后台线程数
+ARTIFACT_WORKERS = 2
+# 操作时间线保留的最近操作条数
+ACTION_TIMELINE_SIZE = 200
+# 结果日志目录: 运行中每条结果实时追加到JSONL日志，结束时另存完整JSON，可离线重新生成报告
+RESULTS_STORE_DIR = "test_reports/results"
+# 运行历史数据库 (SQLite)，每次运行结束后记录所有测试结果
+RUN_HISTORY_DB = "test_reports/run_history.db"
+RECORD_RUN_HISTORY = True
+# 会话结束时并发导出的报告格式: excel / html / junit / csv / parquet (parquet需要pyarrow)
+# 也可通过pytest选项 --report-formats=junit,csv 指定
+REPORT_FORMATS = ["excel", "junit", "csv"]
+# 依赖追踪生成的 测试用例 -> 页面对象方法 映射文件
+DEPENDENCY_MAP_FILE = "test_reports/dependency_map.json"
+# 结构化二进制操作追踪 (每个页面操作的定位器、耗时、结果)，可导出为火焰图/时间线
+TRACE_ENABLED = True
+TRACE_DIR = "test_reports/traces"
+# WebDriver录制回放文件目录 (python run_tests.py record / replay)
+CASSETTE_DIR = "test_reports/cassettes"
 
 # ========== URL配置 ==========
 BASE_URL = "https://www.saucedemo.com/"
 
 # ========== 测试执行配置 ==========
 # 是否在用户间切换时重启浏览器 (True: 重启浏览器, False: 只登出登入)
-RESTART_BROWSER_BETWEEN_USERS = False
\ No newline at end of file
+RESTART_BROWSER_BETWEEN_USERS = False
+# 是否每个用户在同一浏览器中使用独立的浏览器上下文 (独立cookie/存储)，切换用户时只切换窗口而不登出/登录
+# 也可通过pytest选项 --user-contexts 或 python run_tests.py contexts 开启
+USER_BROWSER_CONTEXTS = False
+# 用例看门狗: 每个用例 (含setup/teardown) 的墙钟时间预算(秒)，超时时终止卡住的浏览器，重建后继续运行
+TEST_WATCHDOG = True
+TEST_TIME_BUDGET = 180
+# 按测试函数名覆盖预算，例如 {"test_14_complete_checkout_flow": 300}
+TEST_TIME_BUDGETS = {}
+WATCHDOG_POLL_INTERVAL = 1.0
+# 流水线会话准备: 第二个浏览器在当前用例执行时为下一个用例登录，用例边界处交换 (也可通过 --pipeline 或 python run_tests.py pipeline 开启)
+PIPELINED_SETUP = False
+# 用例边界等待备用浏览器准备完成的最长时间(秒)
+PIPELINE_PREPARE_TIMEOUT = 60
+
+# ========== 并行执行配置 ==========
+# 并行模式默认启动的worker进程数 (每个worker独立一个浏览器)
+PARALLEL_WORKERS = 2
+# 主进程通过环境变量告知worker进程其编号和独立日志文件路径
+WORKER_ID_ENV = "SAUCEDEMO_WORKER_ID"
+WORKER_LOG_FILE_ENV = "SAUCEDEMO_WORKER_LOG_FILE"
+
+# ========== 负载生成配置 ==========
+# 负载模式复用异步页面对象，把用户旅程作为虚拟用户并发运行 (python run_tests.py load)
+# 默认指向本地部署的SauceDemo (sample-app-web，npm start默认端口3000)，不压测公共站点
+LOAD_TARGET_URL = "http://localhost:3000/"
+# 这些主机是公共站点，只有显式传入 --allow-public (或allow_public=True) 时才允许作为压测目标
+LOAD_PUBLIC_HOSTS = ("saucedemo.com", "www.saucedemo.com")
+LOAD_VIRTUAL_USERS = 4
+LOAD_RAMP_UP = 10  # 所有虚拟用户在该时间(秒)内均匀启动
+LOAD_DURATION = 60  # 压测持续时间(秒)，从第一个虚拟用户启动开始计算
+LOAD_THINK_TIME = 0.5  # 每轮旅程之间的思考时间(秒)
+LOAD_REPORT_DIR = "test_reports/load"
+
+# ========== 资源监控配置 ==========
+# 每个测试用例结束后采样浏览器/驱动进程内存、CPU和JS堆大小 (进程指标需要安装psutil)
+RESOURCE_MONITORING = True
+# 超过任一阈值时在下一个测试前重启浏览器会话 (0表示不启用该条件)
+RECYCLE_BROWSER_RSS_MB = 1500
+RECYCLE_JS_HEAP_MB = 300
+RECYCLE_AFTER_TESTS = 0
+
+# ========== 视觉对比配置 ==========
+# 每个测试用例通过后截图并与基准用户的同一页面对比 (需要安装numpy和Pillow，未安装时跳过)
+VISUAL_CHECKS = True
+# 出现视觉回归时判定测试失败 (默认只记录警告和差异图，基准稳定后再开启)
+ENFORCE_VISUAL_CHECKS = False
+# 基准图由该用户首次运行时生成
+VISUAL_BASELINE_USER = "standard_user"
+# 基准图和区块哈希缓存在运行时生成，与报告一样放在输出目录中，不纳入版本库
+VISUAL_BASELINE_DIR = "test_reports/visual_baselines"
+VISUAL_DIFF_DIR = "test_reports/visual"
+# 感知哈希区块大小(像素，须为8的倍数)，哈希不变的区块跳过逐像素对比
+VISUAL_TILE_SIZE = 64
+# 像素任一通道差值超过该值才算差异像素
+VISUAL_PIXEL_TOLERANCE = 16
+# 差异像素占整图比例超过该值判定为视觉回归
+VISUAL_MAX_DIFF_RATIO = 0.001
+# 忽略区域 (容差掩码): {"页面键或*": [(x, y, 宽, 高), ...]}，"*"对所有页面生效
+VISUAL_IGNORE_REGIONS = {}
\ No newline at end of file
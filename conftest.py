@@ -14,59 +14,192 @@ if project_root not in sys.path:
 
 from core.webdriver_utils import WebDriverManager
 from reports.test_reporter import test_reporter, TestResult
-from core.logger_config import logger
+from core.logger_config import logger, set_log_test_id
 from core.exceptions import TestException
-from config import USERNAMES, PASSWORD
+from core.action_timeline import action_timeline
+from core.artifacts import failure_artifacts
+from core.trace import trace_writer
+from core.browser_contexts import browser_contexts
+from core.cassette import cassette_recorder
+from core.watchdog import test_watchdog
+from core.session_context import session_contexts
+from core.navigation_timing import navigation_timing
+from core.latency_budget import latency_monitor
+from config import (USERNAMES, PASSWORD, RESOURCE_MONITORING, TEST_MATRIX_FILE, RECORD_RUN_HISTORY, RESULTS_STORE_DIR,
+                    TRACE_ENABLED, TRACE_DIR, USER_BROWSER_CONTEXTS, VISUAL_CHECKS, ENFORCE_VISUAL_CHECKS,
+                    TEST_WATCHDOG, PIPELINED_SETUP, REPORT_FORMATS)
 
-# 全局变量存储当前测试会话信息
-current_session = {
-    'driver': None,
-    'current_user': None,
-    'user_index': 0,
-    'pages': {}
-}
+
+def pytest_addoption(parser):
+    """注册命令行选项"""
+    group = parser.getgroup("saucedemo")
+    group.addoption("--worker-id", action="store", default=None,
+                    help="并行模式下的worker编号 (由run_tests.py parallel自动传入)")
+    group.addoption("--partial-result", action="store", default=None,
+                    help="将本进程的测试结果保存为JSON部分结果文件，而不是生成Excel报告")
+    group.addoption("--trace-deps", action="store", default=None,
+                    help="追踪每个测试用例调用的页面对象/核心函数，并保存依赖映射到指定文件")
+    group.addoption("--attach-browser", action="store_true", default=False,
+                    help="接管浏览器守护进程中的会话 (run_tests.py daemon start)，而不是启动新浏览器")
+    group.addoption("--user-contexts", action="store_true", default=False,
+                    help="每个用户在同一浏览器中使用独立的浏览器上下文 (独立cookie)，切换用户时只切换窗口")
+    group.addoption("--record-cassette", action="store", default=None,
+                    help="把本次运行的WebDriver请求/响应录制到指定cassette文件")
+    group.addoption("--replay-cassette", action="store", default=None,
+                    help="不启动浏览器，按指定cassette文件回放WebDriver响应 (验证页面对象改动)")
+    group.addoption("--report-formats", action="store", default=None,
+                    help="会话结束时导出的报告格式，逗号分隔 (excel,html,junit,csv,parquet)，默认取配置REPORT_FORMATS")
+    group.addoption("--pipeline", action="store_true", default=False,
+                    help="流水线模式: 备用浏览器在当前用例执行时为下一个用例登录，用例边界处交换浏览器")
+
+def pytest_configure(config):
+    """根据命令行选项初始化可选组件"""
+    # 非worker进程实时记录结果日志 (只收集用例时不记录)
+    if not config.getoption("--partial-result") and not config.getoption("--collect-only"):
+        test_reporter.start_journal(os.path.join(RESULTS_STORE_DIR, f"journal_{test_reporter.run_id}.jsonl"))
+    if config.getoption("--record-cassette") and not config.getoption("--collect-only"):
+        cassette_recorder.start(config.getoption("--record-cassette"))
+    if config.getoption("--replay-cassette"):
+        from core.cassette import CassettePlayer
+        config._cassette_player = CassettePlayer(config.getoption("--replay-cassette"))
+    if config.getoption("--trace-deps"):
+        from core.test_selector import DependencyTracer
+        config._dependency_tracer = DependencyTracer()
+
+def _uses_browser(item):
+    """用例是否在浏览器中执行 (使用user_session)，只有这类用例计入测试结果和报告"""
+    return "user_session" in item.fixturenames
+
+def pytest_collection_finish(session):
+    """收集完成后，有浏览器用例要执行时才开启二进制操作追踪 (并行worker各写一个文件)"""
+    if (TRACE_ENABLED and not session.config.getoption("--collect-only")
+            and any(_uses_browser(item) for item in session.items)):
+        from core.logger_config import log_context
+        trace_writer.start(os.path.join(TRACE_DIR, f"trace_{test_reporter.run_id}_{log_context.worker_id}.bin"))
+
+def pytest_generate_tests(metafunc):
+    """使用matrix_case的测试按测试矩阵文件参数化 (参数只是数据序号，执行时才读取数据)"""
+    if "matrix_case" in metafunc.fixturenames:
+        from core.test_matrix import TestMatrix
+        matrix = TestMatrix(os.path.join(project_root, TEST_MATRIX_FILE))
+        metafunc.config._test_matrix = matrix
+        metafunc.parametrize("matrix_case", range(len(matrix)), indirect=True, ids=matrix.ids())
+
+@pytest.fixture
+def matrix_case(request):
+    """测试矩阵数据fixture - 按序号从文件中读取当前用例的数据"""
+    return request.config._test_matrix.load(request.param)
 
 @pytest.fixture(scope="session")
-def session_driver():
-    """会话级WebDriver fixture - 整个测试会话只创建一次"""
+def session_driver(request):
+    """会话级WebDriver fixture - 整个测试会话只创建一次，--attach-browser时接管守护进程中的浏览器"""
     driver = None
+    session = session_contexts.current()
     try:
-        driver = WebDriverManager.create_driver()
-        current_session['driver'] = driver
+        player = getattr(request.config, "_cassette_player", None)
+        if player:
+            driver = player.new_driver()
+            logger.info("使用WebDriver录制回放驱动，不启动浏览器")
+        elif request.config.getoption("--attach-browser"):
+            from core.browser_daemon import browser_daemon
+            driver = browser_daemon.attach()
+            if driver is None:
+                logger.warning("没有可接管的浏览器守护进程会话，启动新浏览器")
+        attached = driver is not None and not player
+        if driver is None:
+            driver = WebDriverManager.create_driver()
+        session.bind_driver(cassette_recorder.attach(driver), attached)
         logger.info("会话级WebDriver创建成功")
+        
+        if request.config.getoption("--user-contexts") or USER_BROWSER_CONTEXTS:
+            session.user_contexts = browser_contexts.supported(driver)
+            if not session.user_contexts:
+                logger.warning("当前WebDriver不支持独立浏览器上下文，改为在同一窗口中登出/登录切换用户")
+        
+        if request.config.getoption("--pipeline") or PIPELINED_SETUP:
+            # 录制/回放要求命令顺序确定，接管的守护进程和多上下文模式只有一个浏览器，均不使用流水线
+            if player or cassette_recorder.active or session.attached or session.user_contexts:
+                logger.warning("录制/回放、接管守护进程浏览器或多上下文模式下不使用流水线会话准备")
+            else:
+                session.pipeline.start(WebDriverManager.create_driver)
         yield driver
     except Exception as e:
         logger.error(f"会话级WebDriver初始化失败: {str(e)}")
         pytest.fail(f"会话级WebDriver初始化失败: {str(e)}")
     finally:
-        if driver:
-            WebDriverManager.close_driver(driver)
-            current_session['driver'] = None
+        session.pipeline.close()
+        # 会话期间浏览器可能被回收重建，关闭当前实例 (接管的守护进程浏览器保留给下次运行)
+        if session.driver and not session.attached:
+            WebDriverManager.close_driver(session.driver)
             logger.info("会话级WebDriver已关闭")
+        session.driver = None
+
+def _recycle_session_driver(reason, config=None):
+    """回收浏览器会话：关闭当前浏览器并创建新实例，下个测试会重新登录"""
+    logger.warning(f"回收浏览器会话: {reason}")
+    session = session_contexts.current()
+    player = getattr(config, "_cassette_player", None)
+    # 守护进程浏览器由daemon命令管理，这里只脱离接管 (绑定新浏览器时清除接管标记)，改用新启动的浏览器
+    if not session.attached:
+        WebDriverManager.close_driver(session.driver)
+    # 回放时按录制顺序创建下一个回放会话
+    driver = player.new_driver() if player else WebDriverManager.create_driver()
+    session.bind_driver(cassette_recorder.attach(driver))
+    if session.user_contexts:
+        # 新浏览器原生支持DevTools命令，上下文随旧浏览器一起失效，绑定后按需重新创建
+        session.user_contexts = browser_contexts.supported(session.driver)
+        browser_contexts.bind(session.driver)
+    session.resources.mark_recycled()
+    logger.info("浏览器会话已重建")
+    return session.driver
 
 @pytest.fixture(scope="function")
-def user_session(session_driver):
+def user_session(session_driver, request):
     """用户会话fixture - 管理用户登录状态"""
     from pages.page_objects import LoginPage, InventoryPage
     
-    driver = session_driver
+    session = session_contexts.current()
+    driver = session.driver
     
-    # 计算当前应该使用的用户
-    user_index = current_session['user_index']
-    current_user = USERNAMES[user_index % len(USERNAMES)]
+    # 看门狗终止了卡住的浏览器，或资源超过阈值时，先回收浏览器会话 (随后重新登录当前用户)
+    recycle_reason = test_watchdog.take_recycle_reason(session) or session.resources.should_recycle()
+    if recycle_reason:
+        try:
+            driver = _recycle_session_driver(recycle_reason, request.config)
+        except Exception as e:
+            logger.error(f"回收浏览器会话失败: {str(e)}")
+            pytest.fail(f"回收浏览器会话失败: {str(e)}")
+    
+    # 计算当前应该使用的用户 (数据驱动用例使用测试矩阵中指定的用户)
+    user_index = session.user_index
+    if "matrix_case" in request.fixturenames:
+        current_user = request.getfixturevalue("matrix_case").username
+    else:
+        current_user = USERNAMES[user_index % len(USERNAMES)]
+    
+    # 流水线模式: 备用浏览器已为当前用户准备好时直接交换
+    if session.current_user != current_user and session.pipeline.active:
+        driver = _swap_pipelined_driver(driver, current_user)
     
     # 检查是否需要切换用户
-    if current_session['current_user'] != current_user:
+    if session.current_user != current_user and session.user_contexts:
+        try:
+            _switch_user_context(driver, current_user)
+            session.current_user = current_user
+        except Exception as e:
+            logger.error(f"切换用户浏览器上下文失败: {str(e)}")
+            pytest.fail(f"切换用户浏览器上下文失败: {str(e)}")
+    elif session.current_user != current_user:
         try:
             # 🔥 如果有当前用户，先重置应用状态再登出
-            if current_session['current_user'] is not None:
+            if session.current_user is not None:
                 try:
                     inventory_page = InventoryPage(driver)
                     
                     # 登出
                     inventory_page.logout()
-                    logger.info(f"用户 {current_session['current_user']} 应用状态已重置")
-                    logger.info(f"用户 {current_session['current_user']} 已登出")
+                    logger.info(f"用户 {session.current_user} 应用状态已重置")
+                    logger.info(f"用户 {session.current_user} 已登出")
                     
                 except Exception as e:
                     logger.warning(f"重置状态或登出失败: {str(e)}")
@@ -85,13 +218,19 @@ def user_session(session_driver):
             if not login_page.is_login_success():
                 raise TestException(f"用户 {current_user} 登录失败")
             
-            current_session['current_user'] = current_user
+            session.current_user = current_user
             logger.info(f"用户 {current_user} 登录成功")
             
         except Exception as e:
             logger.error(f"用户切换失败: {str(e)}")
             pytest.fail(f"用户切换失败: {str(e)}")
     
+    # 当前用例执行期间，备用浏览器在后台为下一个用例的用户登录
+    if session.pipeline.active:
+        next_user = _planned_user(request.node, session.next_item, user_index)
+        if next_user != current_user:
+            session.pipeline.prepare(next_user)
+    
     # 返回当前用户信息和driver
     yield {
         'driver': driver,
@@ -99,28 +238,111 @@ def user_session(session_driver):
         'user_index': user_index
     }
 
+def _swap_pipelined_driver(driver, username):
+    """流水线模式: 换上已登录username的备用浏览器，备用浏览器未准备好时返回原浏览器"""
+    session = session_contexts.current()
+    prepared = session.pipeline.swap(username, driver, session.current_user)
+    if prepared is None:
+        return driver
+    session.driver = prepared
+    session.current_user = username
+    latency_monitor.current_user = username
+    return prepared
+
+def _planned_user(item, nextitem, user_index):
+    """推算下一个用例将使用的用户 (与user_session的用户分配规则一致)，下一个用例不登录时返回None"""
+    if nextitem is None or "user_session" not in nextitem.fixturenames:
+        return None
+    if "matrix_case" in nextitem.fixturenames:
+        return nextitem.config._test_matrix.load(nextitem.callspec.params["matrix_case"]).username
+    # 新的测试功能从第一个用户开始
+    same_function = nextitem.name.split('[')[0] == item.name.split('[')[0]
+    return USERNAMES[(user_index + 1 if same_function else 0) % len(USERNAMES)]
+
+def _switch_user_context(driver, username):
+    """多上下文模式: 切换到用户自己的浏览器上下文，首次使用或登录已失效时在该上下文中登录"""
+    from pages.page_objects import LoginPage
+    from config import BASE_URL
+    
+    browser_contexts.bind(driver)
+    user_context = browser_contexts.switch_to(username)
+    if user_context.logged_in and "inventory" not in driver.current_url:
+        driver.get(BASE_URL + "inventory.html")
+    
+    # 首次使用该上下文，或登录已失效 (访问商品页被重定向回登录页)
+    if not user_context.logged_in or "inventory" not in driver.current_url:
+        driver.get(BASE_URL)
+        login_page = LoginPage(driver)
+        login_page.login(username, PASSWORD)
+        if not login_page.is_login_success():
+            raise TestException(f"用户 {username} 登录失败")
+        user_context.logged_in = True
+        logger.info(f"用户 {username} 在独立浏览器上下文中登录成功")
+    else:
+        logger.info(f"已切换到用户 {username} 的浏览器上下文")
+
 def pytest_runtest_setup(item):
     """测试用例设置钩子"""
+    if not _uses_browser(item):
+        return
+    # 操作时间线只保留当前测试用例的操作
+    action_timeline.clear()
+    
     # 在每个测试功能的第一个用户测试前重置用户索引
     test_name = item.name.split('[')[0]  # 去除参数化部分
     
     # 如果是新的测试功能，重置用户索引
-    if not hasattr(pytest_runtest_setup, 'last_test_name') or pytest_runtest_setup.last_test_name != test_name:
-        current_session['user_index'] = 0
-        pytest_runtest_setup.last_test_name = test_name
+    if session_contexts.current().begin_test(test_name):
         logger.info(f"开始新测试功能: {test_name}")
 
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """为用例执行期间的日志标记用例ID；依赖追踪模式下记录测试用例 (含fixture) 执行期间调用的函数"""
+    tracer = getattr(item.config, "_dependency_tracer", None)
+    if tracer:
+        tracer.start(item.nodeid)
+    # 看门狗在后台线程中取驱动，按本线程的上下文分别监视
+    session = session_contexts.current()
+    session.next_item = nextitem
+    session.latency_mark = latency_monitor.mark()
+    # 用例执行期间 (含setup/teardown) 的日志都带上用例ID
+    set_log_test_id(item.nodeid)
+    if TEST_WATCHDOG:
+        test_watchdog.arm(session, item.nodeid, item.name.split('[')[0])
+    try:
+        yield
+    finally:
+        test_watchdog.disarm(session)
+        set_log_test_id(None)
+        if tracer:
+            tracer.stop()
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     """收集测试结果的钩子函数"""
     outcome = yield
     rep = outcome.get_result()
     
-    if rep.when == "call":
+    # 不需要浏览器的单元测试不计入测试结果
+    if rep.when == "call" and _uses_browser(item):
+        session = session_contexts.current()
         test_name = item.name.split('[')[0] if '[' in item.name else item.name
         
         # 获取当前用户名
-        username = current_session.get('current_user', '')
+        username = (session.current_user or '')
+        
+        # 通过的用例截图与基准用户的同一页面做视觉对比 (数据驱动用例各用例数据不同，不做对比)
+        if rep.passed and VISUAL_CHECKS and session.driver and "matrix_case" not in item.fixturenames:
+            _check_visual(rep, test_name, username)
+        
+        # 用例期间 (含登录) 有操作超出延迟预算时判定为失败
+        if rep.passed and latency_monitor.enforce:
+            _check_latency(rep, session.latency_mark)
+        
+        # 看门狗超时的用例在失败信息中注明原因
+        watchdog_event = test_watchdog.event_for(item.nodeid)
+        if watchdog_event and rep.failed:
+            rep.longrepr = f"看门狗: {watchdog_event.describe()}\n{rep.longrepr}"
         
         status = "PASSED" if rep.passed else "FAILED"
         execution_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -145,44 +367,151 @@ def pytest_runtest_makereport(item, call):
             status=status,
             execution_time=execution_time,
             error_message=error_message,
-            description=description
+            description=description,
+            duration=rep.duration,
+            node_id=item.nodeid
         )
         
         test_reporter.add_test_result(test_result)
         
+        # 失败时采集现场，编码和写盘在后台线程完成，完成后把文件路径追加到结果日志
+        if rep.failed and session.driver:
+            try:
+                future = failure_artifacts.capture(session.driver, test_result)
+                future.add_done_callback(lambda _: test_reporter.update_artifacts(test_result))
+            except Exception as e:
+                logger.warning(f"采集失败现场失败: {str(e)}")
+        
+        # 用例期间 (含登录) 采集的浏览器端页面计时
+        for timing in navigation_timing.drain(test_name, username):
+            test_reporter.add_navigation_timing(timing)
+        
         # 🔥 每个测试用例完成后，执行应用状态重置
+        # (流水线模式下下一个用例换用备用浏览器时，本浏览器转为备用后在后台登出并重置，不占用关键路径)
+        swapping_out = (session.pipeline.active and
+                        _planned_user(item, session.next_item, session.user_index) != username)
         try:
-            if current_session.get('driver') and current_session.get('current_user'):
+            if session.driver and session.current_user and not swapping_out:
                 from pages.page_objects import InventoryPage
-                inventory_page = InventoryPage(current_session['driver'])
+                inventory_page = InventoryPage(session.driver)
                 inventory_page.reset_app_state()
                 logger.info(f"测试用例 {test_name} 完成后应用状态已重置")
         except Exception as e:
             logger.warning(f"测试用例完成后重置状态失败: {str(e)}")
         
+        # 在测试边界采样资源占用
+        if RESOURCE_MONITORING and session.driver:
+            try:
+                sample = session.resources.sample(session.driver, test_name, username)
+                test_reporter.add_resource_sample(sample)
+            except Exception as e:
+                logger.warning(f"资源采样失败: {str(e)}")
+        
         # 测试完成后，增加用户索引以便下个测试使用下个用户
-        current_session['user_index'] += 1
+        session.finish_test()
+
+def _check_latency(rep, mark):
+    """检查用例期间的延迟测量，超出预算时把用例结果改为失败"""
+    try:
+        latency_monitor.assert_within_budget(mark)
+    except TestException as e:
+        rep.outcome = "failed"
+        rep.longrepr = str(e)
+
+def _check_visual(rep, test_name, username):
+    """截图并与基准对比，开启强制检查时出现视觉回归的用例改为失败 (否则只记录)"""
+    from core.visual_diff import visual_comparator
+    if not visual_comparator.available:
+        return
+    try:
+        driver = session_contexts.current().driver
+        page = driver.current_url.split("?")[0].rstrip("/").rsplit("/", 1)[-1] or "index"
+        result = visual_comparator.compare(f"{test_name}@{page}", driver.get_screenshot_as_png(), username)
+    except Exception as e:
+        logger.warning(f"视觉对比失败: {str(e)}")
+        return
+    if result and not result.passed and ENFORCE_VISUAL_CHECKS:
+        rep.outcome = "failed"
+        rep.longrepr = f"视觉回归: {result.describe()}" + (f"\n差异图: {result.diff_image}" if result.diff_image else "")
 
 def pytest_sessionfinish(session, exitstatus):
     """测试会话结束时保存结果到Excel"""
+    # 只收集用例时没有执行任何测试，不输出日志也不生成文件
+    if session.config.getoption("--collect-only"):
+        return
     try:
-        # 🔥 会话结束前最后一次重置应用状态并登出
-        if current_session.get('driver') and current_session.get('current_user'):
-            try:
-                from pages.page_objects import InventoryPage
-                inventory_page = InventoryPage(current_session['driver'])
-                inventory_page.reset_app_state()
-                inventory_page.logout()
-                logger.info("测试会话结束，应用状态已重置并登出")
-            except Exception as e:
-                logger.warning(f"会话结束时重置状态失败: {str(e)}")
+        # 只运行了不需要浏览器的单元测试时，没有结果需要汇总和导出
+        if not session.config.getoption("--partial-result") and not any(_uses_browser(item) for item in session.items):
+            return
+        for context in session_contexts.all():
+            # 多上下文模式下直接销毁各用户上下文 (cookie和本地存储随之丢弃)
+            if context.driver and context.user_contexts:
+                browser_contexts.close_all()
+            # 🔥 会话结束前最后一次重置应用状态并登出
+            elif context.driver and context.current_user:
+                try:
+                    from pages.page_objects import InventoryPage
+                    inventory_page = InventoryPage(context.driver)
+                    inventory_page.reset_app_state()
+                    inventory_page.logout()
+                    logger.info(f"测试会话结束，应用状态已重置并登出 ({context.name})")
+                except Exception as e:
+                    logger.warning(f"会话结束时重置状态失败: {str(e)}")
+        
+        # 等待失败现场全部写盘，报告中才能关联到文件
+        failure_artifacts.wait()
+        
+        # 保存本次观测到的耗时样本，供后续运行计算自适应超时
+        from core.adaptive_timeouts import adaptive_timeouts
+        adaptive_timeouts.save()
         
-        if test_reporter.test_results:
-            filepath = test_reporter.save_results_to_excel()
-            if filepath:
+        from core.wait_engine import wait_engine
+        wait_engine.log_summary()
+        
+        latency_monitor.log_summary()
+        
+        if VISUAL_CHECKS:
+            from core.visual_diff import visual_comparator
+            visual_comparator.log_summary()
+        
+        test_watchdog.log_summary()
+        for context in session_contexts.all():
+            context.pipeline.log_summary()
+        
+        cassette_recorder.save()
+        player = getattr(session.config, "_cassette_player", None)
+        if player and player.remaining:
+            logger.warning(f"WebDriver录制还有 {player.remaining} 条命令未回放，页面对象的行为可能发生了变化")
+        
+        tracer = getattr(session.config, "_dependency_tracer", None)
+        if tracer:
+            tracer.save(session.config.getoption("--trace-deps"))
+        
+        # 并行worker只输出部分结果，由主进程统一合并生成报告
+        partial_result = session.config.getoption("--partial-result")
+        if partial_result:
+            worker_id = session.config.getoption("--worker-id")
+            test_reporter.save_results_to_json(partial_result)
+            logger.info(f"worker {worker_id} 部分结果已保存: {partial_result}")
+        elif test_reporter.test_results:
+            # 保存完整结果 (包含后台写入的失败现场路径)，供离线重新生成报告
+            test_reporter.save_results_to_json(
+                os.path.join(RESULTS_STORE_DIR, f"test_results_{test_reporter.run_id}.json"))
+            from reports.exporters import export_results, parse_formats
+            formats = session.config.getoption("--report-formats")
+            exported = export_results(test_reporter, parse_formats(formats) if formats else REPORT_FORMATS)
+            if any(exported.values()):
                 summary = test_reporter.get_test_summary()
                 logger.info(f"测试摘要: {summary}")
+            if RECORD_RUN_HISTORY:
+                from reports.run_history import record_run_history
+                record_run_history(test_reporter)
         else:
             logger.warning("没有测试结果需要保存")
     except Exception as e:
-        logger.error(f"pytest_sessionfinish执行失败: {str(e)}")
\ No newline at end of file
+        logger.error(f"pytest_sessionfinish执行失败: {str(e)}")
+    finally:
+        for context in session_contexts.all():
+            session_contexts.close(context)
+        test_reporter.close_journal()
+        trace_writer.close()
\ No newline at end of file
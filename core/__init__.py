@@ -1,3 +1,17 @@
 from .exceptions import *
-from .logger_config import logger
-from .webdriver_utils import WebDriverManager, ElementOperations
\ No newline at end of file
+
+# 日志和WebDriver工具按需导入: 导入core包 (如只用到异常类或日志) 时不加载Selenium
+_LAZY_ATTRIBUTES = {
+    "logger": ".logger_config",
+    "WebDriverManager": ".webdriver_utils",
+    "ElementOperations": ".webdriver_utils",
+}
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""
+操作时间线 - 记录最近的页面操作 (查找、点击、输入等) 及其耗时和结果
+
+每个线程各自一条时间线，多个线程同时执行用例 (或流水线在后台登录) 时，清空和快照只涉及本线程的操作。
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+
+from config import ACTION_TIMELINE_SIZE
+from core.trace import trace_writer
+
+@dataclass
+class ActionRecord:
+    """单个页面操作记录"""
+    timestamp: float
+    action: str
+    locator: str
+    duration: float
+    outcome: str
+
+class ActionTimeline:
+    """操作时间线 - 每个线程一个固定长度的环形缓冲区，只保留最近的操作"""
+    
+    def __init__(self, maxlen=ACTION_TIMELINE_SIZE):
+        self.maxlen = maxlen
+        self._local = threading.local()
+    
+    def _records(self):
+        records = getattr(self._local, "records", None)
+        if records is None:
+            records = self._local.records = deque(maxlen=self.maxlen)
+        return records
+    
+    def record(self, action, locator, duration, outcome="ok"):
+        """记录一次操作 (开启追踪时同时写入二进制追踪文件)"""
+        now = time.time()
+        self._records().append(ActionRecord(now, action, locator, duration, outcome))
+        if trace_writer.active:
+            trace_writer.event(action, locator, duration, outcome, now)
+    
+    def snapshot(self):
+        """返回当前线程时间线的副本 (字典列表)"""
+        return [asdict(record) for record in self._records()]
+    
+    def clear(self):
+        """清空当前线程的时间线"""
+        self._records().clear()
+
+# 全局操作时间线实例
+action_timeline = ActionTimeline()
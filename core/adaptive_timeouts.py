@@ -0,0 +1,120 @@
+"""
+自适应超时管理 - 根据历史运行中观测到的各定位器/操作耗时，动态计算等待超时
+
+超时 = 观测耗时p99 × 安全倍数，并限制在 [最小值, 最大值] 范围内，最小值即默认等待时间；
+样本不足时使用调用方给出的默认值。等待超时不代表真实耗时，不作为样本记录；
+本次运行中超时过的定位器/操作在上述超时基础上再放宽一个倍数 (只放宽一次，不随超时次数叠加，也不保存到磁盘)。
+"""
+import json
+import math
+import os
+import threading
+
+from config import (ADAPTIVE_TIMEOUTS, LATENCY_STATS_FILE, ADAPTIVE_TIMEOUT_MULTIPLIER,
+                    ADAPTIVE_TIMEOUT_MIN, ADAPTIVE_TIMEOUT_MAX, ADAPTIVE_MIN_SAMPLES)
+from core.logger_config import logger
+
+# 每个定位器/操作最多保留的最近样本数
+MAX_SAMPLES_PER_KEY = 200
+
+class AdaptiveTimeoutManager:
+    """自适应超时管理器"""
+    
+    def __init__(self, stats_file=LATENCY_STATS_FILE, enabled=ADAPTIVE_TIMEOUTS):
+        self.stats_file = stats_file
+        self.enabled = enabled
+        self._samples = {}
+        self._new_samples = {}
+        # 本次运行中各定位器/操作的等待超时次数
+        self._timeouts = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+    
+    def _ensure_loaded(self):
+        """首次使用时加载历史耗时样本"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if os.path.exists(self.stats_file):
+            try:
+                with open(self.stats_file, 'r', encoding='utf-8') as f:
+                    self._samples = json.load(f)
+                logger.info(f"已加载 {len(self._samples)} 个定位器/操作的历史耗时")
+            except Exception as e:
+                logger.warning(f"加载历史耗时失败: {str(e)}")
+    
+    def record(self, key, latency):
+        """记录一次成功操作的耗时 (秒)"""
+        with self._lock:
+            self._ensure_loaded()
+            for store in (self._samples, self._new_samples):
+                samples = store.setdefault(key, [])
+                samples.append(round(latency, 4))
+                if len(samples) > MAX_SAMPLES_PER_KEY:
+                    del samples[:-MAX_SAMPLES_PER_KEY]
+    
+    def record_timeout(self, key):
+        """记录一次等待超时，之后该定位器/操作的超时放宽一个倍数"""
+        with self._lock:
+            self._timeouts[key] = self._timeouts.get(key, 0) + 1
+    
+    def percentile(self, key, p=99):
+        """耗时的p分位数 (最近秩法)，没有样本时返回None"""
+        with self._lock:
+            self._ensure_loaded()
+            samples = sorted(self._samples.get(key, []))
+        if not samples:
+            return None
+        rank = max(1, math.ceil(p / 100 * len(samples)))
+        return samples[rank - 1]
+    
+    def timeout_for(self, key, default, max_timeout=ADAPTIVE_TIMEOUT_MAX):
+        """获取定位器/操作的等待超时，未启用或样本不足时返回default"""
+        if not self.enabled:
+            return default
+        with self._lock:
+            self._ensure_loaded()
+            sample_count = len(self._samples.get(key, []))
+            timed_out = key in self._timeouts
+        if sample_count < ADAPTIVE_MIN_SAMPLES:
+            timeout = default
+        else:
+            timeout = min(max(self.percentile(key) * ADAPTIVE_TIMEOUT_MULTIPLIER, ADAPTIVE_TIMEOUT_MIN), max_timeout)
+        if timed_out and timeout is not None:
+            timeout = max(min(timeout * ADAPTIVE_TIMEOUT_MULTIPLIER, max_timeout), timeout)
+        return timeout
+    
+    def save(self):
+        """保存耗时样本，先合并磁盘上其他进程 (并行worker) 写入的样本"""
+        with self._lock:
+            if not self._new_samples:
+                return
+            try:
+                merged = {}
+                if os.path.exists(self.stats_file):
+                    with open(self.stats_file, 'r', encoding='utf-8') as f:
+                        merged = json.load(f)
+                for key, samples in self._new_samples.items():
+                    merged[key] = (merged.get(key, []) + samples)[-MAX_SAMPLES_PER_KEY:]
+                
+                directory = os.path.dirname(self.stats_file)
+                if directory and not os.path.exists(directory):
+                    os.makedirs(directory)
+                with open(self.stats_file, 'w', encoding='utf-8') as f:
+                    json.dump(merged, f, ensure_ascii=False)
+                
+                self._samples = merged
+                self._new_samples = {}
+                logger.info(f"耗时样本已保存: {self.stats_file} ({len(merged)} 个定位器/操作)")
+            except Exception as e:
+                logger.warning(f"保存耗时样本失败: {str(e)}")
+    
+    def summary(self):
+        """各定位器/操作的当前自适应超时 (用于日志和排查)"""
+        with self._lock:
+            self._ensure_loaded()
+            keys = list(self._samples)
+        return {key: {"p99": self.percentile(key), "timeout": self.timeout_for(key, None)} for key in keys}
+
+# 全局自适应超时管理器实例
+adaptive_timeouts = AdaptiveTimeoutManager()
@@ -0,0 +1,110 @@
+"""
+失败现场采集 - 测试失败时保存截图、页面源码、控制台日志和操作时间线
+
+测试线程只负责从浏览器取回原始数据 (操作时间线取自该测试线程)，解码、压缩和写盘都放到后台线程池中完成；
+相同内容的文件按内容哈希去重，只保存一份。线程池和去重记录由所有会话上下文共享，多个线程可同时提交。
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ARTIFACTS_DIR, ARTIFACT_WORKERS
+from core.action_timeline import action_timeline
+from core.logger_config import logger
+
+class FailureArtifactCollector:
+    """失败现场采集器"""
+    
+    def __init__(self, artifacts_dir=ARTIFACTS_DIR, max_workers=ARTIFACT_WORKERS):
+        self.artifacts_dir = artifacts_dir
+        self.max_workers = max_workers
+        self._executor = None
+        self._futures = []
+        self._lock = threading.Lock()
+        self._known_hashes = set()
+    
+    def _submit(self, raw, test_result):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="artifact")
+            future = self._executor.submit(self._persist, raw, test_result)
+            self._futures.append(future)
+        return future
+    
+    def capture(self, driver, test_result):
+        """
+        采集失败现场，结果文件路径在后台写入test_result.artifacts
+        
+        Returns:
+            Future: 后台保存任务 (保存失败时test_result.artifacts保持为空)
+        """
+        raw = {"timeline": action_timeline.snapshot()}
+        
+        try:
+            raw["screenshot"] = driver.get_screenshot_as_base64()
+        except Exception as e:
+            logger.warning(f"获取失败截图失败: {str(e)}")
+        try:
+            raw["page_source"] = driver.page_source
+        except Exception as e:
+            logger.warning(f"获取页面源码失败: {str(e)}")
+        try:
+            raw["console_log"] = driver.get_log("browser")
+        except Exception as e:
+            # 部分浏览器/驱动不支持日志接口
+            logger.debug(f"获取控制台日志失败: {str(e)}")
+        
+        return self._submit(raw, test_result)
+    
+    def _persist(self, raw, test_result):
+        """后台线程: 编码、压缩并按内容哈希保存"""
+        try:
+            artifacts = {}
+            if "screenshot" in raw:
+                artifacts["screenshot"] = self._write(base64.b64decode(raw["screenshot"]), ".png")
+            if "page_source" in raw:
+                artifacts["page_source"] = self._write(
+                    gzip.compress(raw["page_source"].encode("utf-8"), mtime=0), ".html.gz", raw["page_source"].encode("utf-8"))
+            if "console_log" in raw:
+                content = json.dumps(raw["console_log"], ensure_ascii=False, indent=2).encode("utf-8")
+                artifacts["console_log"] = self._write(gzip.compress(content, mtime=0), ".log.json.gz", content)
+            content = json.dumps(raw["timeline"], ensure_ascii=False, indent=2).encode("utf-8")
+            artifacts["timeline"] = self._write(gzip.compress(content, mtime=0), ".timeline.json.gz", content)
+            
+            test_result.artifacts = artifacts
+            logger.info(f"测试 {test_result.test_name} ({test_result.username}) 失败现场已保存: {artifacts}")
+        except Exception as e:
+            logger.error(f"保存失败现场失败: {str(e)}")
+    
+    def _write(self, data, suffix, hash_source=None):
+        """按内容哈希写入文件，相同内容只写一次"""
+        digest = hashlib.sha256(hash_source if hash_source is not None else data).hexdigest()[:16]
+        filepath = os.path.join(self.artifacts_dir, digest + suffix)
+        
+        with self._lock:
+            if digest + suffix in self._known_hashes or os.path.exists(filepath):
+                self._known_hashes.add(digest + suffix)
+                return filepath
+            self._known_hashes.add(digest + suffix)
+            os.makedirs(self.artifacts_dir, exist_ok=True)
+        
+        with open(filepath, 'wb') as f:
+            f.write(data)
+        return filepath
+    
+    def wait(self):
+        """等待所有后台任务完成 (生成报告前调用)"""
+        with self._lock:
+            futures, self._futures = self._futures, []
+            executor, self._executor = self._executor, None
+        for future in futures:
+            future.result()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+# 全局失败现场采集器实例
+failure_artifacts = FailureArtifactCollector()
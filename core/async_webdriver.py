@@ -0,0 +1,257 @@
+"""
+异步WebDriver客户端 - 基于asyncio实现的W3C WebDriver协议客户端
+
+Selenium客户端是阻塞式的，一个Python进程同一时间只能驱动一个浏览器。
+本模块直接通过HTTP与msedgedriver通信，一个事件循环可以同时驱动多个浏览器会话。
+"""
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import time
+
+from config import (EDGE_DRIVER_PATH, BROWSER_OPTIONS, DEFAULT_WAIT_TIME, PAGE_LOAD_TIMEOUT,
+                    ASYNC_WEBDRIVER_HOST, ASYNC_WEBDRIVER_PORT, ASYNC_POLL_INTERVAL)
+from core.logger_config import logger
+from core.exceptions import ElementException, DriverException
+
+# W3C规范中元素引用的键名
+W3C_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+def to_w3c_locator(by, value):
+    """将Selenium定位方式转换为W3C协议支持的定位方式 (与Selenium内部转换规则一致)"""
+    if by == "id":
+        return "css selector", f'[id="{value}"]'
+    if by == "class name":
+        return "css selector", f".{value}"
+    if by == "name":
+        return "css selector", f'[name="{value}"]'
+    return by, value
+
+class AsyncWebDriverClient:
+    """W3C WebDriver HTTP客户端"""
+    
+    def __init__(self, host=ASYNC_WEBDRIVER_HOST, port=ASYNC_WEBDRIVER_PORT, request_timeout=PAGE_LOAD_TIMEOUT + 10):
+        self.host = host
+        self.port = port
+        self.request_timeout = request_timeout
+    
+    async def request(self, method, path, payload=None):
+        """发送WebDriver命令并返回响应中的value"""
+        try:
+            return await asyncio.wait_for(self._request(method, path, payload), self.request_timeout)
+        except asyncio.TimeoutError:
+            raise DriverException(f"WebDriver请求超时: {method} {path}")
+        except OSError as e:
+            raise DriverException(f"WebDriver连接失败: {method} {path}", e)
+    
+    async def _request(self, method, path, payload):
+        body = json.dumps(payload or {}).encode("utf-8") if method == "POST" else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(head.encode("ascii") + body)
+            await writer.drain()
+            raw = await reader.read()
+        finally:
+            writer.close()
+        
+        header, _, data = raw.partition(b"\r\n\r\n")
+        status = int(header.split(b" ", 2)[1])
+        if b"transfer-encoding: chunked" in header.lower():
+            data = self._decode_chunked(data)
+        
+        response = json.loads(data.decode("utf-8")) if data else {}
+        value = response.get("value")
+        if status >= 400 or (isinstance(value, dict) and "error" in value and "message" in value):
+            error = value.get("error", status) if isinstance(value, dict) else status
+            message = value.get("message", "") if isinstance(value, dict) else ""
+            raise DriverException(f"WebDriver命令失败: {method} {path} -> {error}: {message}")
+        return value
+    
+    @staticmethod
+    def _decode_chunked(data):
+        """解码HTTP chunked响应体"""
+        decoded = b""
+        while data:
+            size_line, _, data = data.partition(b"\r\n")
+            size = int(size_line.split(b";")[0], 16)
+            if size == 0:
+                break
+            decoded += data[:size]
+            data = data[size + 2:]
+        return decoded
+
+class AsyncWebElement:
+    """异步页面元素"""
+    
+    def __init__(self, session, element_id):
+        self.session = session
+        self.element_id = element_id
+    
+    def _path(self, suffix=""):
+        return f"/element/{self.element_id}{suffix}"
+    
+    async def click(self):
+        await self.session.command("POST", self._path("/click"))
+    
+    async def clear(self):
+        await self.session.command("POST", self._path("/clear"))
+    
+    async def send_keys(self, text):
+        await self.session.command("POST", self._path("/value"), {"text": str(text)})
+    
+    async def text(self):
+        return await self.session.command("GET", self._path("/text"))
+    
+    async def get_attribute(self, name):
+        return await self.session.command("GET", self._path(f"/attribute/{name}"))
+    
+    async def find_element(self, by, value):
+        """在当前元素内查找子元素 (不等待)"""
+        using, selector = to_w3c_locator(by, value)
+        result = await self.session.command("POST", self._path("/element"), {"using": using, "value": selector})
+        return AsyncWebElement(self.session, result[W3C_ELEMENT_KEY])
+    
+    async def find_elements(self, by, value):
+        """在当前元素内查找所有子元素 (不等待)"""
+        using, selector = to_w3c_locator(by, value)
+        results = await self.session.command("POST", self._path("/elements"), {"using": using, "value": selector})
+        return [AsyncWebElement(self.session, result[W3C_ELEMENT_KEY]) for result in results]
+
+class AsyncWebDriverSession:
+    """异步浏览器会话"""
+    
+    def __init__(self, client, session_id):
+        self.client = client
+        self.session_id = session_id
+    
+    @classmethod
+    async def create(cls, client, browser_options=BROWSER_OPTIONS):
+        """创建新的浏览器会话"""
+        capabilities = {
+            "capabilities": {
+                "alwaysMatch": {
+                    "browserName": "MicrosoftEdge",
+                    "ms:edgeOptions": {"args": list(browser_options)},
+                    "timeouts": {"pageLoad": int(PAGE_LOAD_TIMEOUT * 1000), "implicit": 0},
+                }
+            }
+        }
+        value = await client.request("POST", "/session", capabilities)
+        session = cls(client, value["sessionId"])
+        logger.info(f"异步WebDriver会话创建成功: {session.session_id}")
+        return session
+    
+    async def command(self, method, path, payload=None):
+        """执行当前会话的WebDriver命令"""
+        return await self.client.request(method, f"/session/{self.session_id}{path}", payload)
+    
+    async def get(self, url):
+        await self.command("POST", "/url", {"url": url})
+    
+    async def current_url(self):
+        return await self.command("GET", "/url")
+    
+    async def execute_script(self, script, *args):
+        return await self.command("POST", "/execute/sync", {"script": script, "args": list(args)})
+    
+    async def delete_all_cookies(self):
+        await self.command("DELETE", "/cookie")
+    
+    async def find_element(self, by, value, timeout=DEFAULT_WAIT_TIME):
+        """查找元素，在超时时间内按固定间隔轮询"""
+        using, selector = to_w3c_locator(by, value)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                result = await self.command("POST", "/element", {"using": using, "value": selector})
+                logger.debug(f"成功找到元素: {by}={value}")
+                return AsyncWebElement(self, result[W3C_ELEMENT_KEY])
+            except DriverException as e:
+                if time.monotonic() >= deadline:
+                    logger.error(f"查找元素超时: {by}={value}")
+                    raise ElementException(f"查找元素超时: {by}={value}", e)
+            await asyncio.sleep(ASYNC_POLL_INTERVAL)
+    
+    async def find_elements(self, by, value, timeout=DEFAULT_WAIT_TIME):
+        """查找多个元素，超时返回空列表"""
+        using, selector = to_w3c_locator(by, value)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                results = await self.command("POST", "/elements", {"using": using, "value": selector})
+                if results:
+                    logger.debug(f"成功找到 {len(results)} 个元素: {by}={value}")
+                    return [AsyncWebElement(self, result[W3C_ELEMENT_KEY]) for result in results]
+            except DriverException as e:
+                logger.error(f"查找元素失败: {by}={value}, 错误: {str(e)}")
+                return []
+            if time.monotonic() >= deadline:
+                logger.warning(f"查找元素超时: {by}={value}")
+                return []
+            await asyncio.sleep(ASYNC_POLL_INTERVAL)
+    
+    async def quit(self):
+        """关闭浏览器会话"""
+        try:
+            await self.client.request("DELETE", f"/session/{self.session_id}")
+            logger.info(f"异步WebDriver会话已关闭: {self.session_id}")
+        except Exception as e:
+            logger.warning(f"关闭异步WebDriver会话时出现异常: {str(e)}")
+
+class AsyncWebDriverManager:
+    """异步WebDriver管理器 - 管理msedgedriver进程，多个会话共享同一个driver进程"""
+    
+    def __init__(self, host=ASYNC_WEBDRIVER_HOST, port=ASYNC_WEBDRIVER_PORT):
+        self.client = AsyncWebDriverClient(host, port)
+        self.process = None
+    
+    async def start_service(self, startup_timeout=10):
+        """启动msedgedriver进程并等待其就绪"""
+        driver_path = EDGE_DRIVER_PATH or shutil.which("msedgedriver")
+        if not driver_path or not os.path.exists(driver_path):
+            raise DriverException("未找到msedgedriver，请在config.EDGE_DRIVER_PATH中配置驱动路径")
+        
+        logger.info(f"启动msedgedriver服务: {driver_path} --port={self.client.port}")
+        self.process = subprocess.Popen(
+            [driver_path, f"--port={self.client.port}"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        
+        deadline = time.monotonic() + startup_timeout
+        while time.monotonic() < deadline:
+            try:
+                status = await self.client.request("GET", "/status")
+                if status.get("ready", True):
+                    logger.info("msedgedriver服务已就绪")
+                    return
+            except DriverException:
+                pass
+            await asyncio.sleep(0.2)
+        
+        self.stop_service()
+        raise DriverException("msedgedriver服务启动超时")
+    
+    async def create_session(self):
+        """创建新的浏览器会话"""
+        return await AsyncWebDriverSession.create(self.client)
+    
+    def stop_service(self):
+        """停止msedgedriver进程"""
+        if self.process:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+            logger.info("msedgedriver服务已停止")
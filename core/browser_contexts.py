@@ -0,0 +1,108 @@
+"""
+用户浏览器上下文 - 在同一个浏览器进程中为每个用户创建独立的浏览器上下文 (类似无痕窗口)
+
+每个上下文有独立的cookie和本地存储，各用户在自己的窗口中保持登录状态。
+切换用户时只需切换窗口句柄，不再登出/登录，也不需要为每个用户各启动一个浏览器。
+上下文通过Chromium的DevTools协议 (Target.createBrowserContext) 创建，需要Edge/Chrome本地驱动。
+"""
+import time
+from dataclasses import dataclass
+
+from config import PAGE_TRANSITION_TIMEOUT
+from core.exceptions import DriverException
+from core.logger_config import logger
+from core.wait_engine import wait_engine
+
+@dataclass
+class UserContext:
+    """一个用户的浏览器上下文"""
+    username: str
+    context_id: str
+    handle: str
+    logged_in: bool = False
+
+class BrowserContextPool:
+    """用户浏览器上下文池"""
+    
+    def __init__(self):
+        self.driver = None
+        self.contexts = {}
+        self.default_handle = None
+    
+    @staticmethod
+    def supported(driver):
+        """驱动是否支持DevTools命令 (接管的守护进程会话等Remote驱动不支持)"""
+        return hasattr(driver, "execute_cdp_cmd")
+    
+    def bind(self, driver):
+        """绑定浏览器，浏览器被回收重建后原有上下文全部失效"""
+        if driver is not self.driver:
+            self.driver = driver
+            self.contexts = {}
+            self.default_handle = driver.current_window_handle if driver else None
+    
+    def _create(self, username):
+        """创建新的浏览器上下文及其窗口"""
+        if not self.supported(self.driver):
+            raise DriverException("当前WebDriver不支持DevTools命令，无法创建独立的浏览器上下文")
+        try:
+            existing = set(self.driver.window_handles)
+            context_id = self.driver.execute_cdp_cmd(
+                "Target.createBrowserContext", {"disposeOnDetach": False})["browserContextId"]
+            target_id = self.driver.execute_cdp_cmd(
+                "Target.createTarget", {"url": "about:blank", "browserContextId": context_id})["targetId"]
+            
+            # Chromium驱动的窗口句柄就是DevTools的targetId，句柄列表可能稍后才包含新窗口
+            new_handles = wait_engine.until(
+                self.driver,
+                lambda driver: set(driver.window_handles) - existing,
+                PAGE_TRANSITION_TIMEOUT, f"用户 {username} 的浏览器上下文窗口出现")
+            handle = target_id if target_id in new_handles else new_handles.pop()
+        except DriverException:
+            raise
+        except Exception as e:
+            raise DriverException(f"创建用户 {username} 的浏览器上下文失败: {str(e)}", e)
+        
+        user_context = self.contexts[username] = UserContext(username, context_id, handle)
+        logger.info(f"已为用户 {username} 创建独立浏览器上下文: {context_id}")
+        return user_context
+    
+    def switch_to(self, username):
+        """
+        切换到用户的浏览器上下文，不存在时创建
+        
+        Returns:
+            UserContext: 用户上下文 (logged_in为False时需要在该上下文中登录)
+        """
+        start = time.perf_counter()
+        user_context = self.contexts.get(username) or self._create(username)
+        try:
+            self.driver.switch_to.window(user_context.handle)
+        except Exception as e:
+            # 窗口被关闭 (如页面崩溃)，丢弃该上下文，下次重新创建
+            self.contexts.pop(username, None)
+            raise DriverException(f"切换到用户 {username} 的浏览器上下文失败: {str(e)}", e)
+        logger.debug(f"切换到用户 {username} 的浏览器上下文，耗时 {time.perf_counter() - start:.3f}s")
+        return user_context
+    
+    def close_all(self):
+        """关闭所有用户上下文，切回浏览器的默认窗口"""
+        for user_context in self.contexts.values():
+            try:
+                self.driver.switch_to.window(user_context.handle)
+                self.driver.close()
+            except Exception as e:
+                logger.warning(f"关闭用户 {user_context.username} 的窗口失败: {str(e)}")
+        if self.driver and self.default_handle:
+            try:
+                # DevTools命令通过当前窗口发送，须先切回仍然存在的默认窗口再销毁上下文
+                self.driver.switch_to.window(self.default_handle)
+                for user_context in self.contexts.values():
+                    self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": user_context.context_id})
+            except Exception as e:
+                logger.warning(f"销毁用户浏览器上下文失败: {str(e)}")
+        self.contexts = {}
+        logger.info("用户浏览器上下文已全部关闭")
+
+# 全局用户浏览器上下文池实例
+browser_contexts = BrowserContextPool()
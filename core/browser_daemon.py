@@ -0,0 +1,222 @@
+"""
+浏览器守护进程 - 在多次pytest调用之间复用同一个浏览器会话
+
+start 启动一个独立于当前进程的msedgedriver并创建浏览器会话，把驱动地址和会话ID写入状态文件；
+之后的pytest调用 (--attach-browser) 通过会话ID直接接管该浏览器，测试开始前清理cookie和本地存储，
+结束时不关闭浏览器。编写调试用例时每次运行都不必再等待浏览器启动。
+状态文件中同时记录驱动进程名和启动时间，结束进程前先核对，重启或崩溃后残留的状态文件不会误杀无关进程。
+"""
+import json
+import os
+import shutil
+import signal
+import subprocess
+import time
+import urllib.request
+
+try:
+    import psutil
+except ImportError:  # psutil为可选依赖，缺失时无法核对进程，不结束驱动进程
+    psutil = None
+
+from selenium import webdriver
+
+from config import EDGE_DRIVER_PATH, BASE_URL, BROWSER_DAEMON_HOST, BROWSER_DAEMON_PORT, BROWSER_DAEMON_STATE_FILE
+from core.exceptions import DriverException
+from core.logger_config import logger
+from core.webdriver_utils import WebDriverManager
+
+class AttachedRemote(webdriver.Remote):
+    """接管已存在会话的Remote WebDriver，不创建新会话"""
+    
+    def __init__(self, command_executor, session_id, options):
+        self._attach_session_id = session_id
+        super().__init__(command_executor=command_executor, options=options)
+    
+    def start_session(self, capabilities):
+        self.session_id = self._attach_session_id
+        self.caps = {}
+
+class BrowserDaemon:
+    """浏览器守护进程管理"""
+    
+    def __init__(self, host=BROWSER_DAEMON_HOST, port=BROWSER_DAEMON_PORT, state_file=BROWSER_DAEMON_STATE_FILE):
+        self.host = host
+        self.port = port
+        self.state_file = state_file
+    
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+    
+    def load_state(self):
+        """读取守护进程状态，未启动时返回None"""
+        if not os.path.exists(self.state_file):
+            return None
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取浏览器守护进程状态失败: {str(e)}")
+            return None
+    
+    def _save_state(self, state):
+        directory = os.path.dirname(self.state_file)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+    
+    def _wait_ready(self, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(f"{self.url}/status", timeout=1) as response:
+                    if json.load(response).get("value", {}).get("ready", True):
+                        return True
+            except Exception:
+                pass
+            time.sleep(0.2)
+        return False
+    
+    def start(self):
+        """启动守护进程并创建浏览器会话，已在运行时直接返回现有状态"""
+        state = self.load_state()
+        if state:
+            if self.attach(reset=False):
+                logger.info(f"浏览器守护进程已在运行: 会话 {state['session_id']}")
+                return state
+            # 会话已失效，清理残留的驱动进程以释放端口
+            self._kill(state)
+        
+        driver_path = EDGE_DRIVER_PATH or shutil.which("msedgedriver")
+        if not driver_path or not os.path.exists(driver_path):
+            raise DriverException("未找到msedgedriver，请在config.EDGE_DRIVER_PATH中配置驱动路径")
+        
+        # 脱离当前进程启动 (POSIX新会话组 / Windows分离进程)，当前命令退出后驱动和浏览器继续运行
+        logger.info(f"启动浏览器守护进程: {driver_path} --port={self.port}")
+        process = subprocess.Popen(
+            [driver_path, f"--port={self.port}"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+            creationflags=getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+        )
+        if not self._wait_ready():
+            process.kill()
+            raise DriverException("浏览器守护进程启动超时")
+        
+        driver = webdriver.Remote(command_executor=self.url, options=WebDriverManager.build_options())
+        WebDriverManager.configure_timeouts(driver)
+        state = {
+            "pid": process.pid,
+            "process_name": os.path.basename(driver_path),
+            "process_started": psutil.Process(process.pid).create_time() if psutil is not None else None,
+            "url": self.url,
+            "session_id": driver.session_id,
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self._save_state(state)
+        logger.info(f"浏览器守护进程已启动: PID {process.pid}, 会话 {driver.session_id}")
+        return state
+    
+    def attach(self, reset=True):
+        """
+        接管守护进程中的浏览器会话
+        
+        Args:
+            reset: 是否清理上次运行留下的状态 (cookie、本地存储)
+        
+        Returns:
+            WebDriver: 接管的会话，守护进程未运行或会话已失效时返回None
+        """
+        state = self.load_state()
+        if not state:
+            return None
+        try:
+            driver = AttachedRemote(state["url"], state["session_id"], WebDriverManager.build_options())
+            driver.current_url  # 确认会话仍然有效
+        except Exception as e:
+            logger.warning(f"接管浏览器会话失败，会话可能已失效: {str(e)}")
+            return None
+        
+        WebDriverManager.configure_timeouts(driver)
+        if reset:
+            self.reset_state(driver)
+        logger.info(f"已接管浏览器会话: {state['session_id']}")
+        return driver
+    
+    @staticmethod
+    def reset_state(driver):
+        """清理登录状态和购物车 (SauceDemo使用cookie保存登录用户，本地存储保存购物车)"""
+        try:
+            driver.get(BASE_URL)
+            driver.delete_all_cookies()
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            driver.get(BASE_URL)
+            logger.info("浏览器会话状态已重置")
+        except Exception as e:
+            logger.warning(f"重置浏览器会话状态失败: {str(e)}")
+    
+    def stop(self):
+        """关闭浏览器会话并停止守护进程"""
+        state = self.load_state()
+        if not state:
+            logger.info("浏览器守护进程未运行")
+            return
+        
+        driver = self.attach(reset=False)
+        if driver:
+            WebDriverManager.close_driver(driver)
+        self._kill(state)
+        os.remove(self.state_file)
+        logger.info(f"浏览器守护进程已停止: PID {state['pid']}")
+    
+    @staticmethod
+    def _is_daemon_process(state):
+        """状态文件中的PID是否仍是当时启动的驱动进程 (进程名和启动时间一致)"""
+        if psutil is None:
+            logger.warning(f"未安装psutil，无法确认PID {state['pid']} 是否为守护进程的驱动，不结束该进程")
+            return False
+        try:
+            process = psutil.Process(state["pid"])
+            if state.get("process_name") and process.name() != state["process_name"]:
+                return False
+            started = state.get("process_started")
+            return started is None or abs(process.create_time() - started) < 1
+        except psutil.Error:
+            return False
+    
+    def _kill(self, state):
+        """结束守护进程的驱动 (PID已被其他进程复用时跳过)"""
+        if not self._is_daemon_process(state):
+            logger.info(f"PID {state['pid']} 已不是守护进程的驱动，跳过结束进程")
+            return
+        try:
+            os.kill(state["pid"], signal.SIGTERM)
+        except OSError:
+            pass
+    
+    def alive(self):
+        """守护进程的浏览器会话是否可以接管，会话已失效时清理残留的驱动进程和状态文件"""
+        state = self.load_state()
+        if not state:
+            return False
+        if self.attach(reset=False) is not None:
+            return True
+        self._kill(state)
+        try:
+            os.remove(self.state_file)
+        except OSError:
+            pass
+        logger.info(f"浏览器守护进程会话已失效，已清理状态文件: {self.state_file}")
+        return False
+    
+    def status(self):
+        """守护进程状态描述"""
+        state = self.load_state()
+        if not state:
+            return "未运行"
+        alive = self.alive()
+        return f"{'运行中' if alive else '会话已失效 (已清理)'}: PID {state['pid']}, 会话 {state['session_id']}, 启动于 {state['started_at']}"
+
+# 全局浏览器守护进程实例
+browser_daemon = BrowserDaemon()
@@ -0,0 +1,185 @@
+"""
+WebDriver录制回放 (cassette) - 录制真实运行中的WebDriver请求/响应，回放时无需浏览器和被测站点
+
+录制: 包装驱动的command_executor，把每条命令及其原始JSON响应按顺序写入cassette文件。
+回放: ReplayDriver是普通的Remote WebDriver，但命令由CassettePlayer按录制顺序返回响应，
+      页面对象、等待逻辑和conftest钩子照常执行，用于在修改page_objects后快速做回归验证。
+
+回放按顺序逐条匹配 命令名+参数 (忽略sessionId；newSession和setTimeouts的参数随配置/自适应超时变化，不参与匹配)。
+显式等待的轮询次数与时间有关，连续重复的相同请求视为轮询: 回放时多出的轮询重复上一条响应，少了则跳过录制中多余的轮询。
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from core.exceptions import DriverException
+from core.logger_config import logger
+
+CASSETTE_VERSION = 1
+# 参数不参与匹配的命令
+UNMATCHED_PARAM_COMMANDS = {"newSession", "setTimeouts"}
+
+class CassetteMismatchException(DriverException):
+    """回放时请求与录制内容不一致 (页面对象的行为发生了变化)"""
+    pass
+
+def _request_key(command, params):
+    """请求的匹配键: 命令名 + 规范化后的参数"""
+    params = {key: value for key, value in (params or {}).items() if key != "sessionId"}
+    if command in UNMATCHED_PARAM_COMMANDS or not params:
+        return command
+    return command + " " + json.dumps(params, sort_keys=True, ensure_ascii=False)
+
+class CassetteRecorder:
+    """WebDriver命令录制器"""
+    
+    def __init__(self):
+        self.filepath = None
+        self.interactions = []
+        self._lock = threading.Lock()
+    
+    @property
+    def active(self):
+        return self.filepath is not None
+    
+    def start(self, filepath):
+        """开始录制，之后attach的驱动的所有命令都写入同一个cassette"""
+        self.filepath = filepath
+        self.interactions = []
+        logger.info(f"开始录制WebDriver命令: {filepath}")
+    
+    def attach(self, driver):
+        """包装驱动的命令执行器 (浏览器被回收重建后需要对新驱动再次调用)"""
+        if not self.active or getattr(driver.command_executor, "_cassette_recorded", False):
+            return driver
+        executor = driver.command_executor
+        execute = executor.execute
+        
+        def recording_execute(command, params=None):
+            interaction = {"command": command, "params": json.loads(json.dumps(params or {}))}
+            try:
+                response = execute(command, params)
+            except Exception as e:
+                interaction["exception"] = str(e)
+                self._record(interaction)
+                raise
+            # 深拷贝: Remote.execute会把响应中的元素引用原地替换为WebElement对象
+            interaction["response"] = json.loads(json.dumps(response)) if response is not None else None
+            self._record(interaction)
+            return response
+        
+        executor.execute = recording_execute
+        executor._cassette_recorded = True
+        return driver
+    
+    def _record(self, interaction):
+        with self._lock:
+            self.interactions.append(interaction)
+    
+    def save(self):
+        """保存cassette文件"""
+        if not self.active:
+            return None
+        directory = os.path.dirname(self.filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._lock:
+            data = {
+                "version": CASSETTE_VERSION,
+                "recorded": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "interactions": self.interactions,
+            }
+            with open(self.filepath, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        logger.info(f"WebDriver录制已保存: {self.filepath} ({len(self.interactions)} 条命令)")
+        return self.filepath
+
+class CassettePlayer:
+    """cassette回放器，同时充当ReplayDriver的command_executor"""
+    
+    def __init__(self, filepath):
+        self.filepath = filepath
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise DriverException(f"不支持的cassette版本: {data.get('version')} ({filepath})")
+        self.interactions = data["interactions"]
+        self.keys = [_request_key(item["command"], item["params"]) for item in self.interactions]
+        self.cursor = 0
+        self._last = None
+        self._lock = threading.Lock()
+        logger.info(f"加载WebDriver录制: {filepath} ({len(self.interactions)} 条命令)")
+    
+    @property
+    def remaining(self):
+        return len(self.interactions) - self.cursor
+    
+    def _next_index(self, key):
+        """找到与请求匹配的录制条目，返回其下标 (-1 表示重复上一条响应)"""
+        if self.cursor < len(self.interactions) and self.keys[self.cursor] == key:
+            return self.cursor
+        last_key = self.keys[self._last] if self._last is not None else None
+        if key == last_key:
+            return -1
+        # 录制时多出的轮询: 跳过与上一条相同的请求
+        cursor = self.cursor
+        while last_key is not None and cursor < len(self.interactions) and self.keys[cursor] == last_key:
+            cursor += 1
+        if cursor < len(self.interactions) and self.keys[cursor] == key:
+            return cursor
+        expected = self.keys[self.cursor] if self.cursor < len(self.interactions) else "<录制已结束>"
+        raise CassetteMismatchException(
+            f"回放请求与录制不一致 (第 {self.cursor + 1} 条): 实际 {key[:300]}，录制 {expected[:300]}")
+    
+    def execute(self, command, params=None):
+        with self._lock:
+            index = self._next_index(_request_key(command, params or {}))
+            if index == -1:
+                index = self._last
+            else:
+                self.cursor = index + 1
+                self._last = index
+        interaction = self.interactions[index]
+        if "exception" in interaction:
+            raise WebDriverException(interaction["exception"])
+        # 返回副本，避免Remote.execute原地修改录制数据
+        return json.loads(json.dumps(interaction["response"])) if interaction["response"] is not None else None
+    
+    def has_pending(self, command):
+        """下一条录制是否为指定命令"""
+        return self.cursor < len(self.interactions) and self.interactions[self.cursor]["command"] == command
+    
+    def close(self):
+        pass
+    
+    def new_driver(self):
+        """按录制顺序创建下一个回放驱动 (录制中浏览器被回收重建时会有多个会话)"""
+        from core.webdriver_utils import WebDriverManager
+        return ReplayDriver(self, options=WebDriverManager.build_options())
+
+class ReplayDriver(webdriver.Remote):
+    """回放驱动 - 命令由CassettePlayer按录制内容响应，不连接任何浏览器"""
+    
+    def __init__(self, player, options):
+        self.player = player
+        super().__init__(command_executor=player, options=options)
+    
+    def start_session(self, capabilities):
+        # 录制时接管的守护进程会话没有newSession命令，直接使用录制中的会话ID
+        if self.player.has_pending("newSession"):
+            return super().start_session(capabilities)
+        self.session_id = next(
+            (item["params"]["sessionId"] for item in self.player.interactions[self.player.cursor:]
+             if item["params"].get("sessionId")), "replay")
+        self.caps = {}
+    
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        """与Chromium驱动一致的DevTools命令 (用户浏览器上下文模式的录制中会出现)"""
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+# 全局WebDriver录制器实例
+cassette_recorder = CassetteRecorder()
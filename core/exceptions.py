@@ -31,4 +31,12 @@ class CheckoutException(TestException):
 
 class ProductException(TestException):
     """产品操作相关异常"""
+    pass
+
+class DriverException(TestException):
+    """WebDriver会话及协议通信相关异常"""
+    pass
+
+class LatencyBudgetExceeded(TestException):
+    """操作耗时超出延迟预算"""
     pass
\ No newline at end of file
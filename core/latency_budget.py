@@ -0,0 +1,134 @@
+"""
+延迟预算 - 记录登录、页面跳转、排序等用户可感知操作的耗时，超过预算时判定失败
+
+预算按操作类别配置，可针对单个用户覆盖 (如performance_glitch_user本身就较慢)，
+这样既能发现被测应用的性能退化，又不会把已知的慢用户误判为失败。
+record只记录测量，不抛出异常 (页面对象的操作不会因此失败)；超预算由用例调用assert_within_budget检查，
+启用强制检查时conftest在用例结束后对用例期间的测量统一检查。
+"""
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from config import LATENCY_BUDGETS, USER_LATENCY_BUDGETS, ENFORCE_LATENCY_BUDGETS
+from core.exceptions import LatencyBudgetExceeded
+from core.logger_config import logger
+
+@dataclass
+class LatencyMeasurement:
+    """一次操作耗时的测量结果"""
+    category: str
+    action: str
+    username: str
+    latency: float
+    budget: Optional[float]
+    timestamp: str
+    
+    @property
+    def exceeded(self):
+        return self.budget is not None and self.latency > self.budget
+    
+    def describe(self):
+        budget = f"{self.budget:.2f}s" if self.budget is not None else "无"
+        return f"用户 {self.username} {self.action} ({self.category}) 耗时 {self.latency:.2f}s，预算 {budget}"
+
+class LatencyMonitor:
+    """延迟预算监控器"""
+    
+    def __init__(self, enforce=ENFORCE_LATENCY_BUDGETS):
+        self.enforce = enforce
+        self._local = threading.local()
+        # 所有线程的测量 (用于汇总)，各线程自己的测量另存在_local中 (用于mark/since)
+        self.measurements: List[LatencyMeasurement] = []
+        self._lock = threading.Lock()
+    
+    @property
+    def current_user(self):
+        """当前线程最近登录的用户 (多线程执行用例时各线程独立)"""
+        return getattr(self._local, "current_user", "")
+    
+    @current_user.setter
+    def current_user(self, username):
+        self._local.current_user = username
+    
+    @staticmethod
+    def budget_for(category, username=""):
+        """获取用户某类操作的延迟预算(秒)，未配置时返回None"""
+        user_budgets = USER_LATENCY_BUDGETS.get(username, {})
+        if category in user_budgets:
+            return user_budgets[category]
+        return LATENCY_BUDGETS.get(category)
+    
+    def record(self, category, action, latency, username=None):
+        """
+        记录一次操作耗时 (超过预算时只记录警告日志)
+        
+        Args:
+            category: 操作类别 (login / page_transition / sort)
+            action: 具体操作描述 (如 go_to_cart)
+            latency: 耗时(秒)
+            username: 用户名，默认为最近登录的用户
+        """
+        username = username if username is not None else self.current_user
+        measurement = LatencyMeasurement(
+            category=category,
+            action=action,
+            username=username,
+            latency=latency,
+            budget=self.budget_for(category, username),
+            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        with self._lock:
+            self.measurements.append(measurement)
+        self._thread_measurements().append(measurement)
+        
+        if measurement.exceeded:
+            logger.warning(f"延迟超出预算: {measurement.describe()}")
+        else:
+            logger.debug(f"延迟测量: {measurement.describe()}")
+        return measurement
+    
+    def _thread_measurements(self):
+        measurements = getattr(self._local, "measurements", None)
+        if measurements is None:
+            measurements = self._local.measurements = []
+        return measurements
+    
+    def mark(self):
+        """当前线程的测量位置，配合assert_within_budget只检查之后的测量 (不含其他线程，如流水线的后台登录)"""
+        return len(self._thread_measurements())
+    
+    def since(self, mark=0):
+        """当前线程mark之后的测量"""
+        return self._thread_measurements()[mark:]
+    
+    def assert_within_budget(self, mark=0):
+        """断言当前线程mark之后的所有测量都未超出预算"""
+        exceeded = [m for m in self.since(mark) if m.exceeded]
+        if exceeded:
+            raise LatencyBudgetExceeded("延迟超出预算: " + "; ".join(m.describe() for m in exceeded))
+    
+    def summary(self):
+        """按用户和操作类别汇总: 次数、平均、最大耗时和超预算次数"""
+        groups = {}
+        with self._lock:
+            measurements = list(self.measurements)
+        for m in measurements:
+            group = groups.setdefault((m.username, m.category), {
+                "count": 0, "total": 0.0, "max": 0.0, "exceeded": 0, "budget": m.budget})
+            group["count"] += 1
+            group["total"] += m.latency
+            group["max"] = max(group["max"], m.latency)
+            group["exceeded"] += int(m.exceeded)
+        return {key: {"count": g["count"], "avg": g["total"] / g["count"], "max": g["max"],
+                      "exceeded": g["exceeded"], "budget": g["budget"]} for key, g in groups.items()}
+    
+    def log_summary(self):
+        """输出延迟汇总到日志"""
+        for (username, category), stats in sorted(self.summary().items()):
+            logger.info(f"延迟汇总 {username}/{category}: {stats['count']} 次, 平均 {stats['avg']:.2f}s, "
+                        f"最大 {stats['max']:.2f}s, 预算 {stats['budget']}s, 超出 {stats['exceeded']} 次")
+
+# 全局延迟预算监控实例
+latency_monitor = LatencyMonitor()
@@ -0,0 +1,211 @@
+"""
+负载生成 - 复用异步页面对象，把功能测试中的用户旅程作为虚拟用户并发运行
+
+每个虚拟用户拥有独立的浏览器会话，按爬坡时间依次启动后循环执行
+登录 -> 加购 -> 购物车 -> 结账 -> 完成 -> 登出 的旅程，直到运行时长结束。
+统计每个步骤的吞吐量、错误率和延迟分位数 (p50/p90/p95/p99)。
+默认目标为本地部署的SauceDemo，压测公共站点必须显式允许。
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List
+from urllib.parse import urlparse
+
+from config import (USERNAMES, PASSWORD, FIRST_NAME, LAST_NAME, POSTAL_CODE, LOAD_TARGET_URL, LOAD_VIRTUAL_USERS,
+                    LOAD_RAMP_UP, LOAD_DURATION, LOAD_THINK_TIME, LOAD_REPORT_DIR, LOAD_PUBLIC_HOSTS)
+from core.exceptions import TestException
+from core.logger_config import logger
+
+PERCENTILES = (50, 90, 95, 99)
+
+@dataclass
+class StepStats:
+    """单个步骤的耗时样本和错误数"""
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    
+    def percentile(self, p):
+        """耗时的p分位数 (最近秩法)，没有样本时返回None"""
+        if not self.latencies:
+            return None
+        samples = sorted(self.latencies)
+        return samples[max(1, math.ceil(p / 100 * len(samples))) - 1]
+    
+    def summary(self, elapsed):
+        """步骤统计摘要 (elapsed为整个压测的墙钟时间，用于计算吞吐量)"""
+        total = len(self.latencies) + self.errors
+        percentiles = {f"p{p}": self.percentile(p) for p in PERCENTILES}
+        return {
+            "step": self.name,
+            "count": len(self.latencies),
+            "errors": self.errors,
+            "error_rate": round(self.errors / total * 100, 2) if total else 0.0,
+            "throughput": round(len(self.latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+            "mean": round(sum(self.latencies) / len(self.latencies), 4) if self.latencies else None,
+            **{key: round(value, 4) if value is not None else None for key, value in percentiles.items()},
+            "max": round(max(self.latencies), 4) if self.latencies else None,
+        }
+
+class LoadGenerator:
+    """虚拟用户负载生成器"""
+    
+    def __init__(self, virtual_users=LOAD_VIRTUAL_USERS, duration=LOAD_DURATION, ramp_up=LOAD_RAMP_UP,
+                 target_url=LOAD_TARGET_URL, think_time=LOAD_THINK_TIME, allow_public=False):
+        if urlparse(target_url).hostname in LOAD_PUBLIC_HOSTS and not allow_public:
+            raise TestException(f"压测目标 {target_url} 是公共站点，请指向本地部署的SauceDemo，"
+                                f"确需压测公共站点时显式传入 --allow-public")
+        self.virtual_users = virtual_users
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.target_url = target_url if target_url.endswith("/") else target_url + "/"
+        self.think_time = think_time
+        self.steps = {}
+        self.active_users = 0
+        self.peak_users = 0
+    
+    def _stats(self, name):
+        stats = self.steps.get(name)
+        if stats is None:
+            stats = self.steps[name] = StepStats(name)
+        return stats
+    
+    @asynccontextmanager
+    async def step(self, name):
+        """测量一个步骤的耗时，失败时计入该步骤的错误数"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self._stats(name).errors += 1
+            raise
+        self._stats(name).latencies.append(time.perf_counter() - start)
+    
+    async def _journey(self, session, username):
+        """执行一次完整的用户旅程"""
+        from pages.async_page_objects import AsyncLoginPage, AsyncInventoryPage, AsyncCartPage, AsyncCheckoutPage
+        
+        async with self.step("journey"):
+            async with self.step("login"):
+                login_page = await AsyncLoginPage(session, self.target_url).open()
+                await login_page.login(username, PASSWORD)
+                if not await login_page.is_login_success():
+                    raise AssertionError(f"用户 {username} 登录失败")
+            
+            inventory_page = AsyncInventoryPage(session, self.target_url)
+            async with self.step("add_to_cart"):
+                await inventory_page.add_product_by_index(0)
+            async with self.step("go_to_cart"):
+                await inventory_page.go_to_cart()
+            async with self.step("checkout"):
+                await AsyncCartPage(session, self.target_url).checkout()
+            
+            checkout_page = AsyncCheckoutPage(session, self.target_url)
+            async with self.step("fill_checkout_info"):
+                await checkout_page.fill_checkout_info(FIRST_NAME, LAST_NAME, POSTAL_CODE)
+            async with self.step("continue_checkout"):
+                await checkout_page.continue_checkout()
+            async with self.step("finish_checkout"):
+                await checkout_page.finish_checkout()
+                if "checkout-complete" not in await session.current_url():
+                    raise AssertionError(f"用户 {username} 结账流程未完成")
+            
+            async with self.step("logout"):
+                await inventory_page.logout()
+    
+    async def _recover(self, session):
+        """旅程失败后清理登录状态和购物车，下一轮从登录页重新开始"""
+        try:
+            await session.get(self.target_url)
+            await session.delete_all_cookies()
+            await session.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception as e:
+            logger.warning(f"虚拟用户会话恢复失败: {str(e)}")
+    
+    async def _virtual_user(self, manager, index, start, deadline):
+        """单个虚拟用户: 按爬坡进度延迟启动，之后循环执行旅程直到截止时间"""
+        await asyncio.sleep(self.ramp_up * index / self.virtual_users)
+        if time.monotonic() >= deadline:
+            return
+        
+        username = USERNAMES[index % len(USERNAMES)]
+        session = await manager.create_session()
+        self.active_users += 1
+        self.peak_users = max(self.peak_users, self.active_users)
+        logger.info(f"虚拟用户 {index + 1} ({username}) 已启动，当前并发 {self.active_users}，"
+                    f"启动于压测开始后 {time.monotonic() - start:.1f}s")
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    await self._journey(session, username)
+                except Exception as e:
+                    logger.warning(f"虚拟用户 {index + 1} ({username}) 旅程失败: {str(e)}")
+                    await self._recover(session)
+                if self.think_time:
+                    await asyncio.sleep(self.think_time)
+        finally:
+            self.active_users -= 1
+            await session.quit()
+    
+    async def run(self):
+        """运行负载并返回报告"""
+        from core.async_webdriver import AsyncWebDriverManager
+        
+        logger.info(f"开始负载生成: {self.virtual_users} 个虚拟用户, 爬坡 {self.ramp_up}s, "
+                    f"持续 {self.duration}s, 目标 {self.target_url}")
+        manager = AsyncWebDriverManager()
+        await manager.start_service()
+        start = time.monotonic()
+        try:
+            deadline = start + self.duration
+            results = await asyncio.gather(
+                *(self._virtual_user(manager, index, start, deadline) for index in range(self.virtual_users)),
+                return_exceptions=True
+            )
+            for index, result in enumerate(results):
+                if isinstance(result, Exception):
+                    logger.error(f"虚拟用户 {index + 1} 异常退出: {str(result)}")
+        finally:
+            manager.stop_service()
+        return self.report(time.monotonic() - start)
+    
+    def report(self, elapsed):
+        """负载报告: 整体吞吐量和每个步骤的统计"""
+        journey = self._stats("journey")
+        return {
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "target_url": self.target_url,
+            "virtual_users": self.virtual_users,
+            "peak_users": self.peak_users,
+            "ramp_up": self.ramp_up,
+            "duration": self.duration,
+            "elapsed": round(elapsed, 3),
+            "journeys": len(journey.latencies),
+            "journey_errors": journey.errors,
+            "steps": [stats.summary(elapsed) for stats in self.steps.values()],
+        }
+
+def save_load_report(report, directory=LOAD_REPORT_DIR):
+    """保存负载报告为JSON文件"""
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    filepath = os.path.join(directory, f"load_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logger.info(f"负载报告已保存: {filepath}")
+    return filepath
+
+def log_load_report(report):
+    """在日志中输出负载报告表格"""
+    logger.info(f"负载结果: {report['journeys']} 次旅程完成, {report['journey_errors']} 次失败, "
+                f"峰值并发 {report['peak_users']}, 耗时 {report['elapsed']:.1f}s")
+    logger.info(f"{'步骤':<20}{'次数':>8}{'错误率%':>10}{'吞吐/s':>10}" + "".join(f"{f'p{p}(s)':>10}" for p in PERCENTILES))
+    for step in report["steps"]:
+        percentiles = "".join(f"{step[f'p{p}']:>10.3f}" if step[f'p{p}'] is not None else f"{'-':>10}" for p in PERCENTILES)
+        logger.info(f"{step['step']:<20}{step['count']:>8}{step['error_rate']:>10.2f}{step['throughput']:>10.3f}{percentiles}")
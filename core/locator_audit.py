@@ -0,0 +1,290 @@
+"""
+定位器审计 - 在本地替身页面上对页面类中声明的每个定位器做基准测试，寻找更快的等价定位器
+
+对每个定位器:
+    1. 在替身页面 (data/standin/saucedemo.html) 上找到它匹配的元素
+    2. 根据这些元素的id、data-test属性和class生成候选定位器 (ID / data-test CSS / class CSS)
+    3. 只保留匹配完全相同元素集合的候选，在浏览器内用performance.now()测量每次查找的耗时
+    4. 报告每个定位器当前耗时、最快的等价定位器及每次查找节省的时间
+
+--apply 时把明显更快的定位器写入覆盖文件，page_objects导入时通过apply_locator_overrides生效
+(异步页面对象复用同步页面类的定位器，同样生效)。
+"""
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+
+from config import (LOCATOR_STANDIN_PAGE, LOCATOR_OVERRIDES_FILE, LOCATOR_AUDIT_REPORT,
+                    LOCATOR_AUDIT_ITERATIONS, LOCATOR_AUDIT_MIN_SPEEDUP)
+from core.logger_config import logger
+
+# 定位器命名约定: 全大写类属性, 例如 ADD_TO_CART_BUTTON
+LOCATOR_NAME = re.compile(r"^[A-Z][A-Z0-9_]*$")
+# 允许写入覆盖文件的定位方式
+OVERRIDE_STRATEGIES = ("id", "css selector", "class name", "name", "xpath")
+
+# 查找匹配元素 (arguments: 定位方式, 定位值)，XPath用document.evaluate，其余用querySelectorAll
+FIND_SCRIPT = """
+window.__locatorAudit = window.__locatorAudit || function (using, value) {
+    if (using === 'xpath') {
+        var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+        return nodes;
+    }
+    return Array.prototype.slice.call(document.querySelectorAll(value));
+};
+"""
+
+DESCRIBE_SCRIPT = FIND_SCRIPT + """
+return window.__locatorAudit(arguments[0], arguments[1]).map(function (el) {
+    return {tag: el.tagName.toLowerCase(), id: el.id, dataTest: el.getAttribute('data-test'),
+            classes: Array.prototype.slice.call(el.classList)};
+});
+"""
+
+SAME_ELEMENTS_SCRIPT = FIND_SCRIPT + """
+var expected = window.__locatorAudit(arguments[0], arguments[1]);
+var actual = window.__locatorAudit(arguments[2], arguments[3]);
+return expected.length === actual.length && expected.every(function (el, i) { return el === actual[i]; });
+"""
+
+BENCHMARK_SCRIPT = FIND_SCRIPT + """
+var using = arguments[0], value = arguments[1], iterations = arguments[2];
+window.__locatorAudit(using, value);  // 预热
+var start = performance.now();
+for (var i = 0; i < iterations; i++) { window.__locatorAudit(using, value); }
+return (performance.now() - start) * 1000 / iterations;
+"""
+
+@dataclass
+class LocatorCandidate:
+    """候选定位器及其单次查找耗时(微秒)"""
+    by: str
+    value: str
+    micros: float = 0.0
+
+@dataclass
+class LocatorAuditResult:
+    """单个定位器的审计结果"""
+    name: str
+    by: str
+    value: str
+    matches: int = 0
+    micros: float = 0.0
+    candidates: List[LocatorCandidate] = field(default_factory=list)
+    suggestion: Optional[LocatorCandidate] = None
+    note: str = ""
+    
+    @property
+    def saved_micros(self):
+        return self.micros - self.suggestion.micros if self.suggestion else 0.0
+    
+    @property
+    def speedup(self):
+        return self.micros / self.suggestion.micros if self.suggestion and self.suggestion.micros > 0 else 1.0
+
+def load_locator_overrides(filepath=LOCATOR_OVERRIDES_FILE):
+    """读取定位器覆盖文件，返回 {"类名.属性名": (定位方式, 定位值)}"""
+    if not filepath or not os.path.exists(filepath):
+        return {}
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {key: tuple(value) for key, value in data.get("overrides", {}).items()}
+    except Exception as e:
+        logger.warning(f"读取定位器覆盖文件失败，使用默认定位器: {str(e)}")
+        return {}
+
+def apply_locator_overrides(namespace, filepath=LOCATOR_OVERRIDES_FILE):
+    """
+    用覆盖文件中的定位器替换页面类属性
+    
+    Args:
+        namespace: 页面类所在模块的全局命名空间 (page_objects中传入globals())
+        filepath: 覆盖文件路径
+    
+    Returns:
+        int: 生效的覆盖数量
+    """
+    applied = 0
+    for key, (by, value) in load_locator_overrides(filepath).items():
+        class_name, _, attr = key.partition(".")
+        page_class = namespace.get(class_name)
+        if page_class is None or not isinstance(getattr(page_class, attr, None), tuple) or by not in OVERRIDE_STRATEGIES:
+            logger.warning(f"忽略无效的定位器覆盖: {key} -> ({by}, {value})")
+            continue
+        setattr(page_class, attr, (by, value))
+        applied += 1
+    if applied:
+        logger.debug(f"已应用 {applied} 个定位器覆盖: {filepath}")
+    return applied
+
+def collect_page_locators(module=None):
+    """
+    收集页面类中声明的定位器
+    
+    Returns:
+        list: [("类名.属性名", 定位方式, 定位值)]，按类和声明顺序排列
+    """
+    if module is None:
+        from pages import page_objects as module
+    locators = []
+    for class_name, page_class in vars(module).items():
+        if not isinstance(page_class, type) or not issubclass(page_class, module.BasePage) or page_class is module.BasePage:
+            continue
+        for attr, value in vars(page_class).items():
+            if (LOCATOR_NAME.match(attr) and isinstance(value, tuple) and len(value) == 2
+                    and all(isinstance(part, str) for part in value)):
+                locators.append((f"{class_name}.{attr}", value[0], value[1]))
+    return locators
+
+def _css_string(text):
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+def _common_prefix(values):
+    """多个data-test值在 '-' 边界处的最长公共前缀 (如 add-to-cart-xxx -> add-to-cart-)"""
+    prefix = os.path.commonprefix(values)
+    return prefix[:prefix.rfind("-") + 1]
+
+def generate_candidates(elements):
+    """
+    根据匹配元素的特征生成候选定位器 (尚未验证是否等价)
+    
+    Args:
+        elements: DESCRIBE_SCRIPT返回的元素描述列表
+    """
+    candidates = []
+    tags = {element["tag"] for element in elements}
+    tag = tags.pop() if len(tags) == 1 else ""
+    
+    if len(elements) == 1 and elements[0]["id"]:
+        candidates.append(LocatorCandidate("id", elements[0]["id"]))
+    
+    data_tests = [element["dataTest"] for element in elements]
+    if all(data_tests):
+        if len(set(data_tests)) == 1:
+            candidates.append(LocatorCandidate("css selector", f"{tag}[data-test={_css_string(data_tests[0])}]"))
+        else:
+            prefix = _common_prefix(data_tests)
+            if prefix:
+                candidates.append(LocatorCandidate("css selector", f"{tag}[data-test^={_css_string(prefix)}]"))
+    
+    common_classes = set.intersection(*(set(element["classes"]) for element in elements))
+    for class_name in sorted(common_classes):
+        if re.match(r"^[A-Za-z_][\w-]*$", class_name):
+            candidates.append(LocatorCandidate("css selector", f"{tag}.{class_name}"))
+    return candidates
+
+class LocatorAuditor:
+    """定位器审计器"""
+    
+    def __init__(self, driver, iterations=LOCATOR_AUDIT_ITERATIONS, min_speedup=LOCATOR_AUDIT_MIN_SPEEDUP):
+        self.driver = driver
+        self.iterations = iterations
+        self.min_speedup = min_speedup
+    
+    def open_standin(self, page=LOCATOR_STANDIN_PAGE):
+        """打开本地替身页面"""
+        from pathlib import Path
+        uri = Path(page).resolve().as_uri()
+        self.driver.get(uri)
+        logger.info(f"已打开定位器审计替身页面: {uri}")
+    
+    def _w3c(self, by, value):
+        from core.async_webdriver import to_w3c_locator
+        return to_w3c_locator(by, value)
+    
+    def benchmark(self, by, value):
+        """定位器在浏览器内单次查找的平均耗时(微秒)"""
+        return self.driver.execute_script(BENCHMARK_SCRIPT, *self._w3c(by, value), self.iterations)
+    
+    def audit_locator(self, name, by, value):
+        """审计单个定位器"""
+        result = LocatorAuditResult(name=name, by=by, value=value)
+        using, w3c_value = self._w3c(by, value)
+        try:
+            elements = self.driver.execute_script(DESCRIBE_SCRIPT, using, w3c_value)
+        except Exception as e:
+            result.note = f"定位器执行失败: {str(e).splitlines()[0]}"
+            return result
+        
+        result.matches = len(elements)
+        if not elements:
+            result.note = "替身页面上没有匹配元素"
+            return result
+        result.micros = self.benchmark(by, value)
+        
+        for candidate in generate_candidates(elements):
+            if (candidate.by, candidate.value) == (by, value):
+                continue
+            if not self.driver.execute_script(SAME_ELEMENTS_SCRIPT, using, w3c_value, *self._w3c(candidate.by, candidate.value)):
+                continue
+            candidate.micros = self.benchmark(candidate.by, candidate.value)
+            result.candidates.append(candidate)
+        
+        fastest = min(result.candidates, key=lambda candidate: candidate.micros, default=None)
+        if fastest and fastest.micros * self.min_speedup <= result.micros:
+            result.suggestion = fastest
+        return result
+    
+    def run(self, locators=None):
+        """审计所有页面类定位器"""
+        self.open_standin()
+        results = []
+        for name, by, value in (locators or collect_page_locators()):
+            result = self.audit_locator(name, by, value)
+            results.append(result)
+            if result.suggestion:
+                logger.info(f"⚡ {name}: ({by}, {value}) {result.micros:.2f}µs -> "
+                            f"({result.suggestion.by}, {result.suggestion.value}) {result.suggestion.micros:.2f}µs "
+                            f"(每次查找节省 {result.saved_micros:.2f}µs, {result.speedup:.1f}x)")
+            elif result.note:
+                logger.warning(f"{name}: {result.note}")
+            else:
+                logger.debug(f"{name}: ({by}, {value}) {result.micros:.2f}µs，没有更快的等价定位器")
+        return results
+
+def save_audit_report(results, filepath=LOCATOR_AUDIT_REPORT):
+    """保存审计报告"""
+    directory = os.path.dirname(filepath)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    
+    data = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "standin_page": LOCATOR_STANDIN_PAGE,
+        "iterations": LOCATOR_AUDIT_ITERATIONS,
+        "total_saved_micros": round(sum(result.saved_micros for result in results), 3),
+        "locators": [
+            dict(asdict(result), saved_micros=round(result.saved_micros, 3), speedup=round(result.speedup, 2))
+            for result in results
+        ],
+    }
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    logger.info(f"定位器审计报告已保存: {filepath}")
+    return filepath
+
+def register_overrides(results, filepath=LOCATOR_OVERRIDES_FILE):
+    """将建议的定位器合并写入覆盖文件，返回新增/更新的覆盖数量"""
+    overrides = load_locator_overrides(filepath)
+    updated = 0
+    for result in results:
+        if result.suggestion:
+            overrides[result.name] = (result.suggestion.by, result.suggestion.value)
+            updated += 1
+    
+    directory = os.path.dirname(filepath)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump({
+            "updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "overrides": {key: list(value) for key, value in sorted(overrides.items())},
+        }, f, ensure_ascii=False, indent=2)
+    logger.info(f"已注册 {updated} 个定位器覆盖: {filepath}")
+    return updated
@@ -0,0 +1,88 @@
+"""
+日志合并 - 将并行worker各自的日志文件按时间合并为一条统一的时间线
+
+每个worker的日志本身按时间有序，使用heapq.merge做多路归并，只需逐行流式读取，
+不需要把所有日志载入内存。多行日志 (如异常堆栈) 作为一条记录整体参与排序。
+"""
+import glob
+import heapq
+import os
+import re
+
+from core.logger_config import logger
+
+# 日志记录的起始行: "2024-01-01 12:00:00,123 - ..."
+RECORD_START = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - ")
+
+def iter_log_records(filepath):
+    """
+    逐条读取日志记录
+    
+    Yields:
+        tuple: (时间戳, 记录文本)，续行合并到上一条记录
+    """
+    timestamp = None
+    lines = []
+    with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = RECORD_START.match(line)
+            if match:
+                if lines:
+                    yield timestamp, "".join(lines)
+                timestamp = match.group(1)
+                lines = [line]
+            elif lines:
+                lines.append(line)
+            else:
+                # 文件开头没有时间戳的内容 (如worker启动前的输出)，排在最前
+                timestamp = ""
+                lines = [line]
+    if lines:
+        yield timestamp, "".join(lines)
+
+def _tagged_records(index, filepath):
+    """为记录加上文件序号: (时间戳, 序号, 记录文本)，序号在创建生成器时绑定"""
+    for timestamp, text in iter_log_records(filepath):
+        yield timestamp, index, text
+
+def merge_logs(log_files, output_path):
+    """
+    将多个日志文件按时间戳合并为一个文件
+    
+    Args:
+        log_files: 日志文件路径列表
+        output_path: 合并后的时间线文件路径
+    
+    Returns:
+        int: 合并的日志记录条数
+    """
+    existing = [path for path in log_files if os.path.exists(path)]
+    missing = set(log_files) - set(existing)
+    for path in sorted(missing):
+        logger.warning(f"日志文件不存在，跳过合并: {path}")
+    
+    # 时间戳相同时按文件顺序 (worker编号) 排列，保持合并结果稳定
+    streams = [_tagged_records(index, path) for index, path in enumerate(existing)]
+    
+    directory = os.path.dirname(output_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as output:
+        for _, _, text in heapq.merge(*streams):
+            output.write(text if text.endswith("\n") else text + "\n")
+            count += 1
+    
+    logger.info(f"已合并 {len(existing)} 个日志文件，共 {count} 条记录: {output_path}")
+    return count
+
+def merge_log_dir(directory, pattern="worker_*.log", output_name="merged_timeline.log"):
+    """合并目录下所有worker日志，返回合并后的文件路径"""
+    log_files = sorted(glob.glob(os.path.join(directory, pattern)))
+    if not log_files:
+        logger.warning(f"目录中没有找到worker日志: {directory}")
+        return None
+    output_path = os.path.join(directory, output_name)
+    merge_logs(log_files, output_path)
+    return output_path
@@ -3,8 +3,40 @@
 """
 import logging
 import os
+import threading
 from datetime import datetime
-from config import LOGS_DIR
+from config import LOGS_DIR, WORKER_ID_ENV, WORKER_LOG_FILE_ENV
+
+# 日志行格式，以时间戳开头便于多个worker的日志按时间合并
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(worker_id)s|%(test_id)s] - %(funcName)s:%(lineno)d - %(message)s'
+
+class LogContextFilter(logging.Filter):
+    """为每条日志添加worker编号和当前测试用例ID (用例ID按线程保存，同一进程内多线程执行用例时互不干扰)"""
+    
+    def __init__(self, worker_id):
+        super().__init__()
+        self.worker_id = worker_id
+        self._local = threading.local()
+    
+    @property
+    def test_id(self):
+        return getattr(self._local, "test_id", "-")
+    
+    @test_id.setter
+    def test_id(self, value):
+        self._local.test_id = value
+    
+    def filter(self, record):
+        record.worker_id = self.worker_id
+        record.test_id = self.test_id
+        return True
+
+# 当前进程的日志上下文 (并行模式下由run_tests通过环境变量传入worker编号)
+log_context = LogContextFilter(os.environ.get(WORKER_ID_ENV, "main"))
+
+def set_log_test_id(test_id=None):
+    """设置当前测试用例ID，之后的日志都带上该ID"""
+    log_context.test_id = test_id or "-"
 
 def setup_logger():
     """设置日志配置"""
@@ -12,14 +44,18 @@ def setup_logger():
     if not os.path.exists(LOGS_DIR):
         os.makedirs(LOGS_DIR)
     
-    # 生成日志文件名
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_filename = os.path.join(LOGS_DIR, f"test_execution_{timestamp}.log")
+    # 生成日志文件名: 并行worker使用主进程分配的独立文件，避免多个进程写同一文件或文件名冲突
+    log_filename = os.environ.get(WORKER_LOG_FILE_ENV)
+    if log_filename:
+        directory = os.path.dirname(log_filename)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        log_filename = os.path.join(LOGS_DIR, f"test_execution_{timestamp}.log")
     
     # 配置日志格式
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
-    )
+    formatter = logging.Formatter(LOG_FORMAT)
     
     # 配置根logger
     logger = logging.getLogger()
@@ -33,15 +69,37 @@ def setup_logger():
     file_handler = logging.FileHandler(log_filename, encoding='utf-8')
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(formatter)
+    file_handler.addFilter(log_context)
     logger.addHandler(file_handler)
     
     # 控制台处理器
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
+    console_handler.addFilter(log_context)
     logger.addHandler(console_handler)
     
     return logger
 
-# 创建全局logger实例
-logger = setup_logger()
\ No newline at end of file
+class _LazyLogger:
+    """全局logger代理: 第一次记录日志时才创建日志目录和日志文件"""
+    
+    def __init__(self):
+        self._logger = None
+        self._lock = threading.Lock()
+    
+    def _get_logger(self):
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    self._logger = setup_logger()
+        return self._logger
+    
+    def __getattr__(self, name):
+        # pytest收集用例时会探测模块中对象的特殊属性 (如 __bases__)，这不应触发日志文件的创建
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self._get_logger(), name)
+
+# 创建全局logger实例 (延迟初始化)
+logger = _LazyLogger()
\ No newline at end of file
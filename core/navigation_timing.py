@@ -0,0 +1,114 @@
+"""
+浏览器端导航计时 - 每次页面导航/跳转后读取浏览器的Navigation Timing和Resource Timing数据
+
+测试端测得的耗时包含WebDriver往返和等待轮询，看不出被测页面本身加载了多久。
+整页加载时记录首字节 (TTFB)、DOMContentLoaded和load事件时间；SauceDemo是单页应用，
+商品页 -> 购物车 -> 结账等站内跳转不产生新的导航，此时只记录跳转期间新加载的资源。
+计时先暂存在执行线程中，由conftest在用例结束时标上测试功能和用户后交给报告器汇总。
+"""
+import threading
+import weakref
+from datetime import datetime
+
+from config import NAVIGATION_TIMING
+from core.logger_config import logger
+from reports.test_reporter import NavigationTiming
+
+# arguments[0]/[1]: 上次采集时文档的timeOrigin和已读取的资源条数，文档变化 (整页加载) 后从头读取
+CAPTURE_SCRIPT = """
+var origin = performance.timeOrigin || performance.timing.navigationStart;
+var entries = performance.getEntriesByType('resource');
+var since = origin === arguments[0] && arguments[1] <= entries.length ? arguments[1] : 0;
+var nav = performance.getEntriesByType('navigation')[0];
+var t = performance.timing;
+var navigation = nav
+    ? {ttfb: nav.responseStart, dcl: nav.domContentLoadedEventEnd, load: nav.loadEventEnd}
+    : {ttfb: t.responseStart - t.navigationStart, dcl: t.domContentLoadedEventEnd - t.navigationStart,
+       load: t.loadEventEnd ? t.loadEventEnd - t.navigationStart : 0};
+var resources = [];
+for (var i = since; i < entries.length; i++) {
+    resources.push([entries[i].name, entries[i].duration, entries[i].transferSize || 0]);
+}
+return {origin: origin, url: location.href, navigation: navigation, resources: resources, count: entries.length};
+"""
+
+def _ms(value):
+    """浏览器计时为0表示该阶段尚未发生"""
+    return round(value, 1) if value else None
+
+class NavigationTimingCollector:
+    """浏览器端导航计时采集器"""
+    
+    def __init__(self, enabled=NAVIGATION_TIMING):
+        self.enabled = enabled
+        # 每个浏览器当前文档的 (timeOrigin, 已读取资源条数)
+        self._documents = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def capture(self, driver, page, duration=None):
+        """
+        采集一次导航/跳转的浏览器端计时
+        
+        Args:
+            driver: WebDriver实例
+            page: 页面或跳转操作名称
+            duration: 测试端测得的耗时(秒)
+        
+        Returns:
+            NavigationTiming: 计时结果，未开启或采集失败时返回None
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            origin, seen = self._documents.get(driver, (None, 0))
+        try:
+            data = driver.execute_script(CAPTURE_SCRIPT, origin, seen)
+        except Exception as e:
+            # 计时只用于统计，采集失败不影响测试
+            logger.debug(f"采集导航计时失败: {str(e)}")
+            return None
+        with self._lock:
+            self._documents[driver] = (data["origin"], data["count"])
+        
+        navigation = data["navigation"] if data["origin"] != origin else {}
+        resources = data["resources"]
+        slowest = max(resources, key=lambda resource: resource[1]) if resources else None
+        timing = NavigationTiming(
+            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            test_name="",
+            username="",
+            page=page,
+            url=data["url"],
+            kind="navigation" if navigation else "transition",
+            ttfb_ms=_ms(navigation.get("ttfb")),
+            dom_content_loaded_ms=_ms(navigation.get("dcl")),
+            load_ms=_ms(navigation.get("load")),
+            duration_ms=round(duration * 1000, 1) if duration is not None else None,
+            resource_count=len(resources),
+            resource_bytes=int(sum(resource[2] for resource in resources)),
+            slowest_resource=slowest[0] if slowest else "",
+            slowest_resource_ms=_ms(slowest[1]) if slowest else None,
+        )
+        self._pending().append(timing)
+        logger.debug(f"导航计时 {page} ({timing.kind}): TTFB {timing.ttfb_ms}ms, load {timing.load_ms}ms, "
+                     f"资源 {timing.resource_count} 个")
+        return timing
+    
+    def _pending(self):
+        pending = getattr(self._local, "pending", None)
+        if pending is None:
+            pending = self._local.pending = []
+        return pending
+    
+    def drain(self, test_name, username):
+        """取出当前线程暂存的计时并标上测试功能和用户"""
+        timings = self._pending()
+        self._local.pending = []
+        for timing in timings:
+            timing.test_name = test_name
+            timing.username = username
+        return timings
+
+# 全局导航计时采集器实例
+navigation_timing = NavigationTimingCollector()
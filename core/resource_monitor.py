@@ -0,0 +1,107 @@
+"""
+资源监控 - 在测试边界采样浏览器/驱动进程的内存与CPU以及页面JS堆大小，
+并在超过阈值时建议回收 (重启) 浏览器会话
+
+每个会话上下文持有自己的监控器 (SessionContext.resources)，回收计数和回收原因只对该上下文的浏览器生效。
+"""
+from datetime import datetime
+
+try:
+    import psutil
+except ImportError:  # psutil为可选依赖，缺失时只采集JS堆大小
+    psutil = None
+
+from config import RECYCLE_BROWSER_RSS_MB, RECYCLE_JS_HEAP_MB, RECYCLE_AFTER_TESTS
+from core.logger_config import logger
+from reports.test_reporter import ResourceSample
+
+# Chromium内核浏览器通过performance.memory暴露JS堆大小
+JS_HEAP_SCRIPT = "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : null;"
+
+class ResourceMonitor:
+    """资源监控器"""
+    
+    def __init__(self):
+        self.tests_since_recycle = 0
+        self._processes = {}
+        self._recycle_reason = None
+        self._psutil_warned = False
+    
+    def _driver_processes(self, driver):
+        """获取驱动进程及其启动的浏览器进程，Process对象会被缓存以计算CPU占用"""
+        try:
+            driver_pid = driver.service.process.pid
+        except Exception:
+            return None, []
+        
+        process = self._processes.get(driver_pid)
+        if process is None:
+            self._processes.clear()
+            process = self._processes[driver_pid] = psutil.Process(driver_pid)
+            process.cpu_percent(None)
+        
+        browsers = []
+        for child in process.children(recursive=True):
+            cached = self._processes.get(child.pid)
+            if cached is None:
+                cached = self._processes[child.pid] = child
+                child.cpu_percent(None)
+            browsers.append(cached)
+        return process, browsers
+    
+    def sample(self, driver, test_name="", username=""):
+        """采样一次资源占用"""
+        driver_rss_mb = browser_rss_mb = cpu_percent = js_heap_mb = None
+        
+        if psutil is None and not self._psutil_warned:
+            self._psutil_warned = True
+            logger.warning("未安装psutil，资源监控只采集JS堆大小 (pip install psutil)")
+        
+        if psutil is not None:
+            try:
+                driver_process, browsers = self._driver_processes(driver)
+                if driver_process is not None:
+                    driver_rss_mb = driver_process.memory_info().rss / 1024 / 1024
+                    browser_rss_mb = sum(p.memory_info().rss for p in browsers) / 1024 / 1024
+                    cpu_percent = driver_process.cpu_percent(None) + sum(p.cpu_percent(None) for p in browsers)
+            except Exception as e:
+                logger.debug(f"采集进程资源失败: {str(e)}")
+        
+        try:
+            js_heap = driver.execute_script(JS_HEAP_SCRIPT)
+            if js_heap is not None:
+                js_heap_mb = js_heap / 1024 / 1024
+        except Exception as e:
+            logger.debug(f"采集JS堆大小失败: {str(e)}")
+        
+        sample = ResourceSample(
+            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            test_name=test_name,
+            username=username,
+            driver_rss_mb=driver_rss_mb,
+            browser_rss_mb=browser_rss_mb,
+            cpu_percent=cpu_percent,
+            js_heap_mb=js_heap_mb,
+        )
+        self.tests_since_recycle += 1
+        self._check_thresholds(sample)
+        logger.debug(f"资源采样: {sample}")
+        return sample
+    
+    def _check_thresholds(self, sample):
+        if RECYCLE_BROWSER_RSS_MB and sample.browser_rss_mb and sample.browser_rss_mb > RECYCLE_BROWSER_RSS_MB:
+            self._recycle_reason = f"浏览器内存 {sample.browser_rss_mb:.0f}MB 超过阈值 {RECYCLE_BROWSER_RSS_MB}MB"
+        elif RECYCLE_JS_HEAP_MB and sample.js_heap_mb and sample.js_heap_mb > RECYCLE_JS_HEAP_MB:
+            self._recycle_reason = f"JS堆 {sample.js_heap_mb:.0f}MB 超过阈值 {RECYCLE_JS_HEAP_MB}MB"
+        elif RECYCLE_AFTER_TESTS and self.tests_since_recycle >= RECYCLE_AFTER_TESTS:
+            self._recycle_reason = f"会话已执行 {self.tests_since_recycle} 个测试用例"
+    
+    def should_recycle(self):
+        """是否需要回收浏览器会话，返回原因，不需要时返回None"""
+        return self._recycle_reason
+    
+    def mark_recycled(self):
+        """浏览器会话已回收，重置计数"""
+        self.tests_since_recycle = 0
+        self._recycle_reason = None
+        self._processes.clear()
@@ -0,0 +1,106 @@
+"""
+会话上下文 - 每个执行线程独立的浏览器会话状态 (驱动、当前用户、用户轮换序号、资源监控、流水线备用浏览器等)
+
+conftest原先把这些状态放在模块级字典和函数属性里，同一进程内多个线程执行用例时会互相覆盖。
+现在每个线程通过 session_contexts.current() 取得自己的上下文，生命周期由conftest的钩子显式驱动:
+    open      会话开始，绑定该线程的浏览器
+    begin_test / finish_test   用例开始/结束，维护用户轮换序号
+    close     会话结束，从注册表移除
+其余按用例记录的状态也不跨线程共享: 操作时间线、延迟测量和导航计时按线程保存，看门狗按上下文分别计时和回收。
+"""
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from core.logger_config import logger
+from core.resource_monitor import ResourceMonitor
+from core.session_pipeline import SessionPipeline
+
+# eq=False: 上下文按对象身份区分，字段相同的两个线程的上下文不能视为同一个
+@dataclass(eq=False)
+class SessionContext:
+    """一个执行线程的浏览器会话状态"""
+    name: str
+    driver: Any = None
+    current_user: Optional[str] = None
+    user_index: int = 0
+    pages: dict = field(default_factory=dict)
+    attached: bool = False  # 是否为接管的守护进程浏览器 (结束时不关闭)
+    user_contexts: bool = False  # 是否每个用户使用独立的浏览器上下文
+    next_item: Any = None  # 下一个用例 (流水线模式据此推算下一个用户)
+    last_test_name: Optional[str] = None
+    latency_mark: int = 0  # 用例开始时的延迟测量位置 (强制延迟预算只检查用例期间的测量)
+    resources: ResourceMonitor = field(default_factory=ResourceMonitor)
+    pipeline: SessionPipeline = field(default_factory=SessionPipeline)
+    
+    def bind_driver(self, driver, attached=False):
+        """绑定浏览器 (会话开始或浏览器被回收重建后)，新浏览器中尚未登录任何用户"""
+        self.driver = driver
+        self.attached = attached
+        self.current_user = None
+        self.pages = {}
+    
+    def begin_test(self, test_name):
+        """
+        用例开始: 每个测试功能从第一个用户开始轮换
+        
+        Returns:
+            bool: 是否为新的测试功能
+        """
+        if self.last_test_name == test_name:
+            return False
+        self.user_index = 0
+        self.last_test_name = test_name
+        return True
+    
+    def finish_test(self):
+        """用例结束: 下个用例使用下一个用户"""
+        self.user_index += 1
+
+class SessionContextRegistry:
+    """会话上下文注册表 - 按线程保存当前上下文，并记录所有打开的上下文供会话结束时清理"""
+    
+    def __init__(self):
+        self._local = threading.local()
+        self._contexts = []
+        self._lock = threading.Lock()
+    
+    def current(self):
+        """当前线程的会话上下文，尚未打开时自动创建"""
+        context = getattr(self._local, "context", None)
+        if context is None:
+            context = self.open()
+        return context
+    
+    def open(self, name=None):
+        """为当前线程打开新的会话上下文"""
+        context = SessionContext(name or threading.current_thread().name)
+        self._local.context = context
+        with self._lock:
+            self._contexts.append(context)
+        logger.debug(f"打开会话上下文: {context.name}")
+        return context
+    
+    def activate(self, context):
+        """让当前线程使用已有的会话上下文 (如把用例交给其他线程执行)"""
+        self._local.context = context
+    
+    def close(self, context=None):
+        """关闭会话上下文 (默认当前线程的)，之后该线程再次访问时会创建新的上下文"""
+        context = context or getattr(self._local, "context", None)
+        if context is None:
+            return
+        with self._lock:
+            if context in self._contexts:
+                self._contexts.remove(context)
+        if getattr(self._local, "context", None) is context:
+            self._local.context = None
+        logger.debug(f"关闭会话上下文: {context.name}")
+    
+    def all(self):
+        """所有打开的会话上下文"""
+        with self._lock:
+            return list(self._contexts)
+
+# 全局会话上下文注册表实例
+session_contexts = SessionContextRegistry()
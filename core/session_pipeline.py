@@ -0,0 +1,151 @@
+"""
+流水线会话准备 - 用两个浏览器交替执行用例，把下一个用例的登录准备隐藏在当前用例的执行时间里
+
+当前用例在活动浏览器中执行时，后台线程在备用浏览器中登出上一个用户 (同时重置应用状态) 并登录下一个用例的用户，
+停在商品页。到了用例边界，如果下一个用例的用户正是备用浏览器准备好的用户，两个浏览器直接交换，
+用户切换不再占用关键路径；预测落空或准备失败时退回原来的登出/登录流程。
+每个会话上下文持有自己的流水线 (SessionContext.pipeline)，多个线程执行用例时各自使用自己的备用浏览器。
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from config import BASE_URL, PASSWORD, PIPELINE_PREPARE_TIMEOUT
+from core.exceptions import TestException
+from core.logger_config import logger
+from core.navigation_timing import navigation_timing
+
+class SessionPipeline:
+    """双浏览器流水线"""
+    
+    def __init__(self, prepare_timeout=PIPELINE_PREPARE_TIMEOUT):
+        self.prepare_timeout = prepare_timeout
+        self.standby = None
+        self.standby_user = None
+        self.swaps = 0
+        self.misses = 0
+        self.hidden_time = 0.0
+        self._create_driver = None
+        self._executor = None
+        self._pending = None
+        self._standby_dead = False
+    
+    @property
+    def active(self):
+        return self._executor is not None
+    
+    def start(self, create_driver):
+        """启动备用浏览器 (create_driver在浏览器被终止后也用于重建备用浏览器)"""
+        self._create_driver = create_driver
+        self.standby = create_driver()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-pipeline")
+        logger.info("流水线模式已开启: 备用浏览器将在后台为下一个用例登录")
+    
+    def prepare(self, username):
+        """在后台让备用浏览器登录指定用户 (已在准备同一用户时不重复提交)"""
+        if not self.active or username is None:
+            return
+        if self._pending and self._pending[0] == username:
+            return
+        self._discard_pending()
+        self._pending = (username, self._executor.submit(self._prepare, username))
+    
+    def _prepare(self, username):
+        """后台线程: 登出备用浏览器中的上一个用户并登录新用户，返回耗时"""
+        from pages.page_objects import LoginPage, InventoryPage
+        
+        start = time.perf_counter()
+        if self._standby_dead:
+            self.standby = self._create_driver()
+            self.standby_user = None
+            self._standby_dead = False
+        
+        if self.standby_user is not None:
+            try:
+                # 登出时同时重置应用状态，清理上一个用例留下的购物车
+                InventoryPage(self.standby).logout()
+            except Exception as e:
+                logger.warning(f"备用浏览器登出用户 {self.standby_user} 失败: {str(e)}")
+                self.standby.get(BASE_URL)
+        else:
+            self.standby.get(BASE_URL)
+        self.standby_user = None
+        
+        # 延迟统计的当前用户按线程保存，后台登录不影响活动浏览器中的用例
+        login_page = LoginPage(self.standby)
+        login_page.login(username, PASSWORD)
+        if not login_page.is_login_success():
+            raise TestException(f"用户 {username} 登录失败")
+        self.standby_user = username
+        # 后台登录的页面计时不属于任何用例，丢弃
+        navigation_timing.drain("", username)
+        logger.info(f"备用浏览器已为用户 {username} 准备就绪")
+        return time.perf_counter() - start
+    
+    def _discard_pending(self):
+        """丢弃预测落空的准备任务 (任务仍在后台执行完，备用浏览器下次准备时重新登录)"""
+        if self._pending:
+            username, future = self._pending
+            self._pending = None
+            if not future.cancel():
+                self.misses += 1
+                logger.debug(f"丢弃为用户 {username} 的备用浏览器准备")
+    
+    def swap(self, username, driver, current_user):
+        """
+        用例边界: 备用浏览器已为username准备好时与活动浏览器交换
+        
+        Args:
+            username: 当前用例的用户
+            driver: 活动浏览器，交换后成为备用浏览器
+            current_user: 活动浏览器中已登录的用户
+        
+        Returns:
+            WebDriver: 已登录username的浏览器，无法交换时返回None (调用方按原流程切换用户)
+        """
+        if not self.active or not self._pending or self._pending[0] != username:
+            self._discard_pending()
+            return None
+        _, future = self._pending
+        self._pending = None
+        start = time.perf_counter()
+        try:
+            prepare_time = future.result(timeout=self.prepare_timeout)
+        except FutureTimeoutError:
+            logger.error(f"备用浏览器为用户 {username} 准备超过 {self.prepare_timeout}s，终止并在下次准备时重建")
+            from core.watchdog import TestWatchdog
+            TestWatchdog.kill_driver(self.standby)
+            self._standby_dead = True
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"备用浏览器为用户 {username} 准备失败，改为在当前浏览器中切换用户: {str(e)}")
+            self.misses += 1
+            return None
+        
+        waited = time.perf_counter() - start
+        prepared, self.standby, self.standby_user = self.standby, driver, current_user
+        self.swaps += 1
+        self.hidden_time += max(prepare_time - waited, 0.0)
+        logger.info(f"切换到已为用户 {username} 准备好的备用浏览器，等待 {waited:.3f}s (准备耗时 {prepare_time:.3f}s)")
+        return prepared
+    
+    def close(self):
+        """关闭备用浏览器"""
+        if not self.active:
+            return
+        from core.webdriver_utils import WebDriverManager
+        if self._pending:
+            self._pending[1].cancel()
+            self._pending = None
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        if not self._standby_dead:
+            WebDriverManager.close_driver(self.standby)
+        self.standby = None
+        self.standby_user = None
+    
+    def log_summary(self):
+        """在日志中输出流水线命中情况"""
+        if self.swaps or self.misses:
+            logger.info(f"流水线会话准备: 交换 {self.swaps} 次, 未命中 {self.misses} 次, "
+                        f"隐藏的准备耗时 {self.hidden_time:.1f}s")
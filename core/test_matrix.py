@@ -0,0 +1,115 @@
+"""
+数据驱动测试矩阵 - 从CSV或JSONL文件流式加载测试数据 (用户、商品组合、结账信息、排序方式)
+
+收集阶段只扫描一次文件并记录每条数据的字节偏移量和case_id (作为pytest用例ID)，
+测试执行时才按偏移量读取对应的一行，数据集再大也不需要一次性载入内存。
+"""
+import csv
+import json
+import os
+from array import array
+from dataclasses import dataclass, field
+from typing import List
+
+from config import FIRST_NAME, LAST_NAME, POSTAL_CODE
+from core.exceptions import TestException
+
+@dataclass
+class MatrixCase:
+    """测试矩阵中的一条数据"""
+    case_id: str
+    username: str
+    products: List[int] = field(default_factory=list)
+    first_name: str = FIRST_NAME
+    last_name: str = LAST_NAME
+    postal_code: str = POSTAL_CODE
+    sort_option: str = "az"
+    
+    @classmethod
+    def from_record(cls, record, default_id):
+        """由CSV/JSONL记录构造，缺失字段使用配置中的默认值"""
+        products = record.get("products") or []
+        if isinstance(products, str):
+            # CSV中商品索引以分号分隔，例如 "0;2;4"
+            products = [int(index) for index in products.split(";") if index.strip()]
+        return cls(
+            case_id=str(record.get("case_id") or default_id),
+            username=record["username"],
+            products=[int(index) for index in products],
+            first_name=record.get("first_name") or FIRST_NAME,
+            last_name=record.get("last_name") or LAST_NAME,
+            postal_code=str(record.get("postal_code") or POSTAL_CODE),
+            sort_option=record.get("sort_option") or "az",
+        )
+
+class TestMatrix:
+    """测试矩阵文件索引"""
+    
+    def __init__(self, filepath):
+        if not os.path.exists(filepath):
+            raise TestException(f"测试矩阵文件不存在: {filepath}")
+        self.filepath = filepath
+        self.format = "csv" if filepath.lower().endswith(".csv") else "jsonl"
+        self.fieldnames = None
+        self.offsets = array("q")
+        self.case_ids = []
+        self._build_index()
+    
+    def _build_index(self):
+        """扫描文件，记录每条数据行的起始偏移量和case_id (跳过空行和#注释行)"""
+        with open(self.filepath, 'rb') as f:
+            if self.format == "csv":
+                header = f.readline().decode("utf-8-sig")
+                self.fieldnames = next(csv.reader([header]))
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                stripped = line.strip()
+                if stripped and not stripped.startswith(b"#"):
+                    self.case_ids.append(self._case_id(line, len(self.offsets)))
+                    self.offsets.append(offset)
+    
+    def _case_id(self, line, index):
+        """数据行的case_id，缺失或该行无法解析时使用序号 (解析错误留到执行时报告)"""
+        try:
+            text = line.decode("utf-8")
+            if self.format == "csv":
+                record = next(csv.DictReader([text], fieldnames=self.fieldnames))
+            else:
+                record = json.loads(text)
+            case_id = record.get("case_id")
+        except Exception:
+            case_id = None
+        return str(case_id) if case_id else f"case{index}"
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    def ids(self):
+        """pytest参数化用例ID (数据中的case_id)"""
+        return list(self.case_ids)
+    
+    def load(self, index):
+        """按序号读取一条数据"""
+        with open(self.filepath, 'rb') as f:
+            return self._read(f, index)
+    
+    def _read(self, f, index):
+        f.seek(self.offsets[index])
+        line = f.readline().decode("utf-8")
+        try:
+            if self.format == "csv":
+                record = next(csv.DictReader([line], fieldnames=self.fieldnames))
+            else:
+                record = json.loads(line)
+            return MatrixCase.from_record(record, f"case{index}")
+        except Exception as e:
+            raise TestException(f"解析测试矩阵第 {index} 条数据失败: {self.filepath}", e)
+    
+    def __iter__(self):
+        """按顺序流式遍历所有数据"""
+        with open(self.filepath, 'rb') as f:
+            for index in range(len(self.offsets)):
+                yield self._read(f, index)
@@ -0,0 +1,255 @@
+"""
+依赖感知的测试选择 - 通过追踪一次完整运行，记录每个测试用例调用到的页面对象方法和核心函数，
+之后根据 git diff 只选择受改动影响的测试用例
+"""
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+
+from core.logger_config import logger
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 需要追踪调用关系的源码目录
+TRACED_DIRS = ("pages", "core")
+
+# 改动后不影响测试结果的文件
+IGNORED_SUFFIXES = (".md", ".txt")
+
+def _relpath(filename):
+    return os.path.relpath(filename, PROJECT_ROOT).replace(os.sep, "/")
+
+class DependencyTracer:
+    """依赖追踪器 - 使用sys.setprofile记录测试执行期间调用到的页面对象/核心函数"""
+    
+    def __init__(self):
+        self.dependencies = {}
+        self._current = None
+        self._code_cache = {}
+        self._traced_prefixes = tuple(os.path.join(PROJECT_ROOT, d) + os.sep for d in TRACED_DIRS)
+    
+    def _symbol_for(self, code):
+        """将代码对象映射为 '文件::限定名' 形式的符号，非追踪目录返回None"""
+        try:
+            return self._code_cache[code]
+        except KeyError:
+            symbol = None
+            if code.co_filename.startswith(self._traced_prefixes) and code.co_filename != __file__:
+                symbol = f"{_relpath(code.co_filename)}::{code.co_qualname}"
+            self._code_cache[code] = symbol
+            return symbol
+    
+    def _profile(self, frame, event, arg):
+        if event == "call":
+            symbol = self._symbol_for(frame.f_code)
+            if symbol:
+                self._current.add(symbol)
+    
+    def start(self, test_id):
+        """开始追踪一个测试用例"""
+        self._current = self.dependencies.setdefault(test_id, set())
+        sys.setprofile(self._profile)
+    
+    def stop(self):
+        """停止追踪当前测试用例"""
+        sys.setprofile(None)
+        self._current = None
+    
+    def save(self, filepath):
+        """保存依赖映射"""
+        directory = os.path.dirname(filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        data = {
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "tests": {test_id: sorted(symbols) for test_id, symbols in self.dependencies.items()}
+        }
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        logger.info(f"依赖映射已保存: {filepath} ({len(self.dependencies)} 个测试用例)")
+
+class SourceIndex:
+    """源码索引 - 记录函数和定位器的位置，以及每个函数引用了哪些定位器"""
+    
+    # 定位器命名约定: 全大写类属性, 例如 ADD_TO_CART_BUTTON
+    LOCATOR_NAME = re.compile(r"^[A-Z][A-Z0-9_]*$")
+    
+    def __init__(self, relpath, source):
+        self.relpath = relpath
+        self.functions = []      # (起始行, 结束行, 限定名)
+        self.locators = []       # (起始行, 结束行, 类名, 定位器名)
+        self.class_bases = {}    # 类名 -> 基类名列表
+        self.references = {}     # 限定名 -> {(类名或'self', 定位器名)}
+        self._visit(ast.parse(source), [], None)
+    
+    def _visit(self, node, scope, class_name):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                self.class_bases[child.name] = [base.id for base in child.bases if isinstance(base, ast.Name)]
+                self._visit(child, scope + [child.name], child.name)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                qualname = ".".join(scope + [child.name])
+                self.functions.append((child.lineno, child.end_lineno, qualname))
+                self.references[qualname] = self._collect_references(child, class_name)
+                self._visit(child, scope + [child.name, "<locals>"], class_name)
+            elif class_name and isinstance(child, ast.Assign) and scope and scope[-1] == class_name:
+                for target in child.targets:
+                    if isinstance(target, ast.Name) and self.LOCATOR_NAME.match(target.id):
+                        self.locators.append((child.lineno, child.end_lineno, class_name, target.id))
+    
+    def _collect_references(self, function_node, class_name):
+        references = set()
+        for node in ast.walk(function_node):
+            if (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+                    and self.LOCATOR_NAME.match(node.attr)):
+                owner = class_name if node.value.id == "self" else node.value.id
+                references.add((owner, node.attr))
+        return references
+    
+    def symbols_for_lines(self, lines):
+        """
+        将改动行映射为改动的符号
+        
+        返回 (函数符号集合, 定位器集合, 是否有模块级改动)
+        """
+        functions, locators, module_level = set(), set(), False
+        for line in lines:
+            enclosing = [f for f in self.functions if f[0] <= line <= f[1]]
+            if enclosing:
+                # 取最内层的函数
+                innermost = max(enclosing, key=lambda f: f[0])
+                functions.add(f"{self.relpath}::{innermost[2]}")
+                continue
+            locator = next((l for l in self.locators if l[0] <= line <= l[1]), None)
+            if locator:
+                locators.add((locator[2], locator[3]))
+            else:
+                module_level = True
+        return functions, locators, module_level
+
+def _parse_diff(diff_text):
+    """解析 git diff -U0 输出，返回 {文件: 改动行号集合}，删除的文件行号集合为None"""
+    changes = {}
+    old_path = current = None
+    for line in diff_text.splitlines():
+        if line.startswith("--- "):
+            path = line[4:].strip()
+            old_path = None if path == "/dev/null" else path[2:] if path.startswith("a/") else path
+        elif line.startswith("+++ "):
+            path = line[4:].strip()
+            if path == "/dev/null":
+                current = None
+                changes[old_path] = None
+            else:
+                current = path[2:] if path.startswith("b/") else path
+                changes.setdefault(current, set())
+        elif line.startswith("@@") and current is not None:
+            match = re.match(r"@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@", line)
+            if match:
+                start = int(match.group(1))
+                count = int(match.group(2)) if match.group(2) is not None else 1
+                # 纯删除的hunk (count为0) 记录删除位置所在的行
+                changes[current].update(range(start, start + max(count, 1)))
+    return changes
+
+def get_git_diff(base_ref="HEAD"):
+    """获取工作区相对于base_ref的改动 (包含未提交改动)"""
+    result = subprocess.run(
+        ["git", "diff", "-U0", base_ref, "--"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+def _load_indexes():
+    """解析追踪目录下所有Python文件"""
+    indexes = {}
+    for directory in TRACED_DIRS:
+        for root, _, files in os.walk(os.path.join(PROJECT_ROOT, directory)):
+            for name in files:
+                if name.endswith(".py"):
+                    path = os.path.join(root, name)
+                    with open(path, 'r', encoding='utf-8') as f:
+                        indexes[_relpath(path)] = SourceIndex(_relpath(path), f.read())
+    return indexes
+
+def _functions_using_locators(indexes, locators):
+    """找出引用了指定定位器的所有函数 (包括通过self引用基类定位器的子类方法)"""
+    class_bases = {}
+    for index in indexes.values():
+        class_bases.update(index.class_bases)
+    
+    def lineage(class_name):
+        seen = []
+        while class_name and class_name not in seen:
+            seen.append(class_name)
+            bases = class_bases.get(class_name, [])
+            class_name = bases[0] if bases else None
+        return seen
+    
+    symbols = set()
+    for index in indexes.values():
+        for qualname, references in index.references.items():
+            for owner, name in references:
+                if any((cls, name) in locators for cls in lineage(owner)):
+                    symbols.add(f"{index.relpath}::{qualname}")
+    return symbols
+
+def select_impacted_tests(dependency_map_file, diff_text):
+    """
+    根据改动选择受影响的测试用例
+    
+    返回 (测试用例ID列表, 是否需要运行全部)，需要运行全部时列表为空
+    """
+    with open(dependency_map_file, 'r', encoding='utf-8') as f:
+        dependency_map = json.load(f)["tests"]
+    
+    changes = _parse_diff(diff_text)
+    indexes = _load_indexes()
+    
+    changed_symbols, changed_locators = set(), set()
+    changed_tests = set()
+    for path, lines in changes.items():
+        if path.endswith(IGNORED_SUFFIXES):
+            continue
+        if path.startswith(TRACED_DIRS) and path.endswith(".py"):
+            if lines is None or path not in indexes:
+                logger.info(f"文件 {path} 被删除或新增，运行全部测试")
+                return [], True
+            functions, locators, module_level = indexes[path].symbols_for_lines(lines)
+            if module_level:
+                logger.info(f"文件 {path} 存在模块级改动，运行全部测试")
+                return [], True
+            changed_symbols |= functions
+            changed_locators |= locators
+        elif path.startswith("tests/") and lines is not None and path.endswith(".py"):
+            # 测试文件改动: 选择改动所在的测试函数
+            with open(os.path.join(PROJECT_ROOT, path), 'r', encoding='utf-8') as f:
+                functions, _, module_level = SourceIndex(path, f.read()).symbols_for_lines(lines)
+            if module_level:
+                return [], True
+            for symbol in functions:
+                relpath, qualname = symbol.split("::", 1)
+                if not qualname.split(".")[-1].startswith("test"):
+                    # 辅助方法改动，无法确定影响范围
+                    return [], True
+                changed_tests.add(f"{relpath}::{qualname.replace('.', '::')}")
+        else:
+            logger.info(f"文件 {path} 改动无法精确分析，运行全部测试")
+            return [], True
+    
+    changed_symbols |= _functions_using_locators(indexes, changed_locators)
+    logger.info(f"改动涉及的符号: {sorted(changed_symbols)}")
+    
+    # 改动过的测试函数按节点ID前缀整体选择，包括依赖映射中还没有的新用例
+    selected = sorted(changed_tests)
+    for test_id, symbols in dependency_map.items():
+        if test_id.split("[")[0] in changed_tests:
+            continue
+        if changed_symbols.intersection(symbols):
+            selected.append(test_id)
+    return selected, False
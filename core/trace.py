@@ -0,0 +1,189 @@
+"""
+结构化二进制追踪 - 以紧凑的长度前缀二进制格式记录每个页面操作的定位器、耗时和结果，
+并提供读取器将追踪文件转换为火焰图 (folded stacks) 或时间线 (Chrome Trace JSON) 视图
+
+文件格式:
+    文件头: MAGIC (8字节)
+    记录:   <长度:uint32><类型:uint8><负载>，长度为负载字节数
+    STRING: <字符串ID:uint32><UTF-8字节>           首次出现的字符串写入一次，之后事件只引用ID
+    EVENT:  <开始时间:double><耗时:double><worker ID><用例ID><操作ID><定位器ID><结果ID> (ID均为uint32)
+"""
+import json
+import os
+import struct
+import threading
+from dataclasses import dataclass
+
+from core.logger_config import logger, log_context
+
+MAGIC = b"SDTRACE\x01"
+RECORD_HEADER = struct.Struct("<IB")
+STRING_ID = struct.Struct("<I")
+EVENT = struct.Struct("<ddIIIII")
+
+RECORD_STRING = 1
+RECORD_EVENT = 2
+
+@dataclass
+class TraceEvent:
+    """追踪文件中的一个操作事件"""
+    start: float
+    duration: float
+    worker_id: str
+    test_id: str
+    action: str
+    locator: str
+    outcome: str
+
+class TraceWriter:
+    """追踪写入器"""
+    
+    def __init__(self):
+        self.filepath = None
+        self._file = None
+        self._strings = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def active(self):
+        return self._file is not None
+    
+    def start(self, filepath):
+        """开始写入追踪文件"""
+        directory = os.path.dirname(filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.filepath = filepath
+            self._file = open(filepath, 'wb', buffering=64 * 1024)
+            self._file.write(MAGIC)
+            self._strings = {}
+        logger.info(f"操作追踪已开启: {filepath}")
+    
+    def _string_id(self, text):
+        """字符串驻留: 首次出现时写入STRING记录"""
+        string_id = self._strings.get(text)
+        if string_id is None:
+            string_id = self._strings[text] = len(self._strings)
+            payload = STRING_ID.pack(string_id) + text.encode("utf-8")
+            self._file.write(RECORD_HEADER.pack(len(payload), RECORD_STRING) + payload)
+        return string_id
+    
+    def event(self, action, locator, duration, outcome, end_time):
+        """写入一个操作事件，worker和用例ID取自当前日志上下文"""
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                payload = EVENT.pack(
+                    end_time - duration, duration,
+                    self._string_id(log_context.worker_id),
+                    self._string_id(log_context.test_id),
+                    self._string_id(action),
+                    self._string_id(locator),
+                    self._string_id(outcome),
+                )
+                self._file.write(RECORD_HEADER.pack(len(payload), RECORD_EVENT) + payload)
+            except Exception as e:
+                logger.warning(f"写入操作追踪失败，停止追踪: {str(e)}")
+                self._close()
+    
+    def close(self):
+        """关闭追踪文件"""
+        with self._lock:
+            self._close()
+    
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logger.info(f"操作追踪已保存: {self.filepath}")
+
+def read_trace(filepath):
+    """
+    读取追踪文件
+    
+    Yields:
+        TraceEvent: 按写入顺序的操作事件 (文件末尾不完整的记录会被忽略)
+    """
+    strings = {}
+    with open(filepath, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"不是有效的追踪文件: {filepath}")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                break
+            length, record_type = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                logger.warning(f"追踪文件末尾记录不完整，已忽略: {filepath}")
+                break
+            
+            if record_type == RECORD_STRING:
+                strings[STRING_ID.unpack_from(payload)[0]] = payload[STRING_ID.size:].decode("utf-8")
+            elif record_type == RECORD_EVENT:
+                start, duration, *ids = EVENT.unpack(payload)
+                worker_id, test_id, action, locator, outcome = (strings[i] for i in ids)
+                yield TraceEvent(start, duration, worker_id, test_id, action, locator, outcome)
+
+def to_folded_stacks(events):
+    """
+    转换为火焰图使用的folded stacks格式 (flamegraph.pl / speedscope可直接打开)
+    
+    调用栈为 用例;操作;定位器，值为累计耗时(微秒)
+    """
+    totals = {}
+    for event in events:
+        frames = [event.test_id, event.action, event.locator]
+        if event.outcome != "ok":
+            frames.append(f"[{event.outcome}]")
+        # 分号是folded格式的栈分隔符
+        stack = ";".join(frame.replace(";", ",") for frame in frames)
+        totals[stack] = totals.get(stack, 0) + int(event.duration * 1_000_000)
+    return [f"{stack} {value}" for stack, value in sorted(totals.items())]
+
+def to_chrome_trace(events):
+    """转换为Chrome Trace Event格式 (chrome://tracing / Perfetto)，每个worker一个进程，每个用例一个线程"""
+    trace_events = []
+    pids = {}
+    tids = {}
+    for event in events:
+        pid = pids.get(event.worker_id)
+        if pid is None:
+            pid = pids[event.worker_id] = len(pids) + 1
+            trace_events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": event.worker_id}})
+        tid = tids.get((pid, event.test_id))
+        if tid is None:
+            tid = tids[(pid, event.test_id)] = len(tids) + 1
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": event.test_id}})
+        trace_events.append({
+            "name": f"{event.action} {event.locator}",
+            "cat": event.outcome,
+            "ph": "X",
+            "ts": int(event.start * 1_000_000),
+            "dur": int(event.duration * 1_000_000),
+            "pid": pid,
+            "tid": tid,
+            "args": {"action": event.action, "locator": event.locator, "outcome": event.outcome},
+        })
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+def export_trace(filepath, views=("folded", "chrome")):
+    """将追踪文件导出为火焰图和时间线文件，返回 {视图: 文件路径}"""
+    events = list(read_trace(filepath))
+    base = os.path.splitext(filepath)[0]
+    outputs = {}
+    if "folded" in views:
+        outputs["folded"] = base + ".folded"
+        with open(outputs["folded"], 'w', encoding='utf-8') as f:
+            f.write("\n".join(to_folded_stacks(events)) + "\n")
+    if "chrome" in views:
+        outputs["chrome"] = base + ".trace.json"
+        with open(outputs["chrome"], 'w', encoding='utf-8') as f:
+            json.dump(to_chrome_trace(events), f, ensure_ascii=False)
+    logger.info(f"追踪文件 {filepath} 共 {len(events)} 个事件，已导出: {outputs}")
+    return outputs
+
+# 全局追踪写入器实例
+trace_writer = TraceWriter()
@@ -0,0 +1,241 @@
+"""
+视觉对比 - 按页面截图与基准图做像素级对比，发现只看URL和数量的断言发现不了的视觉回归 (如visual_user)
+
+对比流程 (全部为NumPy向量化运算):
+    1. 把截图切成固定大小的块，计算每块的感知哈希 (8x8均值哈希 + 量化平均颜色)
+    2. 整图哈希与基准一致时直接通过；否则只对哈希不同的块做逐像素对比，未变化的区域全部跳过
+    3. 像素差超过容差且不在忽略区域 (容差掩码) 内的像素占比超过阈值时判定为视觉回归
+
+基准图由基准用户 (默认standard_user) 首次运行时生成，解码后的像素和块哈希缓存在内存中，
+块哈希同时按基准图内容哈希缓存到磁盘，后续运行不必重新计算。
+NumPy和Pillow为可选依赖 (不在requirements.txt中)，未安装时跳过视觉对比。
+默认只报告视觉回归，开启ENFORCE_VISUAL_CHECKS后回归的用例判定为失败。
+"""
+import hashlib
+import io
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # numpy/Pillow为可选依赖，缺失时跳过视觉对比
+    np = None
+    Image = None
+
+from config import (VISUAL_BASELINE_USER, VISUAL_BASELINE_DIR, VISUAL_DIFF_DIR, VISUAL_TILE_SIZE,
+                    VISUAL_PIXEL_TOLERANCE, VISUAL_MAX_DIFF_RATIO, VISUAL_IGNORE_REGIONS)
+from core.logger_config import logger
+
+# 感知哈希: 每块缩小为8x8灰度网格
+HASH_GRID = 8
+
+@dataclass
+class VisualDiffResult:
+    """一次视觉对比的结果"""
+    name: str
+    username: str
+    passed: bool
+    changed_tiles: int = 0
+    total_tiles: int = 0
+    diff_pixels: int = 0
+    diff_ratio: float = 0.0
+    diff_image: Optional[str] = None
+    note: str = ""
+    
+    def describe(self):
+        if self.note:
+            return f"页面 {self.name} ({self.username}): {self.note}"
+        return (f"页面 {self.name} ({self.username}): {self.changed_tiles}/{self.total_tiles} 个区块变化, "
+                f"差异像素 {self.diff_pixels} ({self.diff_ratio * 100:.3f}%)")
+
+def _safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", name)
+
+def decode_png(png_bytes):
+    """PNG字节解码为 (高, 宽, 3) 的uint8数组"""
+    with Image.open(io.BytesIO(png_bytes)) as image:
+        return np.asarray(image.convert("RGB"))
+
+def tile_hashes(pixels, tile=VISUAL_TILE_SIZE):
+    """
+    计算每个区块的感知哈希
+    
+    Returns:
+        ndarray: (块行数, 块列数, 11) uint8，前8字节为均值哈希位，后3字节为量化后的平均颜色
+    """
+    height, width = pixels.shape[:2]
+    rows, cols = -(-height // tile), -(-width // tile)
+    padded = np.zeros((rows * tile, cols * tile, 3), dtype=np.float32)
+    padded[:height, :width] = pixels
+    
+    cell = tile // HASH_GRID
+    luma = padded @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    grid = luma.reshape(rows, HASH_GRID, cell, cols, HASH_GRID, cell).mean(axis=(2, 5))
+    grid = grid.transpose(0, 2, 1, 3).reshape(rows, cols, HASH_GRID * HASH_GRID)
+    bits = np.packbits(grid > grid.mean(axis=2, keepdims=True), axis=2)
+    # 均值哈希对整体亮度变化不敏感，再加上量化平均颜色，纯色区域变色也能识别
+    color = (padded.reshape(rows, tile, cols, tile, 3).mean(axis=(1, 3)) // 8).astype(np.uint8)
+    return np.concatenate([bits, color], axis=2)
+
+def _to_tiles(array, tile):
+    """(高, 宽, ...) 数组补齐后切块为 (块行数, 块列数, tile, tile, ...)"""
+    height, width = array.shape[:2]
+    rows, cols = -(-height // tile), -(-width // tile)
+    padded = np.zeros((rows * tile, cols * tile) + array.shape[2:], dtype=array.dtype)
+    padded[:height, :width] = array
+    shape = (rows, tile, cols, tile) + array.shape[2:]
+    return padded.reshape(shape).swapaxes(1, 2)
+
+def ignore_mask(name, height, width):
+    """容差掩码: 配置中的忽略区域 (所有页面通用的 "*" 加上当前页面的区域) 为True"""
+    mask = np.zeros((height, width), dtype=bool)
+    for x, y, w, h in VISUAL_IGNORE_REGIONS.get("*", []) + VISUAL_IGNORE_REGIONS.get(name, []):
+        mask[y:y + h, x:x + w] = True
+    return mask
+
+@dataclass
+class Baseline:
+    """解码后的基准图"""
+    pixels: "np.ndarray"
+    hashes: "np.ndarray"
+    digest: str
+
+class VisualComparator:
+    """视觉对比器"""
+    
+    def __init__(self, baseline_dir=VISUAL_BASELINE_DIR, diff_dir=VISUAL_DIFF_DIR, baseline_user=VISUAL_BASELINE_USER,
+                 tile=VISUAL_TILE_SIZE, tolerance=VISUAL_PIXEL_TOLERANCE, max_diff_ratio=VISUAL_MAX_DIFF_RATIO):
+        self.baseline_dir = baseline_dir
+        self.diff_dir = diff_dir
+        self.baseline_user = baseline_user
+        self.tile = tile
+        self.tolerance = tolerance
+        self.max_diff_ratio = max_diff_ratio
+        self.results = []
+        self._baselines = {}
+        self._warned = False
+    
+    @property
+    def available(self):
+        if np is None and not self._warned:
+            self._warned = True
+            logger.warning("未安装numpy/Pillow，跳过视觉对比 (pip install numpy pillow)")
+        return np is not None
+    
+    def _baseline_path(self, name):
+        return os.path.join(self.baseline_dir, _safe_name(name) + ".png")
+    
+    def _load_baseline(self, name):
+        """读取基准图，块哈希按基准图内容哈希缓存到磁盘"""
+        if name in self._baselines:
+            return self._baselines[name]
+        path = self._baseline_path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            png_bytes = f.read()
+        digest = hashlib.sha256(png_bytes).hexdigest()
+        pixels = decode_png(png_bytes)
+        
+        cache_path = os.path.splitext(path)[0] + ".hashes.npz"
+        hashes = None
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                if str(cached["digest"]) == digest and int(cached["tile"]) == self.tile:
+                    hashes = cached["hashes"]
+        if hashes is None:
+            hashes = tile_hashes(pixels, self.tile)
+            np.savez(cache_path, digest=digest, tile=self.tile, hashes=hashes)
+        
+        baseline = self._baselines[name] = Baseline(pixels, hashes, digest)
+        return baseline
+    
+    def _save_baseline(self, name, png_bytes, pixels):
+        if not os.path.exists(self.baseline_dir):
+            os.makedirs(self.baseline_dir)
+        with open(self._baseline_path(name), 'wb') as f:
+            f.write(png_bytes)
+        self._baselines[name] = Baseline(pixels, tile_hashes(pixels, self.tile), hashlib.sha256(png_bytes).hexdigest())
+        logger.info(f"已保存视觉基准图: {self._baseline_path(name)}")
+    
+    def _save_diff_image(self, name, username, pixels, diff_mask):
+        """差异像素标红保存，便于定位回归区域"""
+        if not os.path.exists(self.diff_dir):
+            os.makedirs(self.diff_dir)
+        highlighted = pixels.copy()
+        highlighted[diff_mask] = (255, 0, 0)
+        path = os.path.join(self.diff_dir, f"{_safe_name(name)}_{_safe_name(username)}_diff.png")
+        Image.fromarray(highlighted).save(path)
+        return path
+    
+    def compare(self, name, png_bytes, username):
+        """
+        截图与基准图对比
+        
+        Args:
+            name: 页面/检查点名称，作为基准图的键
+            png_bytes: 截图PNG字节
+            username: 当前用户，基准用户在没有基准图时生成基准
+        
+        Returns:
+            VisualDiffResult: 对比结果，numpy/Pillow不可用时返回None
+        """
+        if not self.available:
+            return None
+        pixels = decode_png(png_bytes)
+        baseline = self._load_baseline(name)
+        if baseline is None:
+            if username == self.baseline_user:
+                self._save_baseline(name, png_bytes, pixels)
+                return self._finish(VisualDiffResult(name, username, True, note="已生成基准图"))
+            return self._finish(VisualDiffResult(name, username, True, note=f"尚无基准图 (由 {self.baseline_user} 生成)"))
+        
+        if pixels.shape != baseline.pixels.shape:
+            return self._finish(VisualDiffResult(
+                name, username, False,
+                note=f"截图尺寸 {pixels.shape[1]}x{pixels.shape[0]} 与基准 {baseline.pixels.shape[1]}x{baseline.pixels.shape[0]} 不一致"))
+        
+        hashes = tile_hashes(pixels, self.tile)
+        changed = np.any(hashes != baseline.hashes, axis=2)
+        result = VisualDiffResult(name, username, True, int(changed.sum()), changed.size)
+        if not result.changed_tiles:
+            return self._finish(result)
+        
+        # 只对哈希变化的区块做逐像素对比
+        current_tiles = _to_tiles(pixels, self.tile)[changed].astype(np.int16)
+        baseline_tiles = _to_tiles(baseline.pixels, self.tile)[changed].astype(np.int16)
+        ignored = _to_tiles(ignore_mask(name, *pixels.shape[:2]), self.tile)[changed]
+        tile_diff = (np.abs(current_tiles - baseline_tiles).max(axis=-1) > self.tolerance) & ~ignored
+        
+        result.diff_pixels = int(tile_diff.sum())
+        result.diff_ratio = result.diff_pixels / (pixels.shape[0] * pixels.shape[1])
+        result.passed = result.diff_ratio <= self.max_diff_ratio
+        if not result.passed:
+            diff_mask = np.zeros(changed.shape + (self.tile, self.tile), dtype=bool)
+            diff_mask[changed] = tile_diff
+            diff_mask = diff_mask.swapaxes(1, 2).reshape(changed.shape[0] * self.tile, changed.shape[1] * self.tile)
+            result.diff_image = self._save_diff_image(name, username, pixels, diff_mask[:pixels.shape[0], :pixels.shape[1]])
+        return self._finish(result)
+    
+    def _finish(self, result):
+        self.results.append(result)
+        if result.passed:
+            logger.debug(f"视觉对比通过: {result.describe()}")
+        else:
+            logger.warning(f"视觉回归: {result.describe()}" + (f", 差异图 {result.diff_image}" if result.diff_image else ""))
+        return result
+    
+    def log_summary(self):
+        """在日志中输出视觉对比汇总"""
+        if not self.results:
+            return
+        failed = [result for result in self.results if not result.passed]
+        logger.info(f"视觉对比: 共 {len(self.results)} 次, 回归 {len(failed)} 次")
+        for result in failed:
+            logger.info(f"  {result.describe()}")
+
+# 全局视觉对比器实例
+visual_comparator = VisualComparator()
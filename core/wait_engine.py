@@ -0,0 +1,101 @@
+"""
+统一等待引擎 - 所有元素查找都经过同一个显式等待轮询循环
+
+隐式等待与WebDriverWait混用时，每次轮询内部的find_element还会再阻塞隐式等待时间，
+实际超时 ≈ 显式超时 + 隐式超时，失败的查找尤其慢。严格显式等待模式下关闭隐式等待，
+超时完全由本引擎控制，并按固定间隔轮询、记录真实等待时间。
+"""
+import threading
+import time
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+
+from config import WAIT_POLL_INTERVAL
+from core.logger_config import logger
+
+# 轮询期间视为"尚未满足条件"的异常
+IGNORED_EXCEPTIONS = (NoSuchElementException, StaleElementReferenceException)
+
+class WaitEngine:
+    """统一等待引擎"""
+    
+    def __init__(self, poll_interval=WAIT_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._stats = {}
+    
+    def until(self, driver, condition, timeout, description=""):
+        """
+        轮询condition(driver)直到返回真值或超时
+        
+        Args:
+            driver: WebDriver或WebElement (作为condition的参数)
+            condition: 可调用对象，返回真值表示条件满足
+            timeout: 超时时间(秒)
+            description: 等待描述 (用于统计和超时信息)
+        
+        Returns:
+            condition的返回值
+        
+        Raises:
+            TimeoutException: 超时仍未满足条件
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        polls = 0
+        last_error = None
+        
+        while True:
+            polls += 1
+            try:
+                value = condition(driver)
+                if value:
+                    self._record(description, time.monotonic() - start, polls, False)
+                    return value
+            except IGNORED_EXCEPTIONS as e:
+                last_error = e
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                waited = time.monotonic() - start
+                self._record(description, waited, polls, True)
+                raise TimeoutException(
+                    f"等待超时 ({waited:.2f}s/{timeout}s, 轮询{polls}次): {description}",
+                    stacktrace=getattr(last_error, "stacktrace", None))
+            # 不超过剩余时间，保证超时时间准确
+            time.sleep(min(self.poll_interval, remaining))
+    
+    def _record(self, description, waited, polls, timed_out):
+        with self._lock:
+            stats = self._stats.setdefault(description, {
+                "waits": 0, "timeouts": 0, "polls": 0, "total_wait": 0.0, "max_wait": 0.0})
+            stats["waits"] += 1
+            stats["timeouts"] += int(timed_out)
+            stats["polls"] += polls
+            stats["total_wait"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+    
+    def summary(self, limit=10):
+        """等待统计: 总等待时间及累计等待最长的定位器"""
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1]["total_wait"], reverse=True)
+            return {
+                "waits": sum(stats["waits"] for _, stats in items),
+                "timeouts": sum(stats["timeouts"] for _, stats in items),
+                "total_wait": round(sum(stats["total_wait"] for _, stats in items), 3),
+                "top": {description: dict(stats) for description, stats in items[:limit]},
+            }
+    
+    def log_summary(self):
+        """输出等待统计到日志"""
+        summary = self.summary()
+        if not summary["waits"]:
+            return
+        logger.info(f"等待统计: 共 {summary['waits']} 次等待，{summary['timeouts']} 次超时，"
+                    f"累计等待 {summary['total_wait']:.2f}s")
+        for description, stats in summary["top"].items():
+            logger.debug(f"  {description}: {stats['waits']} 次, 累计 {stats['total_wait']:.2f}s, "
+                         f"最长 {stats['max_wait']:.2f}s, 超时 {stats['timeouts']} 次")
+
+# 全局等待引擎实例
+wait_engine = WaitEngine()
@@ -0,0 +1,137 @@
+"""
+用例看门狗 - 为每个测试用例 (含setup/teardown) 设置墙钟时间预算，超时时终止卡住的浏览器
+
+WebDriver调用卡住 (页面加载超时、浏览器无响应) 时，主线程一直阻塞在等待驱动响应上，
+串行执行的整个测试套件都会停住。看门狗在后台线程中监视各会话上下文当前的用例，超出预算时强制结束该上下文的驱动进程及其浏览器，
+阻塞中的调用随即因连接断开而失败，用例判定为失败后继续运行；该上下文的下一个用例开始前由conftest重建浏览器并重新登录。
+多个线程同时执行用例时，每个上下文分别计时，只回收超时的那个上下文的浏览器。
+"""
+import threading
+import time
+from dataclasses import dataclass
+
+try:
+    import psutil
+except ImportError:  # psutil为可选依赖，缺失时只结束驱动进程
+    psutil = None
+
+from config import TEST_TIME_BUDGET, TEST_TIME_BUDGETS, WATCHDOG_POLL_INTERVAL
+from core.logger_config import logger
+
+@dataclass
+class WatchdogEvent:
+    """一次看门狗超时"""
+    node_id: str
+    budget: float
+    elapsed: float
+    killed: bool
+    
+    def describe(self):
+        action = "已终止浏览器" if self.killed else "无法终止浏览器 (非本地驱动)"
+        return f"用例 {self.node_id} 运行 {self.elapsed:.0f}s 超过预算 {self.budget:.0f}s，{action}"
+
+class TestWatchdog:
+    """用例看门狗"""
+    
+    # 类名以Test开头，避免pytest把它当作测试类收集
+    __test__ = False
+    
+    def __init__(self, poll_interval=WATCHDOG_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.events = []
+        # 会话上下文 -> (用例ID, 预算, 开始时间)
+        self._armed = {}
+        # 会话上下文 -> 浏览器被终止、需要重建的原因
+        self._recycle_reasons = {}
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    @staticmethod
+    def budget_for(test_name):
+        """测试函数的墙钟时间预算(秒)"""
+        return TEST_TIME_BUDGETS.get(test_name, TEST_TIME_BUDGET)
+    
+    def arm(self, context, node_id, test_name):
+        """
+        开始监视会话上下文中的一个用例
+        
+        Args:
+            context: 执行用例的会话上下文 (超时时终止其当前驱动，用例执行期间浏览器可能被回收重建)
+            node_id: 用例ID
+            test_name: 测试函数名 (用于查找预算)
+        """
+        with self._lock:
+            self._armed[context] = (node_id, self.budget_for(test_name), time.monotonic())
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._watch, name="test-watchdog", daemon=True)
+                self._thread.start()
+    
+    def disarm(self, context):
+        """会话上下文的用例结束，停止监视"""
+        with self._lock:
+            self._armed.pop(context, None)
+    
+    def event_for(self, node_id):
+        """用例的超时事件，未超时返回None"""
+        with self._lock:
+            return next((event for event in self.events if event.node_id == node_id), None)
+    
+    def take_recycle_reason(self, context):
+        """会话上下文的浏览器被终止后需要重建，返回原因并清除 (不需要时返回None)"""
+        with self._lock:
+            return self._recycle_reasons.pop(context, None)
+    
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            now = time.monotonic()
+            with self._lock:
+                expired = [(context, node_id, budget, now - start)
+                           for context, (node_id, budget, start) in self._armed.items() if now - start > budget]
+                # 每个用例只触发一次
+                for context, *_ in expired:
+                    del self._armed[context]
+            for context, node_id, budget, elapsed in expired:
+                self._fire(context, node_id, budget, elapsed)
+    
+    def _fire(self, context, node_id, budget, elapsed):
+        killed = self.kill_driver(context.driver)
+        event = WatchdogEvent(node_id, budget, elapsed, killed)
+        with self._lock:
+            self.events.append(event)
+            if killed:
+                self._recycle_reasons[context] = f"看门狗终止了卡住的浏览器 ({node_id})"
+        logger.error(f"看门狗: {event.describe()}")
+    
+    @staticmethod
+    def kill_driver(driver):
+        """强制结束驱动进程及其启动的浏览器进程，返回是否成功"""
+        try:
+            process = driver.service.process
+        except AttributeError:
+            return False
+        if process is None:
+            return False
+        
+        if psutil is not None:
+            try:
+                for child in psutil.Process(process.pid).children(recursive=True):
+                    child.kill()
+            except psutil.Error as e:
+                logger.warning(f"结束浏览器进程失败: {str(e)}")
+        try:
+            process.kill()
+            return True
+        except OSError as e:
+            logger.warning(f"结束驱动进程失败: {str(e)}")
+            return False
+    
+    def log_summary(self):
+        """在日志中输出看门狗超时汇总"""
+        if self.events:
+            logger.warning(f"看门狗共触发 {len(self.events)} 次:")
+            for event in self.events:
+                logger.warning(f"  {event.describe()}")
+
+# 全局用例看门狗实例
+test_watchdog = TestWatchdog()
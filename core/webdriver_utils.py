@@ -3,30 +3,48 @@ WebDriver工具类
 """
 import time
 from selenium import webdriver
-from selenium.webdriver.edge.service import Service
-from selenium.webdriver.edge.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
-from config import EDGE_DRIVER_PATH, BROWSER_OPTIONS, DEFAULT_WAIT_TIME, IMPLICIT_WAIT_TIME, PAGE_LOAD_TIMEOUT
+from config import (EDGE_DRIVER_PATH, BROWSER_OPTIONS, DEFAULT_WAIT_TIME, IMPLICIT_WAIT_TIME, PAGE_LOAD_TIMEOUT,
+                    STRICT_EXPLICIT_WAIT)
 from core.logger_config import logger
 from core.exceptions import ElementException
+from core.action_timeline import action_timeline
+from core.adaptive_timeouts import adaptive_timeouts
+from core.wait_engine import wait_engine
 
 class WebDriverManager:
     """WebDriver管理器"""
     
+    @staticmethod
+    def build_options():
+        """构建Edge浏览器选项"""
+        # Edge相关模块只在真正创建浏览器时导入，加快CLI和用例收集的启动速度
+        from selenium.webdriver.edge.options import Options
+        
+        options = Options()
+        for option in BROWSER_OPTIONS:
+            options.add_argument(option)
+        return options
+    
+    @staticmethod
+    def configure_timeouts(driver):
+        """设置会话超时 (页面加载超时根据历史页面加载耗时自适应)"""
+        # 严格显式等待模式关闭隐式等待，避免与等待引擎的显式等待叠加
+        driver.implicitly_wait(0 if STRICT_EXPLICIT_WAIT else IMPLICIT_WAIT_TIME)
+        driver.set_page_load_timeout(
+            adaptive_timeouts.timeout_for("page_load", PAGE_LOAD_TIMEOUT, max_timeout=PAGE_LOAD_TIMEOUT))
+    
     @staticmethod
     def create_driver():
         """创建WebDriver实例"""
         try:
             logger.info("开始创建WebDriver实例")
+            from selenium.webdriver.edge.service import Service
             
             # 配置Edge选项
-            options = Options()
-            for option in BROWSER_OPTIONS:
-                options.add_argument(option)
+            options = WebDriverManager.build_options()
             
             # 创建Service
             service = Service(EDGE_DRIVER_PATH)
@@ -35,8 +53,7 @@ class WebDriverManager:
             driver = webdriver.Edge(service=service, options=options)
             
             # 设置超时
-            driver.implicitly_wait(IMPLICIT_WAIT_TIME)
-            driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            WebDriverManager.configure_timeouts(driver)
             
             logger.info("WebDriver创建成功")
             return driver
@@ -58,53 +75,115 @@ class WebDriverManager:
 class ElementOperations:
     """元素操作类"""
     
-    def safe_find_element(self, driver, by, value, timeout=DEFAULT_WAIT_TIME):
-        """安全查找元素"""
+    @staticmethod
+    def locator_timeout(by, value, default=DEFAULT_WAIT_TIME):
+        """定位器的等待超时 (自适应超时未启用或样本不足时返回default)"""
+        return adaptive_timeouts.timeout_for(f"{by}={value}", default)
+    
+    def safe_find_element(self, driver, by, value, timeout=None, record_timeout=True):
+        """
+        安全查找元素，timeout为None时使用定位器的自适应超时
+        
+        record_timeout为False时超时不计入自适应超时 (用于元素不存在是正常结果的检查)
+        """
+        if timeout is None:
+            timeout = self.locator_timeout(by, value)
+        start = time.perf_counter()
         try:
-            wait = WebDriverWait(driver, timeout)
-            element = wait.until(EC.presence_of_element_located((by, value)))
+            element = wait_engine.until(driver, lambda d: d.find_element(by, value), timeout, f"{by}={value}")
+            elapsed = time.perf_counter() - start
+            adaptive_timeouts.record(f"{by}={value}", elapsed)
+            action_timeline.record("find_element", f"{by}={value}", elapsed)
             logger.debug(f"成功找到元素: {by}={value}")
             return element
         except TimeoutException:
+            if record_timeout:
+                adaptive_timeouts.record_timeout(f"{by}={value}")
+            action_timeline.record("find_element", f"{by}={value}", time.perf_counter() - start, "timeout")
             logger.error(f"查找元素超时: {by}={value}")
             raise ElementException(f"查找元素超时: {by}={value}")
         except Exception as e:
+            action_timeline.record("find_element", f"{by}={value}", time.perf_counter() - start, "error")
             logger.error(f"查找元素失败: {by}={value}, 错误: {str(e)}")
             raise ElementException(f"查找元素失败: {by}={value}", e)
     
-    def safe_find_elements(self, driver, by, value, timeout=DEFAULT_WAIT_TIME):
-        """安全查找多个元素"""
+    def safe_find_elements(self, driver, by, value, timeout=None):
+        """安全查找多个元素，timeout为None时使用定位器的自适应超时"""
+        if timeout is None:
+            timeout = self.locator_timeout(by, value)
+        start = time.perf_counter()
         try:
-            wait = WebDriverWait(driver, timeout)
-            elements = wait.until(EC.presence_of_all_elements_located((by, value)))
+            elements = wait_engine.until(
+                driver, lambda d: d.find_elements(by, value), timeout, f"{by}={value}")
+            elapsed = time.perf_counter() - start
+            adaptive_timeouts.record(f"{by}={value}", elapsed)
+            action_timeline.record("find_elements", f"{by}={value}", elapsed)
             logger.debug(f"成功找到 {len(elements)} 个元素: {by}={value}")
             return elements
         except TimeoutException:
+            # 查找多个元素常用于确认元素不存在，超时是正常结果，不作为耗时样本
+            action_timeline.record("find_elements", f"{by}={value}", time.perf_counter() - start, "timeout")
             logger.warning(f"查找元素超时: {by}={value}")
             return []
         except Exception as e:
+            action_timeline.record("find_elements", f"{by}={value}", time.perf_counter() - start, "error")
             logger.error(f"查找元素失败: {by}={value}, 错误: {str(e)}")
             return []
     
-    def safe_click(self, driver, element, timeout=DEFAULT_WAIT_TIME):
-        """安全点击元素"""
+    def safe_find_child(self, parent, by, value, timeout=None):
+        """在父元素内安全查找子元素 (代替直接调用parent.find_element，统一经过等待引擎)"""
+        if timeout is None:
+            timeout = self.locator_timeout(by, value)
+        start = time.perf_counter()
+        try:
+            element = wait_engine.until(
+                parent, lambda root: root.find_element(by, value), timeout, f"{by}={value} (child)")
+            action_timeline.record("find_child", f"{by}={value}", time.perf_counter() - start)
+            logger.debug(f"成功找到子元素: {by}={value}")
+            return element
+        except TimeoutException:
+            action_timeline.record("find_child", f"{by}={value}", time.perf_counter() - start, "timeout")
+            logger.error(f"查找子元素超时: {by}={value}")
+            raise ElementException(f"查找子元素超时: {by}={value}")
+        except Exception as e:
+            action_timeline.record("find_child", f"{by}={value}", time.perf_counter() - start, "error")
+            logger.error(f"查找子元素失败: {by}={value}, 错误: {str(e)}")
+            raise ElementException(f"查找子元素失败: {by}={value}", e)
+    
+    def safe_click(self, driver, element, timeout=None):
+        """安全点击元素，timeout为None时使用点击操作的自适应超时"""
+        if timeout is None:
+            timeout = adaptive_timeouts.timeout_for("click", DEFAULT_WAIT_TIME)
+        start = time.perf_counter()
         try:
-            wait = WebDriverWait(driver, timeout)
-            wait.until(EC.element_to_be_clickable(element))
+            wait_engine.until(
+                driver, lambda d: element.is_displayed() and element.is_enabled(), timeout, "clickable")
             element.click()
+            elapsed = time.perf_counter() - start
+            adaptive_timeouts.record("click", elapsed)
+            action_timeline.record("click", self._describe(element), elapsed)
             logger.debug("元素点击成功")
             time.sleep(0.1)  # 短暂等待
+        except TimeoutException:
+            adaptive_timeouts.record_timeout("click")
+            action_timeline.record("click", self._describe(element), time.perf_counter() - start, "timeout")
+            logger.error("等待元素可点击超时")
+            raise ElementException(f"等待元素可点击超时 ({timeout:.1f}s)")
         except Exception as e:
+            action_timeline.record("click", self._describe(element), time.perf_counter() - start, "error")
             logger.error(f"点击元素失败: {str(e)}")
             raise ElementException(f"点击元素失败: {str(e)}", e)
     
     def safe_send_keys(self, element, text):
         """安全输入文本"""
+        start = time.perf_counter()
         try:
             element.clear()
             element.send_keys(text)
+            action_timeline.record("send_keys", self._describe(element), time.perf_counter() - start)
             logger.debug(f"文本输入成功: {text}")
         except Exception as e:
+            action_timeline.record("send_keys", self._describe(element), time.perf_counter() - start, "error")
             logger.error(f"输入文本失败: {str(e)}")
             raise ElementException(f"输入文本失败: {str(e)}", e)
     
@@ -116,4 +195,9 @@ class ElementOperations:
             return text
         except Exception as e:
             logger.error(f"获取文本失败: {str(e)}")
-            raise ElementException(f"获取文本失败: {str(e)}", e)
\ No newline at end of file
+            raise ElementException(f"获取文本失败: {str(e)}", e)
+    
+    @staticmethod
+    def _describe(element):
+        """生成元素的简短描述 (用于操作时间线)，不额外访问浏览器"""
+        return f"element={getattr(element, 'id', '?')}"
\ No newline at end of file
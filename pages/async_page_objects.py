@@ -0,0 +1,296 @@
+"""
+异步页面对象模型 - 与page_objects中的页面一一对应，基于AsyncWebDriverSession
+
+定位器直接复用同步页面类中的定义，保证两种模式操作的是同一组元素。
+"""
+import asyncio
+from selenium.webdriver.common.by import By
+
+from core.exceptions import LoginException, ProductException, CartException, CheckoutException
+from core.logger_config import logger
+from config import BASE_URL
+from pages.page_objects import LoginPage, InventoryPage, CartPage, CheckoutPage, ProductDetailPage
+
+class AsyncBasePage:
+    """异步页面基类"""
+    
+    def __init__(self, session, base_url=BASE_URL):
+        self.session = session
+        self.base_url = base_url
+    
+    async def navigate_to(self, url):
+        """导航到指定URL"""
+        try:
+            await self.session.get(url)
+            logger.info(f"导航到: {url}")
+        except Exception as e:
+            logger.error(f"导航失败: {str(e)}")
+            raise
+    
+    async def find_and_click(self, locator):
+        """查找并点击元素"""
+        element = await self.session.find_element(*locator)
+        await element.click()
+        await asyncio.sleep(0.1)  # 短暂等待
+
+class AsyncLoginPage(AsyncBasePage):
+    """异步登录页面"""
+    
+    USERNAME_INPUT = LoginPage.USERNAME_INPUT
+    PASSWORD_INPUT = LoginPage.PASSWORD_INPUT
+    LOGIN_BUTTON = LoginPage.LOGIN_BUTTON
+    ERROR_MESSAGE = LoginPage.ERROR_MESSAGE
+    
+    async def open(self):
+        """打开登录页"""
+        await self.navigate_to(self.base_url)
+        return self
+    
+    async def login(self, username, password):
+        """登录功能"""
+        try:
+            logger.info(f"开始登录用户: {username}")
+            
+            username_field = await self.session.find_element(*self.USERNAME_INPUT)
+            password_field = await self.session.find_element(*self.PASSWORD_INPUT)
+            
+            await username_field.clear()
+            await username_field.send_keys(username)
+            await password_field.clear()
+            await password_field.send_keys(password)
+            await self.find_and_click(self.LOGIN_BUTTON)
+            
+            await asyncio.sleep(1)  # 等待页面跳转
+            logger.info(f"用户 {username} 登录操作完成")
+        
+        except Exception as e:
+            logger.error(f"登录失败: {str(e)}")
+            raise LoginException(f"登录失败: {str(e)}", e)
+    
+    async def is_login_success(self):
+        """检查登录是否成功"""
+        try:
+            return "inventory" in await self.session.current_url()
+        except Exception as e:
+            logger.error(f"检查登录状态失败: {str(e)}")
+            return False
+    
+    async def get_error_message(self):
+        """获取错误消息"""
+        try:
+            error_element = await self.session.find_element(*self.ERROR_MESSAGE)
+            return await error_element.text()
+        except:
+            return ""
+
+class AsyncInventoryPage(AsyncBasePage):
+    """异步商品页面"""
+    
+    MENU_BUTTON = InventoryPage.MENU_BUTTON
+    LOGOUT_LINK = InventoryPage.LOGOUT_LINK
+    RESET_APP_STATE_LINK = InventoryPage.RESET_APP_STATE_LINK
+    SORT_DROPDOWN = InventoryPage.SORT_DROPDOWN
+    PRODUCTS = InventoryPage.PRODUCTS
+    PRODUCT_NAME = InventoryPage.PRODUCT_NAME
+    PRODUCT_PRICE = InventoryPage.PRODUCT_PRICE
+    PRODUCT_ADD_BUTTON = InventoryPage.PRODUCT_ADD_BUTTON
+    CART_BADGE = InventoryPage.CART_BADGE
+    CART_LINK = InventoryPage.CART_LINK
+    
+    async def logout(self):
+        """登出功能 (先重置应用状态)"""
+        try:
+            logger.info("开始登出操作")
+            
+            if "inventory" not in await self.session.current_url():
+                await self.navigate_to(self.base_url + "inventory.html")
+            
+            await self.find_and_click(self.MENU_BUTTON)
+            await self.find_and_click(self.RESET_APP_STATE_LINK)
+            await self.find_and_click(self.LOGOUT_LINK)
+            
+            await asyncio.sleep(0.2)  # 等待页面跳转
+            logger.info("登出操作完成")
+        
+        except Exception as e:
+            logger.error(f"登出失败: {str(e)}")
+            raise LoginException(f"登出失败: {str(e)}", e)
+    
+    async def sort_products(self, sort_value):
+        """排序商品"""
+        try:
+            logger.info(f"开始商品排序: {sort_value}")
+            
+            sort_dropdown = await self.session.find_element(*self.SORT_DROPDOWN)
+            option = await sort_dropdown.find_element(By.CSS_SELECTOR, f"option[value='{sort_value}']")
+            await option.click()
+            
+            await asyncio.sleep(0.2)  # 等待排序生效
+            logger.info(f"商品排序完成: {sort_value}")
+        
+        except Exception as e:
+            logger.error(f"商品排序失败: {str(e)}")
+            raise ProductException(f"商品排序失败: {str(e)}", e)
+    
+    async def get_all_products(self):
+        """获取所有商品元素"""
+        return await self.session.find_elements(*self.PRODUCTS)
+    
+    async def get_product_prices(self):
+        """获取当前顺序下所有商品价格"""
+        prices = []
+        for product in await self.get_all_products():
+            price_element = await product.find_element(*self.PRODUCT_PRICE)
+            prices.append(float((await price_element.text()).replace("$", "")))
+        return prices
+    
+    async def add_product_by_index(self, index):
+        """按索引添加商品到购物车"""
+        try:
+            logger.info(f"添加第 {index} 个商品到购物车")
+            
+            products = await self.get_all_products()
+            if index >= len(products):
+                raise ProductException(f"商品索引 {index} 超出范围")
+            
+            add_button = await products[index].find_element(*self.PRODUCT_ADD_BUTTON)
+            await add_button.click()
+            
+            await asyncio.sleep(0.3)  # 等待添加完成
+            logger.info(f"第 {index} 个商品已添加到购物车")
+        
+        except Exception as e:
+            logger.error(f"添加商品到购物车失败: {str(e)}")
+            raise ProductException(f"添加商品到购物车失败: {str(e)}", e)
+    
+    async def get_cart_count(self):
+        """获取购物车商品数量"""
+        try:
+            cart_badge = await self.session.find_element(*self.CART_BADGE, timeout=2)
+            return int(await cart_badge.text())
+        except Exception:
+            # 如果没有找到购物车徽章，说明购物车为空
+            logger.debug("购物车为空")
+            return 0
+    
+    async def go_to_cart(self):
+        """进入购物车"""
+        try:
+            logger.info("进入购物车")
+            await self.find_and_click(self.CART_LINK)
+            await asyncio.sleep(0.2)  # 等待页面跳转
+            logger.info("已进入购物车页面")
+        
+        except Exception as e:
+            logger.error(f"进入购物车失败: {str(e)}")
+            raise CartException(f"进入购物车失败: {str(e)}", e)
+
+class AsyncCartPage(AsyncBasePage):
+    """异步购物车页面"""
+    
+    CART_ITEMS = CartPage.CART_ITEMS
+    REMOVE_BUTTON = CartPage.REMOVE_BUTTON
+    CONTINUE_SHOPPING_BUTTON = CartPage.CONTINUE_SHOPPING_BUTTON
+    CHECKOUT_BUTTON = CartPage.CHECKOUT_BUTTON
+    
+    async def get_cart_items(self):
+        """获取购物车商品"""
+        return await self.session.find_elements(*self.CART_ITEMS)
+    
+    async def continue_shopping(self):
+        """继续购物"""
+        try:
+            logger.info("点击继续购物")
+            await self.find_and_click(self.CONTINUE_SHOPPING_BUTTON)
+            await asyncio.sleep(0.2)  # 等待页面跳转
+        
+        except Exception as e:
+            logger.error(f"继续购物失败: {str(e)}")
+            raise CartException(f"继续购物失败: {str(e)}", e)
+    
+    async def checkout(self):
+        """开始结账"""
+        try:
+            logger.info("开始结账")
+            await self.find_and_click(self.CHECKOUT_BUTTON)
+            await asyncio.sleep(0.2)  # 等待页面跳转
+            logger.info("已进入结账页面")
+        
+        except Exception as e:
+            logger.error(f"开始结账失败: {str(e)}")
+            raise CheckoutException(f"开始结账失败: {str(e)}", e)
+
+class AsyncCheckoutPage(AsyncBasePage):
+    """异步结账页面"""
+    
+    FIRST_NAME_INPUT = CheckoutPage.FIRST_NAME_INPUT
+    LAST_NAME_INPUT = CheckoutPage.LAST_NAME_INPUT
+    POSTAL_CODE_INPUT = CheckoutPage.POSTAL_CODE_INPUT
+    CONTINUE_BUTTON = CheckoutPage.CONTINUE_BUTTON
+    FINISH_BUTTON = CheckoutPage.FINISH_BUTTON
+    CANCEL_BUTTON = CheckoutPage.CANCEL_BUTTON
+    
+    async def fill_checkout_info(self, first_name, last_name, postal_code):
+        """填写结账信息"""
+        try:
+            logger.info("填写结账信息")
+            for locator, text in ((self.FIRST_NAME_INPUT, first_name),
+                                  (self.LAST_NAME_INPUT, last_name),
+                                  (self.POSTAL_CODE_INPUT, postal_code)):
+                field = await self.session.find_element(*locator)
+                await field.clear()
+                await field.send_keys(text)
+            logger.info("结账信息填写完成")
+        
+        except Exception as e:
+            logger.error(f"填写结账信息失败: {str(e)}")
+            raise CheckoutException(f"填写结账信息失败: {str(e)}", e)
+    
+    async def continue_checkout(self):
+        """继续结账"""
+        try:
+            logger.info("继续结账")
+            await self.find_and_click(self.CONTINUE_BUTTON)
+            await asyncio.sleep(0.2)  # 等待页面跳转
+        
+        except Exception as e:
+            logger.error(f"继续结账失败: {str(e)}")
+            raise CheckoutException(f"继续结账失败: {str(e)}", e)
+    
+    async def finish_checkout(self):
+        """完成结账"""
+        try:
+            logger.info("完成结账")
+            await self.find_and_click(self.FINISH_BUTTON)
+            await asyncio.sleep(0.2)  # 等待页面跳转
+        
+        except Exception as e:
+            logger.error(f"完成结账失败: {str(e)}")
+            raise CheckoutException(f"完成结账失败: {str(e)}", e)
+    
+    async def cancel_checkout(self):
+        """取消结账"""
+        try:
+            logger.info("取消结账")
+            await self.find_and_click(self.CANCEL_BUTTON)
+            await asyncio.sleep(0.2)  # 等待页面跳转
+        
+        except Exception as e:
+            logger.error(f"取消结账失败: {str(e)}")
+            raise CheckoutException(f"取消结账失败: {str(e)}", e)
+
+class AsyncProductDetailPage(AsyncBasePage):
+    """异步商品详情页面"""
+    
+    BACK_TO_PRODUCTS_BUTTON = ProductDetailPage.BACK_TO_PRODUCTS_BUTTON
+    
+    async def back_to_products(self):
+        """返回商品列表"""
+        try:
+            logger.info("返回商品列表")
+            await self.find_and_click(self.BACK_TO_PRODUCTS_BUTTON)
+            await asyncio.sleep(0.2)  # 等待页面跳转
+        
+        except Exception as e:
+            logger.error(f"返回商品列表失败: {str(e)}")
+            raise ProductException(f"返回商品列表失败: {str(e)}", e)
@@ -3,12 +3,19 @@
 """
 import time
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import Select
+from selenium.webdriver.support.select import Select
+from selenium.common.exceptions import TimeoutException
 
 from core.webdriver_utils import ElementOperations
+from core.action_timeline import action_timeline
+from core.adaptive_timeouts import adaptive_timeouts
+from core.latency_budget import latency_monitor
+from core.locator_audit import apply_locator_overrides
+from core.navigation_timing import navigation_timing
+from core.wait_engine import wait_engine
 from core.exceptions import LoginException, ProductException, CartException, CheckoutException
 from core.logger_config import logger
-from config import BASE_URL
+from config import BASE_URL, PAGE_TRANSITION_TIMEOUT
 
 class BasePage:
     """页面基类"""
@@ -19,12 +26,37 @@ class BasePage:
     
     def navigate_to(self, url):
         """导航到指定URL"""
+        start = time.perf_counter()
         try:
             self.driver.get(url)
+            elapsed = time.perf_counter() - start
+            adaptive_timeouts.record("page_load", elapsed)
+            action_timeline.record("navigate", url, elapsed)
+            navigation_timing.capture(self.driver, url.rstrip("/").rsplit("/", 1)[-1] or "index", elapsed)
             logger.info(f"导航到: {url}")
         except Exception as e:
+            elapsed = time.perf_counter() - start
+            if isinstance(e, TimeoutException):
+                adaptive_timeouts.record_timeout("page_load")
+            action_timeline.record("navigate", url, elapsed, "error")
             logger.error(f"导航失败: {str(e)}")
             raise
+    
+    def wait_for_page(self, category, action, url_part, ready_locator, start):
+        """
+        等待页面跳转完成 (URL包含url_part且就绪元素已出现)，记录从start开始的耗时并检查延迟预算
+        
+        Returns:
+            LatencyMeasurement: 测量结果
+        """
+        wait_engine.until(
+            self.driver,
+            lambda driver: url_part in driver.current_url and driver.find_elements(*ready_locator),
+            PAGE_TRANSITION_TIMEOUT, f"{action} 完成")
+        latency = time.perf_counter() - start
+        action_timeline.record(category, action, latency)
+        navigation_timing.capture(self.driver, action, latency)
+        return latency_monitor.record(category, action, latency)
 
 class LoginPage(BasePage):
     """登录页面"""
@@ -52,9 +84,21 @@ class LoginPage(BasePage):
             
             self.element_ops.safe_send_keys(username_field, username)
             self.element_ops.safe_send_keys(password_field, password)
+            latency_monitor.current_user = username
+            start = time.perf_counter()
             self.element_ops.safe_click(self.driver, login_button)
             
-            time.sleep(1)  # 等待页面跳转
+            # 等待进入商品页或出现错误提示 (如被锁定用户)，只有登录成功才计入延迟预算
+            wait_engine.until(
+                self.driver,
+                lambda driver: (("inventory" in driver.current_url and driver.find_elements(*InventoryPage.PRODUCTS))
+                                or driver.find_elements(*self.ERROR_MESSAGE)),
+                PAGE_TRANSITION_TIMEOUT, "登录完成")
+            if self.is_login_success():
+                latency = time.perf_counter() - start
+                action_timeline.record("login", username, latency)
+                navigation_timing.capture(self.driver, "login", latency)
+                latency_monitor.record("login", "login", latency, username)
             logger.info(f"用户 {username} 登录操作完成")
             
         except Exception as e:
@@ -91,6 +135,7 @@ class InventoryPage(BasePage):
     PRODUCT_DESC = (By.CLASS_NAME, "inventory_item_desc")
     PRODUCT_PRICE = (By.CLASS_NAME, "inventory_item_price")
     ADD_TO_CART_BUTTON = (By.XPATH, "//button[contains(text(),'Add to cart')]")
+    PRODUCT_ADD_BUTTON = (By.XPATH, ".//button[contains(text(),'Add to cart')]")  # 商品卡片内的添加按钮
     CART_BADGE = (By.CLASS_NAME, "shopping_cart_badge")
     CART_LINK = (By.CLASS_NAME, "shopping_cart_link")
     PRODUCT_IMAGE_LINK = (By.CSS_SELECTOR, ".inventory_item_img a")
@@ -174,9 +219,18 @@ class InventoryPage(BasePage):
             
             sort_dropdown = self.element_ops.safe_find_element(self.driver, *self.SORT_DROPDOWN)
             select = Select(sort_dropdown)
+            start = time.perf_counter()
             select.select_by_value(sort_value)
             
-            time.sleep(0.2)  # 等待排序生效
+            # 等待排序生效: 下拉框重新渲染为所选值且商品列表已出现
+            wait_engine.until(
+                self.driver,
+                lambda driver: (driver.find_element(*self.SORT_DROPDOWN).get_attribute("value") == sort_value
+                                and driver.find_elements(*self.PRODUCTS)),
+                PAGE_TRANSITION_TIMEOUT, f"排序 {sort_value} 生效")
+            latency = time.perf_counter() - start
+            action_timeline.record("sort", sort_value, latency)
+            latency_monitor.record("sort", f"sort_{sort_value}", latency)
             logger.info(f"商品排序完成: {sort_value}")
             
         except Exception as e:
@@ -201,7 +255,7 @@ class InventoryPage(BasePage):
             products = self.get_all_products()
             if index < len(products):
                 product = products[index]
-                add_button = product.find_element(By.XPATH, ".//button[contains(text(),'Add to cart')]")
+                add_button = self.element_ops.safe_find_child(product, *self.PRODUCT_ADD_BUTTON)
                 self.element_ops.safe_click(self.driver, add_button)
                 
                 time.sleep(0.3)  # 等待添加完成
@@ -236,7 +290,10 @@ class InventoryPage(BasePage):
         """获取购物车商品数量"""
         try:
             try:
-                cart_badge = self.element_ops.safe_find_element(self.driver, *self.CART_BADGE, timeout=2)
+                # 购物车为空时徽章不存在，等待时间按徽章出现的历史耗时自适应 (默认2秒)
+                timeout = self.element_ops.locator_timeout(*self.CART_BADGE, default=2)
+                cart_badge = self.element_ops.safe_find_element(self.driver, *self.CART_BADGE, timeout=timeout,
+                                                                record_timeout=False)
                 count = int(cart_badge.text)
                 logger.debug(f"购物车数量: {count}")
                 return count
@@ -254,9 +311,10 @@ class InventoryPage(BasePage):
             logger.info("进入购物车")
             
             cart_link = self.element_ops.safe_find_element(self.driver, *self.CART_LINK)
+            start = time.perf_counter()
             self.element_ops.safe_click(self.driver, cart_link)
             
-            time.sleep(0.2)  # 等待页面跳转
+            self.wait_for_page("page_transition", "go_to_cart", "cart.html", CartPage.CHECKOUT_BUTTON, start)
             logger.info("已进入购物车页面")
             
         except Exception as e:
@@ -269,9 +327,9 @@ class InventoryPage(BasePage):
             products = self.get_all_products()
             if index < len(products):
                 product = products[index]
-                name = product.find_element(*self.PRODUCT_NAME).text
-                desc = product.find_element(*self.PRODUCT_DESC).text
-                price = product.find_element(*self.PRODUCT_PRICE).text
+                name = self.element_ops.safe_find_child(product, *self.PRODUCT_NAME).text
+                desc = self.element_ops.safe_find_child(product, *self.PRODUCT_DESC).text
+                price = self.element_ops.safe_find_child(product, *self.PRODUCT_PRICE).text
                 
                 product_info = {
                     "name": name,
@@ -295,8 +353,10 @@ class InventoryPage(BasePage):
             
             image_links = self.element_ops.safe_find_elements(self.driver, *self.PRODUCT_IMAGE_LINK)
             if index < len(image_links):
+                start = time.perf_counter()
                 self.element_ops.safe_click(self.driver, image_links[index])
-                time.sleep(0.2)  # 等待页面跳转
+                self.wait_for_page("page_transition", "product_detail", "inventory-item.html",
+                                   ProductDetailPage.BACK_TO_PRODUCTS_BUTTON, start)
                 logger.info(f"已进入第 {index} 个商品详情页")
             else:
                 raise ProductException(f"商品图片索引 {index} 超出范围")
@@ -348,9 +408,10 @@ class CartPage(BasePage):
             logger.info("点击继续购物")
             
             continue_button = self.element_ops.safe_find_element(self.driver, *self.CONTINUE_SHOPPING_BUTTON)
+            start = time.perf_counter()
             self.element_ops.safe_click(self.driver, continue_button)
             
-            time.sleep(0.2)  # 等待页面跳转
+            self.wait_for_page("page_transition", "continue_shopping", "inventory.html", InventoryPage.PRODUCTS, start)
             logger.info("已返回商品页面")
             
         except Exception as e:
@@ -363,9 +424,10 @@ class CartPage(BasePage):
             logger.info("开始结账")
             
             checkout_button = self.element_ops.safe_find_element(self.driver, *self.CHECKOUT_BUTTON)
+            start = time.perf_counter()
             self.element_ops.safe_click(self.driver, checkout_button)
             
-            time.sleep(0.2)  # 等待页面跳转
+            self.wait_for_page("page_transition", "checkout", "checkout-step-one.html", CheckoutPage.FIRST_NAME_INPUT, start)
             logger.info("已进入结账页面")
             
         except Exception as e:
@@ -408,9 +470,10 @@ class CheckoutPage(BasePage):
             logger.info("继续结账")
             
             continue_button = self.element_ops.safe_find_element(self.driver, *self.CONTINUE_BUTTON)
+            start = time.perf_counter()
             self.element_ops.safe_click(self.driver, continue_button)
             
-            time.sleep(0.2)  # 等待页面跳转
+            self.wait_for_page("page_transition", "continue_checkout", "checkout-step-two.html", CheckoutPage.FINISH_BUTTON, start)
             logger.info("已进入结账确认页面")
             
         except Exception as e:
@@ -423,9 +486,10 @@ class CheckoutPage(BasePage):
             logger.info("完成结账")
             
             finish_button = self.element_ops.safe_find_element(self.driver, *self.FINISH_BUTTON)
+            start = time.perf_counter()
             self.element_ops.safe_click(self.driver, finish_button)
             
-            time.sleep(0.2)  # 等待页面跳转
+            self.wait_for_page("page_transition", "finish_checkout", "checkout-complete.html", ProductDetailPage.BACK_TO_PRODUCTS_BUTTON, start)
             logger.info("结账完成")
             
         except Exception as e:
@@ -459,11 +523,15 @@ class ProductDetailPage(BasePage):
             logger.info("返回商品列表")
             
             back_button = self.element_ops.safe_find_element(self.driver, *self.BACK_TO_PRODUCTS_BUTTON)
+            start = time.perf_counter()
             self.element_ops.safe_click(self.driver, back_button)
             
-            time.sleep(0.2)  # 等待页面跳转
+            self.wait_for_page("page_transition", "back_to_products", "inventory.html", InventoryPage.PRODUCTS, start)
             logger.info("已返回商品列表")
             
         except Exception as e:
             logger.error(f"返回商品列表失败: {str(e)}")
-            raise ProductException(f"返回商品列表失败: {str(e)}", e)
\ No newline at end of file
+            raise ProductException(f"返回商品列表失败: {str(e)}", e)
+
+# 应用定位器审计注册的更快等价定位器 (run_tests.py audit-locators --apply)
+apply_locator_overrides(globals())
@@ -1 +1 @@
-from .test_reporter import TestReporter, TestResult, test_reporter
\ No newline at end of file
+from .test_reporter import TestReporter, TestResult, ResourceSample, test_reporter
\ No newline at end of file
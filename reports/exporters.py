@@ -0,0 +1,216 @@
+"""
+测试结果导出器 - 从同一份测试结果生成多种格式的报告，供CI系统和看板直接读取
+
+内置格式:
+    excel    Excel工作簿 (TestReporter原有报告)
+    html     自包含HTML页面
+    junit    JUnit XML，CI系统 (Jenkins/GitLab/GitHub Actions) 原生支持
+    csv      CSV文本 (资源采样和页面性能计时各另存一个文件)
+    parquet  列式Parquet文件，看板/数据分析直接加载 (需要可选依赖pyarrow)
+
+所有格式的文件名都使用报告器的运行ID，同一次运行的各格式文件一一对应。
+多种格式在会话结束时并发生成。新格式继承ResultExporter并通过register_exporter注册。
+"""
+import csv
+import json
+import os
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, fields
+from typing import Dict, List
+
+from config import REPORTS_DIR
+from core.logger_config import logger
+from reports.test_reporter import TestResult, ResourceSample, NavigationTiming, strip_control_chars
+
+class ResultExporter:
+    """结果导出器基类"""
+    
+    name = ""
+    extension = ""
+    
+    def filepath(self, reporter, directory=REPORTS_DIR):
+        """导出文件路径，按运行ID命名"""
+        return os.path.join(directory, f"test_results_{reporter.run_id}.{self.extension}")
+    
+    def export(self, reporter, directory=REPORTS_DIR) -> str:
+        """
+        导出测试结果
+        
+        Returns:
+            str: 导出文件路径，失败或不可用时返回空字符串
+        """
+        try:
+            if not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+            filepath = self.write(reporter, self.filepath(reporter, directory))
+            if filepath:
+                logger.info(f"{self.name}测试结果已导出: {filepath}")
+            return filepath
+        except Exception as e:
+            logger.error(f"导出{self.name}测试结果失败: {str(e)}")
+            return ""
+    
+    def write(self, reporter, filepath) -> str:
+        raise NotImplementedError
+
+class ExcelExporter(ResultExporter):
+    """Excel工作簿 (文件名和内容沿用TestReporter)"""
+    
+    name = "excel"
+    extension = "xlsx"
+    
+    def export(self, reporter, directory=REPORTS_DIR) -> str:
+        return reporter.save_results_to_excel()
+
+class HtmlExporter(ResultExporter):
+    """自包含HTML页面 (文件名和内容沿用TestReporter)"""
+    
+    name = "html"
+    extension = "html"
+    
+    def export(self, reporter, directory=REPORTS_DIR) -> str:
+        return reporter.save_results_to_html()
+
+class JUnitXmlExporter(ResultExporter):
+    """JUnit XML - 每个测试功能一个testsuite，每个用户的用例一个testcase"""
+    
+    name = "junit"
+    extension = "xml"
+    
+    def write(self, reporter, filepath) -> str:
+        suites = {}
+        for result in reporter.test_results:
+            suites.setdefault(result.test_name, []).append(result)
+        
+        root = ET.Element("testsuites", name="saucedemo", tests=str(len(reporter.test_results)),
+                          failures=str(sum(1 for result in reporter.test_results if result.status != "PASSED")),
+                          time=f"{sum(result.duration for result in reporter.test_results):.3f}")
+        for test_name, results in suites.items():
+            suite = ET.SubElement(root, "testsuite", name=test_name, tests=str(len(results)),
+                                  failures=str(sum(1 for result in results if result.status != "PASSED")),
+                                  time=f"{sum(result.duration for result in results):.3f}",
+                                  timestamp=results[0].execution_time.replace(" ", "T"))
+            for result in results:
+                case = ET.SubElement(suite, "testcase", classname=test_name,
+                                     name=f"{test_name}[{result.username}]", time=f"{result.duration:.3f}")
+                properties = ET.SubElement(case, "properties")
+                ET.SubElement(properties, "property", name="username", value=result.username)
+                ET.SubElement(properties, "property", name="node_id", value=result.node_id)
+                for artifact, path in result.artifacts.items():
+                    ET.SubElement(properties, "property", name=f"artifact_{artifact}", value=path)
+                if result.status != "PASSED":
+                    # pytest输出中的ANSI转义等控制字符在XML 1.0中非法，CI无法解析
+                    error_message = strip_control_chars(result.error_message)
+                    failure = ET.SubElement(case, "failure", message=error_message.split("\n", 1)[0][:200])
+                    failure.text = error_message
+        
+        ET.ElementTree(root).write(filepath, encoding="utf-8", xml_declaration=True)
+        return filepath
+
+def _side_tables(reporter):
+    """随测试结果一起导出的附加表: (文件名后缀, 数据类, 记录列表)，没有记录的表跳过"""
+    tables = [("_resources", ResourceSample, reporter.resource_samples),
+              ("_navigation", NavigationTiming, reporter.navigation_timings)]
+    return [(suffix, record_type, records) for suffix, record_type, records in tables if records]
+
+def _result_row(result: TestResult) -> Dict:
+    """测试结果转换为扁平的一行 (失败现场路径序列化为JSON文本)"""
+    row = asdict(result)
+    row["artifacts"] = json.dumps(result.artifacts, ensure_ascii=False) if result.artifacts else ""
+    return row
+
+class CsvExporter(ResultExporter):
+    """CSV - 测试结果一个文件，资源采样和页面性能计时另存为 *_resources.csv / *_navigation.csv"""
+    
+    name = "csv"
+    extension = "csv"
+    
+    def write(self, reporter, filepath) -> str:
+        # utf-8-sig: Excel直接打开CSV时能正确识别中文
+        with open(filepath, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=[item.name for item in fields(TestResult)])
+            writer.writeheader()
+            writer.writerows(_result_row(result) for result in reporter.test_results)
+        
+        for suffix, record_type, records in _side_tables(reporter):
+            with open(os.path.splitext(filepath)[0] + suffix + ".csv", 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=[item.name for item in fields(record_type)])
+                writer.writeheader()
+                writer.writerows(asdict(record) for record in records)
+        return filepath
+
+class ParquetExporter(ResultExporter):
+    """Parquet - 列式存储，资源采样和页面性能计时另存为 *_resources.parquet / *_navigation.parquet"""
+    
+    name = "parquet"
+    extension = "parquet"
+    
+    def write(self, reporter, filepath) -> str:
+        # pyarrow为可选依赖，只在导出Parquet时导入，缺失时跳过
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            logger.warning("未安装pyarrow，跳过Parquet导出 (pip install pyarrow)")
+            return ""
+        
+        schema = pa.schema([
+            ("run_id", pa.string()),
+            ("test_name", pa.string()),
+            ("username", pa.string()),
+            ("status", pa.string()),
+            ("execution_time", pa.string()),
+            ("error_message", pa.string()),
+            ("description", pa.string()),
+            ("artifacts", pa.string()),
+            ("duration", pa.float64()),
+            ("node_id", pa.string()),
+        ])
+        rows = [_result_row(result) for result in reporter.test_results]
+        columns = {name: [row[name] for row in rows] for name in schema.names if name != "run_id"}
+        columns["run_id"] = [reporter.run_id] * len(rows)
+        pq.write_table(pa.table(columns, schema=schema), filepath)
+        
+        for suffix, record_type, records in _side_tables(reporter):
+            data = [asdict(record) for record in records]
+            table = pa.table({item.name: [row[item.name] for row in data] for item in fields(record_type)})
+            pq.write_table(table, os.path.splitext(filepath)[0] + suffix + ".parquet")
+        return filepath
+
+# 已注册的导出器: 格式名 -> 导出器
+EXPORTERS: Dict[str, ResultExporter] = {}
+
+def register_exporter(exporter: ResultExporter):
+    """注册导出器 (同名格式会被替换)"""
+    EXPORTERS[exporter.name] = exporter
+
+for _exporter in (ExcelExporter(), HtmlExporter(), JUnitXmlExporter(), CsvExporter(), ParquetExporter()):
+    register_exporter(_exporter)
+
+def parse_formats(value) -> List[str]:
+    """解析逗号分隔的格式列表 (如 "junit,csv")"""
+    return [item.strip().lower() for item in value.split(",") if item.strip()]
+
+def export_results(reporter, formats, directory=REPORTS_DIR) -> Dict[str, str]:
+    """
+    并发导出多种格式的测试结果
+    
+    Args:
+        reporter: TestReporter实例
+        formats: 格式名列表
+        directory: 导出目录 (excel/html沿用TestReporter的目录)
+    
+    Returns:
+        dict: 格式名 -> 导出文件路径 (失败的格式为空字符串)
+    """
+    unknown = [name for name in formats if name not in EXPORTERS]
+    if unknown:
+        logger.warning(f"未知的报告格式: {', '.join(unknown)} (可用: {', '.join(EXPORTERS)})")
+    formats = [name for name in dict.fromkeys(formats) if name in EXPORTERS]
+    if not formats:
+        return {}
+    
+    with ThreadPoolExecutor(max_workers=len(formats), thread_name_prefix="report-export") as executor:
+        futures = {name: executor.submit(EXPORTERS[name].export, reporter, directory) for name in formats}
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,202 @@
+"""
+运行历史数据库 - 使用SQLite持久化每次运行的测试结果，支持跨运行的趋势查询
+"""
+import os
+import sqlite3
+from datetime import datetime
+from typing import List, Dict
+
+from config import RUN_HISTORY_DB
+from core.logger_config import logger
+from reports.test_reporter import TestResult, NavigationTiming
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    recorded_at TEXT NOT NULL,
+    total       INTEGER NOT NULL,
+    passed      INTEGER NOT NULL,
+    failed      INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id          TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    node_id         TEXT NOT NULL,
+    test_name       TEXT NOT NULL,
+    username        TEXT NOT NULL,
+    status          TEXT NOT NULL,
+    duration        REAL NOT NULL DEFAULT 0,
+    execution_time  TEXT,
+    error_message   TEXT,
+    description     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id);
+CREATE INDEX IF NOT EXISTS idx_results_test ON results(test_name, username);
+CREATE INDEX IF NOT EXISTS idx_results_node ON results(node_id);
+CREATE INDEX IF NOT EXISTS idx_results_status ON results(status);
+CREATE INDEX IF NOT EXISTS idx_results_duration ON results(duration);
+CREATE TABLE IF NOT EXISTS navigation_timings (
+    id                      INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id                  TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    test_name               TEXT NOT NULL,
+    username                TEXT NOT NULL,
+    page                    TEXT NOT NULL,
+    kind                    TEXT NOT NULL,
+    ttfb_ms                 REAL,
+    dom_content_loaded_ms   REAL,
+    load_ms                 REAL,
+    duration_ms             REAL,
+    resource_count          INTEGER NOT NULL DEFAULT 0,
+    resource_bytes          INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_navigation_run ON navigation_timings(run_id);
+CREATE INDEX IF NOT EXISTS idx_navigation_page ON navigation_timings(page, username);
+"""
+
+class RunHistoryStore:
+    """运行历史数据库"""
+    
+    def __init__(self, db_path=RUN_HISTORY_DB):
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+    
+    def close(self):
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def record_run(self, run_id: str, results: List[TestResult], navigation_timings: List[NavigationTiming] = ()):
+        """记录一次运行的全部测试结果和页面导航计时 (同一run_id重复记录时覆盖)"""
+        passed = sum(1 for result in results if result.status == "PASSED")
+        with self.conn:
+            self.conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self.conn.execute(
+                "INSERT INTO runs (run_id, recorded_at, total, passed, failed) VALUES (?, ?, ?, ?, ?)",
+                (run_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), len(results), passed, len(results) - passed)
+            )
+            self.conn.executemany(
+                "INSERT INTO results (run_id, node_id, test_name, username, status, duration, "
+                "execution_time, error_message, description) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, result.node_id or result.test_name, result.test_name, result.username, result.status,
+                  result.duration, result.execution_time, result.error_message, result.description)
+                 for result in results]
+            )
+            self.conn.executemany(
+                "INSERT INTO navigation_timings (run_id, test_name, username, page, kind, ttfb_ms, "
+                "dom_content_loaded_ms, load_ms, duration_ms, resource_count, resource_bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, timing.test_name, timing.username, timing.page, timing.kind, timing.ttfb_ms,
+                  timing.dom_content_loaded_ms, timing.load_ms, timing.duration_ms, timing.resource_count,
+                  timing.resource_bytes)
+                 for timing in navigation_timings]
+            )
+        logger.info(f"运行历史已记录: {run_id} ({len(results)} 条结果) -> {self.db_path}")
+    
+    def recent_runs(self, limit=10) -> List[Dict]:
+        """最近的运行记录"""
+        rows = self.conn.execute(
+            "SELECT run_id, recorded_at, total, passed, failed FROM runs ORDER BY run_id DESC LIMIT ?", (limit,)
+        )
+        return [dict(row) for row in rows]
+    
+    def results_for_run(self, run_id: str) -> List[TestResult]:
+        """读取某次运行的测试结果"""
+        rows = self.conn.execute(
+            "SELECT node_id, test_name, username, status, duration, execution_time, error_message, description "
+            "FROM results WHERE run_id = ? ORDER BY id", (run_id,)
+        )
+        return [TestResult(
+            test_name=row["test_name"],
+            username=row["username"],
+            status=row["status"],
+            execution_time=row["execution_time"] or "",
+            error_message=row["error_message"] or "",
+            description=row["description"] or "",
+            duration=row["duration"],
+            node_id=row["node_id"],
+        ) for row in rows]
+    
+    def flaky_tests(self, min_runs=2, limit=20) -> List[Dict]:
+        """
+        不稳定的测试用例：在多次运行中既有通过也有失败
+        
+        flip_rate 为相邻两次运行结果发生变化的比例，越高越不稳定
+        """
+        rows = self.conn.execute("""
+            SELECT node_id, test_name, username,
+                   COUNT(*) AS runs,
+                   SUM(status = 'FAILED') AS failures,
+                   SUM(CASE WHEN previous IS NOT NULL AND previous != status THEN 1 ELSE 0 END) AS flips
+            FROM (
+                SELECT node_id, test_name, username, status,
+                       LAG(status) OVER (PARTITION BY node_id, username ORDER BY run_id) AS previous
+                FROM results
+            )
+            GROUP BY node_id, username
+            HAVING runs >= ? AND failures > 0 AND failures < runs
+            ORDER BY CAST(flips AS REAL) / (runs - 1) DESC, failures DESC
+            LIMIT ?
+        """, (min_runs, limit))
+        
+        flaky = []
+        for row in rows:
+            item = dict(row)
+            item["fail_rate"] = item["failures"] / item["runs"] * 100
+            item["flip_rate"] = item["flips"] / (item["runs"] - 1) * 100
+            flaky.append(item)
+        return flaky
+    
+    def slowest_tests(self, limit=10, last_runs=None) -> List[Dict]:
+        """平均耗时最长的测试用例，可只统计最近N次运行"""
+        run_filter = ""
+        params = []
+        if last_runs:
+            run_filter = "WHERE run_id IN (SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?)"
+            params.append(last_runs)
+        params.append(limit)
+        
+        rows = self.conn.execute(f"""
+            SELECT node_id, test_name, username,
+                   COUNT(*) AS runs,
+                   AVG(duration) AS avg_duration,
+                   MAX(duration) AS max_duration
+            FROM results
+            {run_filter}
+            GROUP BY node_id, username
+            ORDER BY avg_duration DESC
+            LIMIT ?
+        """, params)
+        return [dict(row) for row in rows]
+
+    def page_performance(self, last_runs=10) -> List[Dict]:
+        """最近N次运行中每个页面/跳转的浏览器端计时 (按运行分组，用于观察前端性能趋势)"""
+        rows = self.conn.execute("""
+            SELECT page, kind, run_id,
+                   COUNT(*) AS samples,
+                   AVG(ttfb_ms) AS avg_ttfb_ms,
+                   AVG(load_ms) AS avg_load_ms,
+                   AVG(duration_ms) AS avg_duration_ms
+            FROM navigation_timings
+            WHERE run_id IN (SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?)
+            GROUP BY page, kind, run_id
+            ORDER BY page, kind, run_id
+        """, (last_runs,))
+        return [dict(row) for row in rows]
+
+def record_run_history(reporter):
+    """将报告器中本次运行的结果写入运行历史，失败只记录日志不影响测试"""
+    try:
+        with RunHistoryStore() as store:
+            store.record_run(reporter.run_id, reporter.test_results, reporter.navigation_timings)
+    except Exception as e:
+        logger.error(f"记录运行历史失败: {str(e)}")
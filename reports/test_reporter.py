@@ -2,16 +2,27 @@
 测试报告生成器
 """
 import os
+import json
+import html
+import threading
 from datetime import datetime
-from dataclasses import dataclass
-from typing import List, Dict
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
+from dataclasses import dataclass, asdict, field
+from typing import List, Dict, Optional
 import re
 
 from core.logger_config import logger
 
+# ANSI转义序列 (pytest的彩色输出)
+ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+# Excel和XML 1.0都不允许的控制字符及非字符码位
+INVALID_CHARS = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F\uFFFE\uFFFF\ud800-\udfff]')
+
+def strip_control_chars(text) -> str:
+    """移除ANSI转义序列和Excel/XML不允许的控制字符 (不截断)"""
+    if not text:
+        return ""
+    return INVALID_CHARS.sub('', ANSI_ESCAPE.sub('', str(text)))
+
 @dataclass
 class TestResult:
     """测试结果数据类"""
@@ -21,36 +32,132 @@ class TestResult:
     execution_time: str
     error_message: str = ""
     description: str = ""
+    artifacts: Dict[str, str] = field(default_factory=dict)  # 失败现场文件: 类型 -> 路径
+    duration: float = 0.0  # 测试执行耗时(秒)
+    node_id: str = ""  # pytest节点ID (包含参数化部分)
+
+@dataclass
+class ResourceSample:
+    """资源采样数据类"""
+    timestamp: str
+    test_name: str
+    username: str
+    driver_rss_mb: Optional[float] = None
+    browser_rss_mb: Optional[float] = None
+    cpu_percent: Optional[float] = None
+    js_heap_mb: Optional[float] = None
+
+@dataclass
+class NavigationTiming:
+    """页面导航/跳转的浏览器端计时 (Navigation Timing + Resource Timing，单位毫秒)"""
+    timestamp: str
+    test_name: str
+    username: str
+    page: str  # 页面或跳转操作 (如 inventory.html / go_to_cart)
+    url: str
+    kind: str  # navigation: 整页加载 | transition: 单页应用内跳转
+    ttfb_ms: Optional[float] = None  # 首字节时间
+    dom_content_loaded_ms: Optional[float] = None
+    load_ms: Optional[float] = None
+    duration_ms: Optional[float] = None  # 测试端测得的导航/跳转耗时
+    resource_count: int = 0  # 本次导航/跳转期间加载的资源数
+    resource_bytes: int = 0
+    slowest_resource: str = ""
+    slowest_resource_ms: Optional[float] = None
+
+# 失败现场类型及其在详细结果表中的列名
+ARTIFACT_COLUMNS = [
+    ("screenshot", "失败截图"),
+    ("page_source", "页面源码"),
+    ("console_log", "控制台日志"),
+    ("timeline", "操作时间线"),
+]
 
 class TestReporter:
     """测试报告生成器"""
     
     def __init__(self):
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.test_results: List[TestResult] = []
+        self.resource_samples: List[ResourceSample] = []
+        self.navigation_timings: List[NavigationTiming] = []
+        self._journal = None
+        self._journal_path = None
+        # 失败现场路径由后台线程追加写入，与测试线程的写入互斥
+        self._journal_lock = threading.Lock()
+    
+    def start_journal(self, filepath: str):
+        """开启结果日志：每条结果产生时立即追加写入JSONL文件，运行中断也不会丢失已有结果"""
+        self._journal_path = filepath
+    
+    def close_journal(self):
+        """关闭结果日志"""
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+        self._journal_path = None
+    
+    def _write_journal(self, record_type: str, record):
+        with self._journal_lock:
+            self._write_journal_entry(record_type, record if isinstance(record, dict) else asdict(record))
+    
+    def _write_journal_entry(self, record_type: str, fields: Dict):
+        if self._journal_path and self._journal is None:
+            # 第一条结果产生时才创建日志文件
+            try:
+                directory = os.path.dirname(self._journal_path)
+                if directory and not os.path.exists(directory):
+                    os.makedirs(directory)
+                self._journal = open(self._journal_path, 'a', encoding='utf-8')
+                logger.info(f"测试结果日志: {self._journal_path}")
+            except Exception as e:
+                logger.error(f"开启结果日志失败: {str(e)}")
+                self._journal_path = None
+        if self._journal:
+            entry = {"type": record_type, "run_id": self.run_id, **fields}
+            self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._journal.flush()
     
     def add_test_result(self, result: TestResult):
         """添加测试结果"""
         self.test_results.append(result)
+        self._write_journal("result", result)
         logger.debug(f"添加测试结果: {result.test_name} - {result.username} - {result.status}")
     
+    def update_artifacts(self, result: TestResult):
+        """失败现场在后台保存完成后，把文件路径追加到结果日志 (加载时合并回对应的测试结果)"""
+        if result.artifacts:
+            self._write_journal("result_artifacts", {"node_id": result.node_id, "artifacts": result.artifacts})
+    
+    def add_resource_sample(self, sample: ResourceSample):
+        """添加资源采样"""
+        self.resource_samples.append(sample)
+        self._write_journal("resource_sample", sample)
+    
+    def add_navigation_timing(self, timing: NavigationTiming):
+        """添加页面导航计时"""
+        self.navigation_timings.append(timing)
+        self._write_journal("navigation_timing", timing)
+    
     def save_results_to_excel(self) -> str:
         """保存测试结果到Excel文件"""
+        # openpyxl导入较慢，只在生成Excel报告时导入
+        import openpyxl
         try:
             # 创建报告目录
             reports_dir = "test_reports"
             if not os.path.exists(reports_dir):
                 os.makedirs(reports_dir)
             
-            # 生成文件名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"test_results_{timestamp}.xlsx"
+            # 生成文件名 (与其他格式的报告一样按运行ID命名)
+            filename = f"test_results_{self.run_id}.xlsx"
             filepath = os.path.join(reports_dir, filename)
             
             # 创建工作簿
             wb = openpyxl.Workbook()
             
             # 创建详细结果工作表
-            self._create_detailed_results_sheet(wb)
+            self._create_detailed_results_sheet(wb, reports_dir)
             
             # 创建汇总统计工作表
             self._create_summary_sheet(wb)
@@ -58,6 +165,14 @@ class TestReporter:
             # 创建按功能分组的工作表
             self._create_function_summary_sheet(wb)
             
+            # 创建资源采样工作表
+            if self.resource_samples:
+                self._create_resource_sheet(wb)
+            
+            # 创建页面性能工作表
+            if self.navigation_timings:
+                self._create_navigation_sheet(wb)
+            
             # 删除默认工作表
             if 'Sheet' in wb.sheetnames:
                 wb.remove(wb['Sheet'])
@@ -72,13 +187,166 @@ class TestReporter:
             logger.error(f"保存Excel报告失败: {str(e)}")
             return ""
     
-    def _create_detailed_results_sheet(self, wb):
+    def save_results_to_json(self, filepath: str) -> str:
+        """保存测试结果到JSON文件 (并行worker的部分结果)"""
+        try:
+            directory = os.path.dirname(filepath)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            
+            data = {
+                "run_id": self.run_id,
+                "results": [asdict(result) for result in self.test_results],
+                "resource_samples": [asdict(sample) for sample in self.resource_samples],
+                "navigation_timings": [asdict(timing) for timing in self.navigation_timings]
+            }
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            
+            logger.info(f"测试结果已保存为JSON: {filepath}")
+            return filepath
+            
+        except Exception as e:
+            logger.error(f"保存JSON结果失败: {str(e)}")
+            return ""
+    
+    def load_results_from_json(self, filepath: str) -> int:
+        """从JSON文件加载测试结果并追加到当前结果列表，返回加载条数"""
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            # 兼容只包含测试结果列表的旧格式
+            records = data if isinstance(data, list) else data.get("results", [])
+            if isinstance(data, dict) and data.get("run_id") and not self.test_results:
+                self.run_id = data["run_id"]
+            for record in records:
+                self.add_test_result(TestResult(**record))
+            if isinstance(data, dict):
+                for record in data.get("resource_samples", []):
+                    self.add_resource_sample(ResourceSample(**record))
+                for record in data.get("navigation_timings", []):
+                    self.add_navigation_timing(NavigationTiming(**record))
+            
+            logger.info(f"从 {filepath} 加载了 {len(records)} 条测试结果")
+            return len(records)
+            
+        except Exception as e:
+            logger.error(f"加载JSON结果失败: {filepath}, 错误: {str(e)}")
+            return 0
+    
+    def load_results_from_journal(self, filepath: str) -> int:
+        """从JSONL结果日志加载测试结果，返回加载条数 (忽略运行中断时写了一半的最后一行)"""
+        count = 0
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"结果日志第 {line_no} 行不完整，已跳过")
+                        continue
+                    
+                    record_type = entry.pop("type", "result")
+                    run_id = entry.pop("run_id", None)
+                    if run_id and not self.test_results and not self.resource_samples and not self.navigation_timings:
+                        self.run_id = run_id
+                    if record_type == "result_artifacts":
+                        self._apply_artifacts(entry["node_id"], entry["artifacts"])
+                    elif record_type == "resource_sample":
+                        self.add_resource_sample(ResourceSample(**entry))
+                    elif record_type == "navigation_timing":
+                        self.add_navigation_timing(NavigationTiming(**entry))
+                    else:
+                        self.add_test_result(TestResult(**entry))
+                        count += 1
+            
+            logger.info(f"从 {filepath} 加载了 {count} 条测试结果")
+            return count
+            
+        except Exception as e:
+            logger.error(f"加载结果日志失败: {filepath}, 错误: {str(e)}")
+            return count
+    
+    def _apply_artifacts(self, node_id, artifacts):
+        """把失败现场路径合并到该用例最近的一条结果"""
+        for result in reversed(self.test_results):
+            if result.node_id == node_id:
+                result.artifacts = artifacts
+                self.update_artifacts(result)
+                return
+        logger.warning(f"结果日志中的失败现场找不到对应的测试结果: {node_id}")
+    
+    def save_results_to_html(self) -> str:
+        """保存测试结果到自包含的HTML文件"""
+        try:
+            reports_dir = "test_reports"
+            if not os.path.exists(reports_dir):
+                os.makedirs(reports_dir)
+            
+            filepath = os.path.join(reports_dir, f"test_results_{self.run_id}.html")
+            
+            summary = self.get_test_summary()
+            rows = []
+            for result in self.test_results:
+                color = "#C6EFCE" if result.status == "PASSED" else "#FFC7CE"
+                cells = [
+                    self._clean_text(result.test_name),
+                    self._clean_text(result.username),
+                    result.status,
+                    result.execution_time,
+                    self._clean_text(result.error_message),
+                    self._clean_text(result.description)
+                ]
+                row = "".join(f"<td>{html.escape(str(cell))}</td>" for cell in cells)
+                rows.append(f'<tr style="background:{color}">{row}</tr>')
+            
+            headers = ["测试功能", "用户名", "测试状态", "执行时间", "错误信息", "功能描述"]
+            content = f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>SauceDemo测试结果</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th, td {{ border: 1px solid #999; padding: 4px 8px; text-align: left; vertical-align: top; }}
+th {{ background: #366092; color: #FFFFFF; }}
+</style>
+</head>
+<body>
+<h1>测试执行汇总统计</h1>
+<p>总测试数: {summary['total']} | 通过: {summary['passed']} | 失败: {summary['failed']} | 通过率: {summary['pass_rate']:.2f}%</p>
+<p>生成时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
+<table>
+<tr>{"".join(f"<th>{header}</th>" for header in headers)}</tr>
+{chr(10).join(rows)}
+</table>
+</body>
+</html>
+"""
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(content)
+            
+            logger.info(f"HTML测试报告已保存: {filepath}")
+            return filepath
+            
+        except Exception as e:
+            logger.error(f"保存HTML报告失败: {str(e)}")
+            return ""
+    
+    def _create_detailed_results_sheet(self, wb, reports_dir="test_reports"):
         """创建详细结果工作表"""
+        from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+        from openpyxl.utils import get_column_letter
         ws = wb.active
         ws.title = "详细测试结果"
         
         # 设置表头
         headers = ["测试功能", "用户名", "测试状态", "执行时间", "错误信息", "功能描述"]
+        headers += [column_name for _, column_name in ARTIFACT_COLUMNS]
         ws.append(headers)
         
         # 设置表头样式
@@ -110,6 +378,15 @@ class TestReporter:
                 self._clean_text(result.description)
             ]
             ws.append(row_data)
+            
+            # 失败现场以超链接形式关联 (路径相对于报告文件所在目录)
+            for offset, (kind, column_name) in enumerate(ARTIFACT_COLUMNS):
+                path = result.artifacts.get(kind)
+                if path:
+                    cell = ws.cell(row=ws.max_row, column=7 + offset)
+                    cell.value = os.path.basename(path)
+                    cell.hyperlink = os.path.relpath(path, reports_dir).replace(os.sep, "/")
+                    cell.font = Font(color="0563C1", underline="single")
         
         # 设置数据行样式
         for row_num in range(2, len(self.test_results) + 2):
@@ -130,12 +407,13 @@ class TestReporter:
                 cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
         
         # 自适应列宽
-        column_widths = [25, 15, 12, 20, 40, 30]
+        column_widths = [25, 15, 12, 20, 40, 30] + [22] * len(ARTIFACT_COLUMNS)
         for col_num, width in enumerate(column_widths, 1):
             ws.column_dimensions[get_column_letter(col_num)].width = width
     
     def _create_summary_sheet(self, wb):
         """创建汇总统计工作表"""
+        from openpyxl.styles import Font, Alignment, PatternFill
         ws = wb.create_sheet("汇总统计")
         
         # 计算统计数据
@@ -209,6 +487,8 @@ class TestReporter:
     
     def _create_function_summary_sheet(self, wb):
         """创建按功能分组的工作表"""
+        from openpyxl.styles import Font, Alignment, PatternFill
+        from openpyxl.utils import get_column_letter
         ws = wb.create_sheet("功能测试统计")
         
         # 按功能分组统计
@@ -255,6 +535,92 @@ class TestReporter:
         for col_num, width in enumerate(column_widths, 1):
             ws.column_dimensions[get_column_letter(col_num)].width = width
     
+    def _create_resource_sheet(self, wb):
+        """创建资源采样工作表"""
+        from openpyxl.styles import Font, Alignment, PatternFill
+        from openpyxl.utils import get_column_letter
+        ws = wb.create_sheet("资源采样")
+        
+        headers = ["采样时间", "测试功能", "用户名", "驱动内存(MB)", "浏览器内存(MB)", "CPU(%)", "JS堆(MB)"]
+        ws.append(headers)
+        for col_num in range(1, len(headers) + 1):
+            cell = ws.cell(row=1, column=col_num)
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+        
+        for sample in self.resource_samples:
+            ws.append([
+                sample.timestamp,
+                self._clean_text(sample.test_name),
+                self._clean_text(sample.username),
+                *(round(value, 1) if value is not None else "" for value in (
+                    sample.driver_rss_mb, sample.browser_rss_mb, sample.cpu_percent, sample.js_heap_mb))
+            ])
+        
+        column_widths = [20, 30, 15, 15, 15, 10, 12]
+        for col_num, width in enumerate(column_widths, 1):
+            ws.column_dimensions[get_column_letter(col_num)].width = width
+    
+    def _create_navigation_sheet(self, wb):
+        """创建页面性能工作表 (按页面和用户汇总浏览器端计时)"""
+        from openpyxl.styles import Font, Alignment, PatternFill
+        from openpyxl.utils import get_column_letter
+        ws = wb.create_sheet("页面性能")
+        
+        headers = ["页面/跳转", "用户名", "类型", "次数", "平均TTFB(ms)", "平均DOMContentLoaded(ms)", "平均Load(ms)",
+                   "平均耗时(ms)", "最大耗时(ms)", "平均资源数", "平均资源大小(KB)", "最慢资源"]
+        ws.append(headers)
+        for col_num in range(1, len(headers) + 1):
+            cell = ws.cell(row=1, column=col_num)
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+        
+        for (page, username, kind), stats in sorted(self.get_navigation_summary().items()):
+            ws.append([
+                self._clean_text(page),
+                self._clean_text(username),
+                kind,
+                stats["count"],
+                *(round(stats[key], 1) if stats[key] is not None else "" for key in (
+                    "avg_ttfb_ms", "avg_dom_content_loaded_ms", "avg_load_ms", "avg_duration_ms", "max_duration_ms",
+                    "avg_resource_count")),
+                round(stats["avg_resource_bytes"] / 1024, 1),
+                self._clean_text(stats["slowest_resource"]),
+            ])
+        
+        column_widths = [25, 15, 12, 8, 14, 24, 14, 14, 14, 12, 16, 50]
+        for col_num, width in enumerate(column_widths, 1):
+            ws.column_dimensions[get_column_letter(col_num)].width = width
+    
+    def get_navigation_summary(self) -> Dict:
+        """按 (页面, 用户, 类型) 汇总页面导航计时: 次数、各阶段平均值、最大耗时和最慢资源"""
+        groups = {}
+        for timing in self.navigation_timings:
+            groups.setdefault((timing.page, timing.username, timing.kind), []).append(timing)
+        
+        def average(values):
+            values = [value for value in values if value is not None]
+            return sum(values) / len(values) if values else None
+        
+        summary = {}
+        for key, timings in groups.items():
+            durations = [timing.duration_ms for timing in timings if timing.duration_ms is not None]
+            slowest = max(timings, key=lambda timing: timing.slowest_resource_ms or 0)
+            summary[key] = {
+                "count": len(timings),
+                "avg_ttfb_ms": average(timing.ttfb_ms for timing in timings),
+                "avg_dom_content_loaded_ms": average(timing.dom_content_loaded_ms for timing in timings),
+                "avg_load_ms": average(timing.load_ms for timing in timings),
+                "avg_duration_ms": average(durations),
+                "max_duration_ms": max(durations) if durations else None,
+                "avg_resource_count": average(timing.resource_count for timing in timings),
+                "avg_resource_bytes": average(timing.resource_bytes for timing in timings) or 0,
+                "slowest_resource": slowest.slowest_resource,
+            }
+        return summary
+    
     def _get_user_statistics(self) -> Dict:
         """获取按用户的统计信息"""
         user_stats = {}
@@ -303,15 +669,7 @@ class TestReporter:
     
     def _clean_text(self, text: str) -> str:
         """清理文本，移除不合适的字符"""
-        if not text:
-            return ""
-        
-        # 移除ANSI转义序列
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        cleaned = ansi_escape.sub('', str(text))
-        
-        # 移除Excel不支持的控制字符
-        cleaned = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', cleaned)
+        cleaned = strip_control_chars(text)
         
         # 限制长度
         if len(cleaned) > 300:
@@ -339,6 +697,8 @@ class TestReporter:
     def clear_results(self):
         """清空测试结果"""
         self.test_results.clear()
+        self.resource_samples.clear()
+        self.navigation_timings.clear()
         logger.info("测试结果已清空")
 
 # 全局测试报告实例
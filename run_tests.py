@@ -3,7 +3,6 @@
 """
 import os
 import sys
-import pytest
 from datetime import datetime
 
 # 添加项目根目录到Python路径
@@ -12,6 +11,19 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from core.logger_config import logger
+from config import (PARALLEL_WORKERS, PARTIAL_RESULTS_DIR, ASYNC_MAX_SESSIONS, DEPENDENCY_MAP_FILE,
+                    RECORD_RUN_HISTORY, RESULTS_STORE_DIR, REPORT_FORMATS, WORKER_ID_ENV, WORKER_LOG_FILE_ENV, TRACE_DIR,
+                    BROWSER_DAEMON_STATE_FILE, CASSETTE_DIR)
+
+def _pytest_main(pytest_args):
+    """执行pytest (pytest在此时才导入，help等不运行测试的命令不需要加载)"""
+    import pytest
+    # 浏览器守护进程的会话确认可用时接管，省去浏览器启动时间 (残留的失效状态文件会被清理)
+    if os.path.exists(BROWSER_DAEMON_STATE_FILE) and "--attach-browser" not in pytest_args:
+        from core.browser_daemon import browser_daemon
+        if browser_daemon.alive():
+            pytest_args = [*pytest_args, "--attach-browser"]
+    return pytest.main(pytest_args)
 
 def run_tests():
     """运行测试套件"""
@@ -45,7 +57,7 @@ def run_tests():
         logger.info("测试模式：优化版本 - 每个功能测试所有用户，减少浏览器开关次数")
         
         # 使用pytest.main()执行测试
-        exit_code = pytest.main(pytest_args)
+        exit_code = _pytest_main(pytest_args)
         
         logger.info("=" * 80)
         if exit_code == 0:
@@ -85,6 +97,10 @@ def run_tests_with_custom_options(**kwargs):
         keywords (str): 关键字表达式过滤测试
         maxfail (int): 最大失败数，达到后停止测试
         html_report (bool): 是否生成HTML报告，默认True
+        user_contexts (bool): 是否每个用户使用独立的浏览器上下文，默认False
+        pipeline (bool): 是否用备用浏览器在后台为下一个用例登录，默认False
+        record_cassette (str): 把WebDriver请求/响应录制到该cassette文件
+        replay_cassette (str): 按该cassette文件回放，不启动浏览器
     """
     try:
         logger.info("=" * 80)
@@ -136,6 +152,20 @@ def run_tests_with_custom_options(**kwargs):
         if maxfail:
             pytest_args.extend(["--maxfail", str(maxfail)])
         
+        # 每个用户独立的浏览器上下文
+        if kwargs.get('user_contexts'):
+            pytest_args.append("--user-contexts")
+        
+        # 双浏览器流水线会话准备
+        if kwargs.get('pipeline'):
+            pytest_args.append("--pipeline")
+        
+        # WebDriver录制/回放
+        if kwargs.get('record_cassette'):
+            pytest_args.append(f"--record-cassette={kwargs['record_cassette']}")
+        if kwargs.get('replay_cassette'):
+            pytest_args.append(f"--replay-cassette={kwargs['replay_cassette']}")
+        
         # 添加其他常用选项
         pytest_args.extend([
             "--strict-markers",
@@ -145,7 +175,7 @@ def run_tests_with_custom_options(**kwargs):
         logger.info(f"执行参数: {' '.join(pytest_args)}")
         
         # 执行测试
-        exit_code = pytest.main(pytest_args)
+        exit_code = _pytest_main(pytest_args)
         
         logger.info("=" * 80)
         logger.info(f"测试执行完成，退出代码: {exit_code}")
@@ -175,7 +205,7 @@ def run_specific_test(test_name):
             "-k", test_name
         ]
         
-        exit_code = pytest.main(pytest_args)
+        exit_code = _pytest_main(pytest_args)
         return exit_code == 0
         
     except Exception as e:
@@ -200,13 +230,512 @@ def run_tests_by_marker(marker):
             "-m", marker
         ]
         
-        exit_code = pytest.main(pytest_args)
+        exit_code = _pytest_main(pytest_args)
         return exit_code == 0
         
     except Exception as e:
         logger.error(f"运行标记测试失败: {str(e)}")
         return False
 
+def run_dependency_trace():
+    """运行全部测试并追踪每个用例依赖的页面对象方法，生成依赖映射"""
+    try:
+        logger.info(f"开始依赖追踪运行，依赖映射将保存到: {DEPENDENCY_MAP_FILE}")
+        
+        pytest_args = [
+            "tests/test_saucedemo.py",
+            "-v",
+            "--tb=short",
+            "--capture=no",
+            f"--trace-deps={DEPENDENCY_MAP_FILE}"
+        ]
+        
+        exit_code = _pytest_main(pytest_args)
+        return exit_code == 0
+        
+    except Exception as e:
+        logger.error(f"依赖追踪运行失败: {str(e)}")
+        return False
+
+def run_impacted_tests(base_ref="HEAD"):
+    """
+    只运行受改动影响的测试用例
+    
+    参数:
+        base_ref (str): 对比的git基准，默认HEAD (即未提交的改动)
+    """
+    try:
+        from core.test_selector import get_git_diff, select_impacted_tests
+        
+        if not os.path.exists(DEPENDENCY_MAP_FILE):
+            logger.warning(f"依赖映射不存在: {DEPENDENCY_MAP_FILE}，请先执行 'python run_tests.py deps-trace'，本次运行全部测试")
+            return run_tests()
+        
+        selected, run_all = select_impacted_tests(DEPENDENCY_MAP_FILE, get_git_diff(base_ref))
+        if run_all:
+            return run_tests()
+        if not selected:
+            logger.info(f"相对 {base_ref} 的改动不影响任何测试用例，无需运行")
+            return True
+        
+        logger.info(f"受影响的测试用例 ({len(selected)} 个): {selected}")
+        
+        pytest_args = [
+            *selected,
+            "-v",
+            "--tb=short",
+            "--capture=no"
+        ]
+        
+        exit_code = _pytest_main(pytest_args)
+        return exit_code == 0
+        
+    except Exception as e:
+        logger.error(f"运行受影响测试失败: {str(e)}")
+        return False
+
+def collect_test_ids():
+    """收集测试用例ID列表 (pytest --collect-only)"""
+    import subprocess
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "tests/test_saucedemo.py", "--collect-only", "-q"],
+        cwd=project_root, capture_output=True, text=True
+    )
+    return [line.strip() for line in result.stdout.splitlines() if "::" in line]
+
+def split_tests_for_workers(test_ids, workers):
+    """
+    将测试用例按测试功能分组后分配给各worker
+    
+    同一测试功能的所有参数化用例分配给同一个worker，保证worker内部的
+    用户轮换顺序 (user_index) 与串行执行一致
+    """
+    groups = {}
+    for test_id in test_ids:
+        groups.setdefault(test_id.split('[')[0], []).append(test_id)
+    
+    shards = [[] for _ in range(workers)]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(shards, key=len).extend(group)
+    return [shard for shard in shards if shard]
+
+def run_tests_parallel(workers=PARALLEL_WORKERS):
+    """
+    多进程并行运行测试
+    
+    每个worker进程拥有独立的浏览器和部分结果文件，全部完成后合并生成
+    统一的Excel和HTML报告
+    
+    参数:
+        workers (int): worker进程数
+    """
+    try:
+        logger.info("=" * 80)
+        logger.info(f"开始并行执行SauceDemo自动化测试 - {workers} 个worker")
+        logger.info("=" * 80)
+        import subprocess
+        
+        test_ids = collect_test_ids()
+        if not test_ids:
+            logger.error("没有收集到测试用例")
+            return False
+        
+        shards = split_tests_for_workers(test_ids, workers)
+        
+        # 本次运行的部分结果目录，避免与历史运行混淆
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        run_dir = os.path.join(PARTIAL_RESULTS_DIR, timestamp)
+        os.makedirs(run_dir, exist_ok=True)
+        
+        processes = []
+        for worker_id, shard in enumerate(shards):
+            partial_result = os.path.join(run_dir, f"worker_{worker_id}.json")
+            output_file = os.path.join(run_dir, f"worker_{worker_id}.out")
+            pytest_args = [
+                sys.executable, "-m", "pytest", *shard,
+                "-v",
+                "--tb=short",
+                "--capture=no",
+                "--strict-markers",
+                "--disable-warnings",
+                f"--worker-id={worker_id}",
+                f"--partial-result={partial_result}",
+            ]
+            # 每个worker写独立的日志文件，日志行带worker编号和用例ID，结束后合并为统一时间线
+            env = dict(os.environ)
+            env[WORKER_ID_ENV] = f"w{worker_id}"
+            env[WORKER_LOG_FILE_ENV] = os.path.join(run_dir, f"worker_{worker_id}.log")
+            output = open(output_file, 'w', encoding='utf-8')
+            process = subprocess.Popen(pytest_args, cwd=project_root, stdout=output, stderr=subprocess.STDOUT, env=env)
+            processes.append((worker_id, process, output, partial_result))
+            logger.info(f"worker {worker_id} 已启动 (PID {process.pid})，分配 {len(shard)} 个用例，输出: {output_file}")
+        
+        exit_codes = []
+        for worker_id, process, output, _ in processes:
+            exit_code = process.wait()
+            output.close()
+            exit_codes.append(exit_code)
+            logger.info(f"worker {worker_id} 执行完成，退出代码: {exit_code}")
+        
+        from core.log_merger import merge_log_dir
+        timeline = merge_log_dir(run_dir)
+        if timeline:
+            logger.info(f"🕒 合并后的日志时间线: {timeline}")
+        
+        # 合并各worker的部分结果
+        from reports.test_reporter import TestReporter
+        merged_reporter = TestReporter()
+        for worker_id, _, _, partial_result in processes:
+            if os.path.exists(partial_result):
+                merged_reporter.load_results_from_json(partial_result)
+            else:
+                logger.warning(f"worker {worker_id} 没有生成部分结果文件: {partial_result}")
+        
+        logger.info("=" * 80)
+        if merged_reporter.test_results:
+            merged_reporter.save_results_to_json(
+                os.path.join(RESULTS_STORE_DIR, f"test_results_{merged_reporter.run_id}.json"))
+            from reports.exporters import export_results
+            exported = export_results(merged_reporter, REPORT_FORMATS + ["html"])
+            logger.info(f"测试摘要: {merged_reporter.get_test_summary()}")
+            for name, path in exported.items():
+                logger.info(f"📈 合并后的{name}报告: {path}")
+            if RECORD_RUN_HISTORY:
+                from reports.run_history import record_run_history
+                record_run_history(merged_reporter)
+        else:
+            logger.warning("没有测试结果需要合并")
+        logger.info("=" * 80)
+        
+        return all(code == 0 for code in exit_codes)
+        
+    except Exception as e:
+        logger.error(f"并行测试运行失败: {str(e)}")
+        return False
+
+def merge_worker_logs(run_dir=None):
+    """
+    合并一次并行运行中各worker的日志为统一时间线
+    
+    参数:
+        run_dir (str): 并行运行目录，默认为最近一次并行运行
+    """
+    try:
+        from core.log_merger import merge_log_dir
+        if run_dir is None:
+            run_dirs = sorted(
+                os.path.join(PARTIAL_RESULTS_DIR, name) for name in os.listdir(PARTIAL_RESULTS_DIR)
+            ) if os.path.isdir(PARTIAL_RESULTS_DIR) else []
+            if not run_dirs:
+                logger.error(f"没有找到并行运行目录: {PARTIAL_RESULTS_DIR}")
+                return False
+            run_dir = run_dirs[-1]
+        
+        timeline = merge_log_dir(run_dir)
+        if timeline:
+            logger.info(f"🕒 合并后的日志时间线: {timeline}")
+        return timeline is not None
+        
+    except Exception as e:
+        logger.error(f"合并worker日志失败: {str(e)}")
+        return False
+
+def manage_browser_daemon(action="status"):
+    """
+    管理浏览器守护进程
+    
+    参数:
+        action (str): start - 启动常驻浏览器; stop - 关闭; status - 查看状态
+    """
+    try:
+        from core.browser_daemon import browser_daemon
+        if action == "start":
+            state = browser_daemon.start()
+            logger.info(f"🌐 常驻浏览器会话: {state['session_id']} ({state['url']})")
+        elif action == "stop":
+            browser_daemon.stop()
+        elif action == "status":
+            logger.info(f"浏览器守护进程状态: {browser_daemon.status()}")
+        else:
+            logger.error(f"未知的daemon操作: {action} (可用: start/stop/status)")
+            return False
+        return True
+        
+    except Exception as e:
+        logger.error(f"浏览器守护进程操作失败: {str(e)}")
+        return False
+
+def audit_locators(apply=False):
+    """
+    在本地替身页面上基准测试页面类定位器，报告更快的等价定位器
+    
+    参数:
+        apply (bool): 是否把更快的定位器注册到覆盖文件，之后的测试运行自动使用
+    """
+    driver = None
+    try:
+        from core.webdriver_utils import WebDriverManager
+        from core.locator_audit import LocatorAuditor, save_audit_report, register_overrides
+        
+        driver = WebDriverManager.create_driver()
+        results = LocatorAuditor(driver).run()
+        report = save_audit_report(results)
+        
+        suggested = [result for result in results if result.suggestion]
+        print(f"\n定位器审计完成: 共 {len(results)} 个定位器, {len(suggested)} 个有更快的等价定位器")
+        for result in suggested:
+            print(f"  {result.name}: {result.micros:.2f}µs -> {result.suggestion.micros:.2f}µs "
+                  f"({result.suggestion.by}, {result.suggestion.value}), 每次查找节省 {result.saved_micros:.2f}µs")
+        print(f"  报告: {report}")
+        
+        if apply and suggested:
+            register_overrides(results)
+        return True
+        
+    except Exception as e:
+        logger.error(f"定位器审计失败: {str(e)}")
+        return False
+    finally:
+        if driver:
+            WebDriverManager.close_driver(driver)
+
+def export_traces(trace_file=None):
+    """
+    将二进制操作追踪导出为火焰图和时间线视图
+    
+    参数:
+        trace_file (str): 追踪文件，默认导出最近一次运行的全部追踪文件 (并行运行每个worker一个)
+    """
+    try:
+        from core.trace import export_trace
+        if trace_file:
+            trace_files = [trace_file]
+        else:
+            trace_files = sorted(
+                name for name in os.listdir(TRACE_DIR) if name.endswith(".bin")
+            ) if os.path.isdir(TRACE_DIR) else []
+            if not trace_files:
+                logger.error(f"没有找到操作追踪文件: {TRACE_DIR}")
+                return False
+            # 文件名为 trace_<run_id>_<worker>.bin，取最近一次运行的所有文件
+            latest_run = trace_files[-1].rsplit("_", 1)[0]
+            trace_files = [os.path.join(TRACE_DIR, name) for name in trace_files if name.rsplit("_", 1)[0] == latest_run]
+        
+        for path in trace_files:
+            outputs = export_trace(path)
+            logger.info(f"🔥 火焰图: {outputs['folded']}")
+            logger.info(f"🕒 时间线: {outputs['chrome']}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"导出操作追踪失败: {str(e)}")
+        return False
+
+async def _run_async_user_journey(manager, semaphore, username):
+    """单个用户的异步旅程：登录 -> 加购 -> 结账"""
+    from config import PASSWORD, FIRST_NAME, LAST_NAME, POSTAL_CODE
+    from pages.async_page_objects import AsyncLoginPage, AsyncInventoryPage, AsyncCartPage, AsyncCheckoutPage
+    
+    async with semaphore:
+        session = await manager.create_session()
+        try:
+            login_page = await AsyncLoginPage(session).open()
+            await login_page.login(username, PASSWORD)
+            if not await login_page.is_login_success():
+                raise AssertionError(f"用户 {username} 登录失败")
+            
+            inventory_page = AsyncInventoryPage(session)
+            await inventory_page.add_product_by_index(0)
+            await inventory_page.go_to_cart()
+            await AsyncCartPage(session).checkout()
+            
+            checkout_page = AsyncCheckoutPage(session)
+            await checkout_page.fill_checkout_info(FIRST_NAME, LAST_NAME, POSTAL_CODE)
+            await checkout_page.continue_checkout()
+            await checkout_page.finish_checkout()
+            
+            if "checkout-complete" not in await session.current_url():
+                raise AssertionError(f"用户 {username} 结账流程未完成")
+            logger.info(f"用户 {username} 异步旅程执行成功")
+        finally:
+            await session.quit()
+
+async def _run_async_journeys(usernames, max_sessions):
+    import asyncio
+    from core.async_webdriver import AsyncWebDriverManager
+    
+    manager = AsyncWebDriverManager()
+    await manager.start_service()
+    try:
+        semaphore = asyncio.Semaphore(max_sessions)
+        return await asyncio.gather(
+            *(_run_async_user_journey(manager, semaphore, username) for username in usernames),
+            return_exceptions=True
+        )
+    finally:
+        manager.stop_service()
+
+def run_async_journeys(max_sessions=ASYNC_MAX_SESSIONS):
+    """
+    使用异步WebDriver客户端，在一个事件循环中并发驱动所有用户的浏览器会话
+    
+    参数:
+        max_sessions (int): 同时存在的最大浏览器会话数
+    """
+    try:
+        import asyncio
+        from config import USERNAMES
+        
+        logger.info("=" * 80)
+        logger.info(f"开始异步并发执行用户旅程 - {len(USERNAMES)} 个用户，最多 {max_sessions} 个并发会话")
+        logger.info("=" * 80)
+        
+        results = asyncio.run(_run_async_journeys(USERNAMES, max_sessions))
+        
+        failures = 0
+        for username, result in zip(USERNAMES, results):
+            if isinstance(result, Exception):
+                failures += 1
+                logger.error(f"❌ 用户 {username} 旅程失败: {str(result)}")
+            else:
+                logger.info(f"✅ 用户 {username} 旅程通过")
+        
+        logger.info(f"异步执行完成: {len(USERNAMES) - failures} 通过, {failures} 失败")
+        return failures == 0
+        
+    except Exception as e:
+        logger.error(f"异步执行失败: {str(e)}")
+        return False
+
+def run_load(virtual_users=None, duration=None, target_url=None, allow_public=False):
+    """
+    负载生成模式: 虚拟用户并发执行用户旅程，报告每个步骤的吞吐量、错误率和延迟分位数
+    
+    参数:
+        virtual_users (int): 虚拟用户数，默认config.LOAD_VIRTUAL_USERS
+        duration (int): 持续时间(秒)，默认config.LOAD_DURATION
+        target_url (str): 目标地址，默认config.LOAD_TARGET_URL (本地部署)
+        allow_public (bool): 是否允许压测公共站点
+    """
+    try:
+        import asyncio
+        from core.load_generator import LoadGenerator, save_load_report, log_load_report
+        
+        options = {key: value for key, value in
+                   (("virtual_users", virtual_users), ("duration", duration), ("target_url", target_url))
+                   if value is not None}
+        generator = LoadGenerator(allow_public=allow_public, **options)
+        
+        logger.info("=" * 80)
+        report = asyncio.run(generator.run())
+        log_load_report(report)
+        logger.info(f"📊 负载报告: {save_load_report(report)}")
+        logger.info("=" * 80)
+        return report["journeys"] > 0
+        
+    except Exception as e:
+        logger.error(f"负载生成失败: {str(e)}")
+        return False
+
+def regenerate_reports(source="latest"):
+    """
+    不运行浏览器，仅根据已保存的测试结果重新生成Excel和HTML报告
+    
+    参数:
+        source (str): 结果来源 - 'latest' 最近一次保存的结果 | JSON结果文件 | JSONL结果日志 | 运行历史中的run_id
+    """
+    try:
+        from reports.test_reporter import TestReporter
+        
+        reporter = TestReporter()
+        
+        if source == "latest":
+            candidates = []
+            if os.path.isdir(RESULTS_STORE_DIR):
+                candidates = sorted(
+                    (os.path.join(RESULTS_STORE_DIR, name) for name in os.listdir(RESULTS_STORE_DIR)
+                     if name.endswith((".json", ".jsonl"))),
+                    key=os.path.getmtime
+                )
+            if not candidates:
+                logger.error(f"{RESULTS_STORE_DIR} 中没有已保存的测试结果")
+                return False
+            source = candidates[-1]
+        
+        if source.endswith(".jsonl"):
+            reporter.load_results_from_journal(source)
+        elif source.endswith(".json"):
+            reporter.load_results_from_json(source)
+        else:
+            # 按run_id从运行历史数据库读取
+            from reports.run_history import RunHistoryStore
+            with RunHistoryStore() as store:
+                for result in store.results_for_run(source):
+                    reporter.add_test_result(result)
+            reporter.run_id = source
+        
+        if not reporter.test_results:
+            logger.error(f"没有从 {source} 读取到测试结果")
+            return False
+        
+        from reports.exporters import export_results
+        exported = export_results(reporter, REPORT_FORMATS + ["html"])
+        summary = reporter.get_test_summary()
+        
+        print(f"\n运行 {reporter.run_id} 的报告已重新生成:")
+        for name, path in exported.items():
+            print(f"  {name}: {path or '导出失败'}")
+        print(f"  摘要: 总数 {summary['total']}, 通过 {summary['passed']}, 失败 {summary['failed']}, "
+              f"通过率 {summary['pass_rate']:.2f}%")
+        return all(exported.values())
+        
+    except Exception as e:
+        logger.error(f"重新生成报告失败: {str(e)}")
+        return False
+
+def show_run_history(query="runs", limit=10):
+    """
+    查询运行历史
+    
+    参数:
+        query (str): 'runs' 最近运行 | 'flaky' 不稳定用例 | 'slow' 最慢用例 | 'pages' 页面性能趋势
+        limit (int): 显示条数
+    """
+    try:
+        from reports.run_history import RunHistoryStore
+        
+        with RunHistoryStore() as store:
+            if query == "flaky":
+                rows = store.flaky_tests(limit=limit)
+                print(f"\n不稳定测试用例 (共 {len(rows)} 个):")
+                for row in rows:
+                    print(f"  {row['node_id']} [{row['username']}] - 运行 {row['runs']} 次, "
+                          f"失败率 {row['fail_rate']:.1f}%, 结果翻转率 {row['flip_rate']:.1f}%")
+            elif query == "pages":
+                rows = store.page_performance(last_runs=limit)
+                print(f"\n最近 {limit} 次运行的页面性能 (浏览器端计时):")
+                for row in rows:
+                    values = ", ".join(f"{label} {row[key]:.0f}ms" for label, key in (
+                        ("TTFB", "avg_ttfb_ms"), ("load", "avg_load_ms"), ("耗时", "avg_duration_ms"))
+                        if row[key] is not None)
+                    print(f"  {row['page']} ({row['kind']}) {row['run_id']} - {values} ({row['samples']} 次)")
+            elif query == "slow":
+                rows = store.slowest_tests(limit=limit)
+                print(f"\n最慢的 {len(rows)} 个测试用例:")
+                for row in rows:
+                    print(f"  {row['node_id']} [{row['username']}] - 平均 {row['avg_duration']:.2f}s, "
+                          f"最长 {row['max_duration']:.2f}s ({row['runs']} 次)")
+            else:
+                rows = store.recent_runs(limit=limit)
+                print(f"\n最近 {len(rows)} 次运行:")
+                for row in rows:
+                    print(f"  {row['run_id']} - 总数 {row['total']}, 通过 {row['passed']}, 失败 {row['failed']}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"查询运行历史失败: {str(e)}")
+        return False
+
 if __name__ == "__main__":
     try:
         # 检查命令行参数
@@ -222,9 +751,25 @@ if __name__ == "__main__":
                 print("  python run_tests.py cart         - 只运行购物车相关测试")
                 print("  python run_tests.py checkout     - 只运行结账相关测试")
                 print("  python run_tests.py sort         - 只运行排序相关测试")
+                print("  python run_tests.py parallel [N] - 使用N个worker进程并行运行所有测试")
+                print("  python run_tests.py async [N]    - 单进程异步并发执行所有用户旅程(最多N个会话)")
+                print("  python run_tests.py contexts     - 所有用户共用一个浏览器，各自使用独立的浏览器上下文")
+                print("  python run_tests.py pipeline     - 双浏览器流水线: 当前用例执行时备用浏览器为下一个用例登录")
+                print("  python run_tests.py record [FILE] - 运行所有测试并录制WebDriver请求/响应到cassette文件")
+                print("  python run_tests.py replay [FILE] - 不启动浏览器，按cassette回放验证页面对象改动(默认最近一次录制)")
+                print("  python run_tests.py load [N] [SECONDS] [URL] [--allow-public] - 负载模式: N个虚拟用户并发执行用户旅程，报告吞吐量/错误率/延迟分位数(默认压测本地部署，公共站点需--allow-public)")
+                print("  python run_tests.py deps-trace   - 运行全部测试并生成用例依赖映射")
+                print("  python run_tests.py impacted [REF] - 只运行受git改动影响的测试(默认对比HEAD)")
+                print("  python run_tests.py history [runs|flaky|slow|pages] - 查询运行历史(最近运行/不稳定用例/最慢用例/页面性能趋势)")
+                print("  python run_tests.py report [SOURCE] - 不运行测试，从已保存结果重新生成报告(latest/文件/run_id)")
+                print("  python run_tests.py merge-logs [DIR] - 按时间合并并行运行各worker的日志(默认最近一次并行运行)")
+                print("  python run_tests.py trace [FILE] - 将操作追踪导出为火焰图(.folded)和时间线(.trace.json)(默认最近一次)")
+                print("  python run_tests.py daemon [start|stop|status] - 管理常驻浏览器，运行中时测试命令自动接管其会话")
+                print("  python run_tests.py audit-locators [--apply] - 基准测试页面定位器，--apply注册更快的等价定位器")
                 print("\n示例:")
                 print("  python run_tests.py quick")
                 print("  python run_tests.py login")
+                print("  python run_tests.py parallel 4")
                 sys.exit(0)
             
             elif command == "quick":
@@ -250,6 +795,89 @@ if __name__ == "__main__":
                 # 只运行排序相关测试
                 success = run_specific_test("sort")
             
+            elif command == "contexts":
+                # 单浏览器多上下文，切换用户只切换窗口
+                success = run_tests_with_custom_options(user_contexts=True)
+            
+            elif command == "pipeline":
+                # 双浏览器交替执行，用户切换在后台完成
+                success = run_tests_with_custom_options(pipeline=True)
+            
+            elif command == "record":
+                # 录制WebDriver命令
+                cassette = sys.argv[2] if len(sys.argv) > 2 else os.path.join(
+                    CASSETTE_DIR, f"cassette_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+                success = run_tests_with_custom_options(record_cassette=cassette, html_report=False)
+            
+            elif command == "replay":
+                # 无浏览器回放 (默认最近一次录制)
+                if len(sys.argv) > 2:
+                    cassette = sys.argv[2]
+                else:
+                    cassettes = sorted(os.listdir(CASSETTE_DIR)) if os.path.isdir(CASSETTE_DIR) else []
+                    cassette = os.path.join(CASSETTE_DIR, cassettes[-1]) if cassettes else None
+                if cassette:
+                    success = run_tests_with_custom_options(replay_cassette=cassette, html_report=False)
+                else:
+                    logger.error(f"没有找到WebDriver录制文件: {CASSETTE_DIR}")
+                    success = False
+            
+            elif command == "parallel":
+                # 多进程并行运行，结果合并为统一报告
+                workers = int(sys.argv[2]) if len(sys.argv) > 2 else PARALLEL_WORKERS
+                success = run_tests_parallel(workers)
+            
+            elif command == "deps-trace":
+                # 追踪用例依赖，供impacted模式使用
+                success = run_dependency_trace()
+            
+            elif command == "impacted":
+                # 根据git改动只运行受影响的测试
+                base_ref = sys.argv[2] if len(sys.argv) > 2 else "HEAD"
+                success = run_impacted_tests(base_ref)
+            
+            elif command == "load":
+                # 负载生成 (压测公共站点须显式传入--allow-public)
+                args = [arg for arg in sys.argv[2:] if arg != "--allow-public"]
+                success = run_load(
+                    int(args[0]) if len(args) > 0 else None,
+                    int(args[1]) if len(args) > 1 else None,
+                    args[2] if len(args) > 2 else None,
+                    allow_public="--allow-public" in sys.argv[2:],
+                )
+            
+            elif command == "report":
+                # 离线重新生成报告
+                source = sys.argv[2] if len(sys.argv) > 2 else "latest"
+                success = regenerate_reports(source)
+            
+            elif command == "history":
+                # 查询运行历史数据库
+                query = sys.argv[2] if len(sys.argv) > 2 else "runs"
+                success = show_run_history(query)
+            
+            elif command == "merge-logs":
+                # 合并并行worker日志为统一时间线
+                success = merge_worker_logs(sys.argv[2] if len(sys.argv) > 2 else None)
+            
+            elif command == "daemon":
+                # 常驻浏览器守护进程
+                action = sys.argv[2] if len(sys.argv) > 2 else "status"
+                success = manage_browser_daemon(action)
+            
+            elif command == "audit-locators":
+                # 定位器审计
+                success = audit_locators(apply="--apply" in sys.argv[2:])
+            
+            elif command == "trace":
+                # 导出二进制操作追踪
+                success = export_traces(sys.argv[2] if len(sys.argv) > 2 else None)
+            
+            elif command == "async":
+                # 单事件循环并发驱动多个浏览器会话
+                max_sessions = int(sys.argv[2]) if len(sys.argv) > 2 else ASYNC_MAX_SESSIONS
+                success = run_async_journeys(max_sessions)
+            
             else:
                 print(f"未知命令: {command}")
                 print("使用 'python run_tests.py help' 查看可用命令")
@@ -0,0 +1,36 @@
+"""
+自适应超时测试
+"""
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import ADAPTIVE_MIN_SAMPLES, ADAPTIVE_TIMEOUT_MULTIPLIER, DEFAULT_WAIT_TIME
+from core.adaptive_timeouts import AdaptiveTimeoutManager
+
+def test_repeated_timeouts_widen_once_and_are_not_saved(tmp_path):
+    """反复超时只把超时放宽一个倍数，不会一路升到上限，超时也不作为耗时样本保存"""
+    stats_file = tmp_path / "latency_stats.json"
+    manager = AdaptiveTimeoutManager(stats_file=str(stats_file), enabled=True)
+    for _ in range(ADAPTIVE_MIN_SAMPLES):
+        manager.record("id=badge", 0.05)
+    assert manager.timeout_for("id=badge", DEFAULT_WAIT_TIME) == DEFAULT_WAIT_TIME
+    
+    for _ in range(50):
+        manager.record_timeout("id=badge")
+        timeout = manager.timeout_for("id=badge", DEFAULT_WAIT_TIME)
+    assert timeout == DEFAULT_WAIT_TIME * ADAPTIVE_TIMEOUT_MULTIPLIER
+    assert manager.percentile("id=badge") == 0.05
+    
+    manager.save()
+    reloaded = AdaptiveTimeoutManager(stats_file=str(stats_file), enabled=True)
+    assert reloaded.timeout_for("id=badge", DEFAULT_WAIT_TIME) == DEFAULT_WAIT_TIME
+
+def test_timeout_without_samples_widens_default():
+    """样本不足时以默认值为基础放宽"""
+    manager = AdaptiveTimeoutManager(stats_file="", enabled=True)
+    manager.record_timeout("click")
+    assert manager.timeout_for("click", 2) == 2 * ADAPTIVE_TIMEOUT_MULTIPLIER
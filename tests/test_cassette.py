@@ -0,0 +1,99 @@
+"""
+WebDriver录制回放测试 - 用合成的cassette驱动ReplayDriver (不需要浏览器)
+"""
+import json
+import os
+import sys
+
+import pytest
+from selenium.webdriver.common.by import By
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.cassette import CASSETTE_VERSION, CassetteMismatchException, CassettePlayer
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+LOGIN_URL = "https://www.saucedemo.com/"
+INVENTORY_URL = "https://www.saucedemo.com/inventory.html"
+
+def _interaction(command, params, value):
+    return {"command": command, "params": params, "response": {"value": value}}
+
+def _new_session():
+    return _interaction("newSession", {"capabilities": {}},
+                        {"sessionId": "s1", "capabilities": {"browserName": "MicrosoftEdge"}})
+
+def _find_elements(css, element_ids):
+    return _interaction("findElements", {"using": "css selector", "value": css},
+                        [{ELEMENT_KEY: element_id} for element_id in element_ids])
+
+def _write_cassette(tmp_path, interactions):
+    filepath = tmp_path / "cassette.json"
+    filepath.write_text(json.dumps({"version": CASSETTE_VERSION, "recorded": "2026-01-01 00:00:00",
+                                    "interactions": interactions}), encoding="utf-8")
+    return CassettePlayer(str(filepath))
+
+def test_plain_replay(tmp_path):
+    """按录制顺序回放: 会话ID取自录制，每条命令返回录制的响应"""
+    player = _write_cassette(tmp_path, [
+        _new_session(),
+        _interaction("get", {"url": LOGIN_URL}, None),
+        _interaction("findElement", {"using": "css selector", "value": '[id="user-name"]'}, {ELEMENT_KEY: "e1"}),
+        _interaction("getElementText", {"id": "e1"}, "standard_user"),
+        _interaction("getCurrentUrl", {}, INVENTORY_URL),
+    ])
+    driver = player.new_driver()
+    
+    driver.get(LOGIN_URL)
+    element = driver.find_element(By.ID, "user-name")
+    
+    assert driver.session_id == "s1"
+    assert element.id == "e1"
+    assert element.text == "standard_user"
+    assert driver.current_url == INVENTORY_URL
+    assert player.remaining == 0
+
+def test_replay_with_extra_polling_repeats_last_response(tmp_path):
+    """回放时轮询次数比录制多: 多出的请求重复上一条响应"""
+    player = _write_cassette(tmp_path, [
+        _new_session(),
+        _find_elements(".inventory_item", ["e1", "e2"]),
+        _interaction("getCurrentUrl", {}, INVENTORY_URL),
+    ])
+    driver = player.new_driver()
+    
+    for _ in range(3):
+        assert [element.id for element in driver.find_elements(By.CSS_SELECTOR, ".inventory_item")] == ["e1", "e2"]
+    
+    assert driver.current_url == INVENTORY_URL
+    assert player.remaining == 0
+
+def test_replay_with_missing_polling_repeats_skips_recorded_duplicates(tmp_path):
+    """回放时轮询次数比录制少: 跳过录制中多出的重复请求"""
+    player = _write_cassette(tmp_path, [
+        _new_session(),
+        _find_elements(".shopping_cart_badge", []),
+        _find_elements(".shopping_cart_badge", []),
+        _find_elements(".shopping_cart_badge", []),
+        _interaction("getCurrentUrl", {}, INVENTORY_URL),
+    ])
+    driver = player.new_driver()
+    
+    assert driver.find_elements(By.CSS_SELECTOR, ".shopping_cart_badge") == []
+    assert driver.current_url == INVENTORY_URL
+    assert player.remaining == 0
+
+def test_changed_page_object_raises_mismatch(tmp_path):
+    """页面对象的定位器改变后，请求与录制不一致时抛出CassetteMismatchException"""
+    player = _write_cassette(tmp_path, [
+        _new_session(),
+        _interaction("get", {"url": LOGIN_URL}, None),
+        _interaction("findElement", {"using": "css selector", "value": '[id="user-name"]'}, {ELEMENT_KEY: "e1"}),
+    ])
+    driver = player.new_driver()
+    driver.get(LOGIN_URL)
+    
+    with pytest.raises(CassetteMismatchException, match="username"):
+        driver.find_element(By.ID, "username")
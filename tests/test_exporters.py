@@ -0,0 +1,31 @@
+"""
+结果导出器测试
+"""
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from reports.exporters import JUnitXmlExporter
+from reports.test_reporter import TestReporter, TestResult
+
+def test_junit_xml_strips_control_characters(tmp_path):
+    """失败信息中的ANSI转义和控制字符被移除，生成的JUnit XML可以被解析"""
+    reporter = TestReporter()
+    reporter.test_results.append(TestResult(
+        test_name="test_01_login_success",
+        username="standard_user",
+        status="FAILED",
+        execution_time="2024-01-01 12:00:00",
+        error_message="\x1b[31mAssertionError\x1b[0m: 登录失败\x00\x08\n  assert False",
+        node_id="tests/test_saucedemo.py::TestSauceDemo::test_01_login_success[0]",
+    ))
+    
+    filepath = JUnitXmlExporter().write(reporter, str(tmp_path / "results.xml"))
+    
+    failure = ET.parse(filepath).getroot().find("./testsuite/testcase/failure")
+    assert failure.get("message") == "AssertionError: 登录失败"
+    assert failure.text == "AssertionError: 登录失败\n  assert False"
@@ -0,0 +1,33 @@
+"""
+负载生成测试 - 步骤统计和压测目标检查 (不启动浏览器)
+"""
+import os
+import sys
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.exceptions import TestException
+from core.load_generator import LoadGenerator, StepStats
+
+def test_step_percentiles_use_nearest_rank():
+    """分位数按最近秩法取实际样本，没有样本时为None"""
+    stats = StepStats("login", latencies=[float(value) for value in range(100, 0, -1)], errors=25)
+    
+    assert [stats.percentile(p) for p in (50, 90, 95, 99, 100)] == [50.0, 90.0, 95.0, 99.0, 100.0]
+    assert StepStats("logout").percentile(99) is None
+    
+    summary = stats.summary(elapsed=50)
+    assert (summary["count"], summary["error_rate"], summary["throughput"]) == (100, 20.0, 2.0)
+    assert (summary["p50"], summary["max"]) == (50.0, 100.0)
+
+def test_public_target_requires_explicit_flag():
+    """默认不允许压测公共站点"""
+    with pytest.raises(TestException):
+        LoadGenerator(target_url="https://www.saucedemo.com/")
+    
+    assert LoadGenerator(target_url="https://www.saucedemo.com", allow_public=True).target_url == "https://www.saucedemo.com/"
+    assert LoadGenerator(target_url="http://localhost:3000").target_url == "http://localhost:3000/"
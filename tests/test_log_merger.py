@@ -0,0 +1,24 @@
+"""
+日志合并测试
+"""
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.log_merger import merge_logs
+
+def test_equal_timestamps_keep_worker_order(tmp_path):
+    """时间戳相同的记录按worker文件顺序排列，而不是按消息文本排序"""
+    worker_0 = tmp_path / "worker_0.log"
+    worker_1 = tmp_path / "worker_1.log"
+    worker_0.write_text("2024-01-01 12:00:00,000 - root - INFO - [0|-] - zzz from worker 0\n", encoding="utf-8")
+    worker_1.write_text("2024-01-01 12:00:00,000 - root - INFO - [1|-] - aaa from worker 1\n", encoding="utf-8")
+    output = tmp_path / "merged.log"
+    
+    assert merge_logs([str(worker_0), str(worker_1)], str(output)) == 2
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert "worker 0" in lines[0]
+    assert "worker 1" in lines[1]
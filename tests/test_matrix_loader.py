@@ -0,0 +1,54 @@
+"""
+测试矩阵加载测试 - CSV/JSONL解析、默认值和用例ID
+"""
+import os
+import sys
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import FIRST_NAME, POSTAL_CODE
+from core.exceptions import TestException
+from core.test_matrix import TestMatrix
+
+JSONL_DATA = """# 注释行
+{"case_id": "standard_multi_lohi", "username": "standard_user", "products": [0, 1, 2], "first_name": "Alice", "postal_code": 200000, "sort_option": "lohi"}
+
+{"username": "visual_user"}
+"""
+
+CSV_DATA = """case_id,username,products,first_name,last_name,postal_code,sort_option
+standard_multi_lohi,standard_user,0;1;2,Alice,,200000,lohi
+,visual_user,,,,,
+"""
+
+@pytest.mark.parametrize("filename, content", [("matrix.jsonl", JSONL_DATA), ("matrix.csv", CSV_DATA)])
+def test_parses_records_and_uses_case_ids(tmp_path, filename, content):
+    """两种格式解析出相同的数据，用例ID取自case_id，缺失时按序号生成"""
+    filepath = tmp_path / filename
+    filepath.write_text(content, encoding="utf-8")
+    
+    matrix = TestMatrix(str(filepath))
+    
+    assert len(matrix) == 2
+    assert matrix.ids() == ["standard_multi_lohi", "case1"]
+    first, second = list(matrix)
+    assert (first.username, first.products, first.first_name) == ("standard_user", [0, 1, 2], "Alice")
+    assert (first.postal_code, first.sort_option) == ("200000", "lohi")
+    assert (second.case_id, second.username, second.products) == ("case1", "visual_user", [])
+    assert (second.first_name, second.postal_code, second.sort_option) == (FIRST_NAME, POSTAL_CODE, "az")
+    assert matrix.load(1) == second
+
+def test_invalid_line_fails_when_loaded(tmp_path):
+    """无法解析的数据行在收集时使用序号作为ID，执行时读取才报错"""
+    filepath = tmp_path / "matrix.jsonl"
+    filepath.write_text('{"case_id": "ok", "username": "standard_user"}\n{not json\n', encoding="utf-8")
+    
+    matrix = TestMatrix(str(filepath))
+    
+    assert matrix.ids() == ["ok", "case1"]
+    with pytest.raises(TestException):
+        matrix.load(1)
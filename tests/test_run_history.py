@@ -0,0 +1,64 @@
+"""
+运行历史测试 - 在内存数据库中记录多次运行，检查不稳定用例和最慢用例的查询结果 (不需要浏览器)
+"""
+import os
+import sys
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from reports.run_history import RunHistoryStore
+from reports.test_reporter import TestResult as RecordedResult  # 避免pytest将TestResult当作测试类收集
+
+RUN_IDS = ["20260101_090000", "20260102_090000", "20260103_090000", "20260104_090000"]
+
+# (用例, 用户) -> 每次运行的 (状态, 耗时)
+HISTORY = {
+    ("test_login", "standard_user"): [("PASSED", 1.0), ("FAILED", 1.0), ("PASSED", 1.0), ("FAILED", 1.0)],
+    ("test_login", "problem_user"): [("FAILED", 2.0), ("PASSED", 2.0), ("PASSED", 2.0), ("PASSED", 2.0)],
+    ("test_cart", "standard_user"): [("PASSED", 2.0), ("PASSED", 2.0), ("FAILED", 3.0), ("FAILED", 7.0)],
+    ("test_sort", "standard_user"): [("PASSED", 5.0), ("PASSED", 5.0), ("PASSED", 5.0), ("PASSED", 5.0)],
+    ("test_logout", "problem_user"): [("FAILED", 0.5), ("FAILED", 0.5), ("FAILED", 0.5), ("FAILED", 0.5)],
+}
+
+@pytest.fixture
+def store():
+    with RunHistoryStore(":memory:") as store:
+        for index, run_id in enumerate(RUN_IDS):
+            store.record_run(run_id, [
+                RecordedResult(test_name=test_name, username=username, status=runs[index][0],
+                               execution_time="", duration=runs[index][1],
+                               node_id=f"tests/test_saucedemo.py::{test_name}[{username}]")
+                for (test_name, username), runs in HISTORY.items()
+            ])
+        yield store
+
+def test_flaky_tests_orders_by_flip_rate(store):
+    """只返回既有通过又有失败的用例，按结果翻转比例排序，翻转比例相同时失败次数多的在前"""
+    flaky = store.flaky_tests(min_runs=3)
+    
+    assert [(item["test_name"], item["username"]) for item in flaky] == [
+        ("test_login", "standard_user"),
+        ("test_cart", "standard_user"),
+        ("test_login", "problem_user"),
+    ]
+    assert [(item["runs"], item["failures"], item["flips"]) for item in flaky] == [(4, 2, 3), (4, 2, 1), (4, 1, 1)]
+    assert flaky[0]["fail_rate"] == 50
+    assert flaky[0]["flip_rate"] == 100
+    assert store.flaky_tests(min_runs=5) == []
+
+def test_slowest_tests_over_all_and_recent_runs(store):
+    """按平均耗时排序，last_runs只统计最近N次运行"""
+    slowest = store.slowest_tests(limit=2)
+    
+    assert [(item["test_name"], item["avg_duration"], item["max_duration"]) for item in slowest] == [
+        ("test_sort", 5.0, 5.0),
+        ("test_cart", 3.5, 7.0),
+    ]
+    
+    recent = store.slowest_tests(limit=1, last_runs=1)
+    
+    assert [(item["test_name"], item["runs"], item["avg_duration"]) for item in recent] == [("test_cart", 1, 7.0)]
@@ -12,9 +12,10 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 try:
-    from config import USERNAMES, PASSWORD, FIRST_NAME, LAST_NAME, POSTAL_CODE
+    from config import USERNAMES, PASSWORD, FIRST_NAME, LAST_NAME, POSTAL_CODE, SORT_OPTIONS
     from pages.page_objects import LoginPage, InventoryPage, CartPage, CheckoutPage, ProductDetailPage
     from core.exceptions import TestException
+    from core.latency_budget import latency_monitor
     from core.logger_config import logger
 except ImportError as e:
     print(f"导入模块失败: {e}")
@@ -521,6 +522,72 @@ class TestSauceDemo:
             logger.error(f"测试意外失败: {str(e)}")
             pytest.fail(f"测试意外失败: {str(e)}")
     
+    # 18. 数据驱动的排序、加购与结账流程
+    def test_18_matrix_checkout_flow(self, user_session, matrix_case):
+        """测试矩阵数据驱动的排序、加购和结账流程"""
+        try:
+            driver = user_session['driver']
+            username = user_session['username']
+            
+            inventory_page = InventoryPage(driver)
+            self._reset_to_inventory_page(driver)
+            
+            inventory_page.sort_products(matrix_case.sort_option)
+            for index in matrix_case.products:
+                inventory_page.add_product_by_index(index)
+            cart_count = inventory_page.get_cart_count()
+            assert cart_count == len(matrix_case.products), f"购物车数量不正确，期望{len(matrix_case.products)}，实际{cart_count}"
+            
+            inventory_page.go_to_cart()
+            cart_page = CartPage(driver)
+            cart_page.checkout()
+            
+            checkout_page = CheckoutPage(driver)
+            checkout_page.fill_checkout_info(matrix_case.first_name, matrix_case.last_name, matrix_case.postal_code)
+            checkout_page.continue_checkout()
+            checkout_page.finish_checkout()
+            
+            assert "checkout-complete" in driver.current_url, "结账流程未完成"
+            logger.info(f"用户 {username} 数据用例 {matrix_case.case_id} 执行成功")
+        
+        except TestException as e:
+            pytest.fail(f"测试执行失败: {str(e)}")
+        except Exception as e:
+            logger.error(f"测试意外失败: {str(e)}")
+            pytest.fail(f"测试意外失败: {str(e)}")
+    
+    # 19. 页面跳转和排序的延迟预算
+    @pytest.mark.parametrize("user_count", range(len(USERNAMES)))
+    def test_19_latency_budgets(self, user_session, user_count):
+        """测试页面跳转和排序耗时不超过用户的延迟预算"""
+        try:
+            driver = user_session['driver']
+            username = user_session['username']
+            
+            inventory_page = InventoryPage(driver)
+            self._reset_to_inventory_page(driver)
+            mark = latency_monitor.mark()
+            
+            for sort_option in SORT_OPTIONS:
+                inventory_page.sort_products(sort_option)
+            
+            inventory_page.go_to_cart()
+            CartPage(driver).continue_shopping()
+            inventory_page.click_product_image(0)
+            ProductDetailPage(driver).back_to_products()
+            
+            measurements = latency_monitor.since(mark)
+            assert len(measurements) == len(SORT_OPTIONS) + 4, f"延迟测量数量不正确: {len(measurements)}"
+            latency_monitor.assert_within_budget(mark)
+            logger.info(f"用户 {username} 延迟预算验证成功: "
+                        + ", ".join(f"{m.action}={m.latency:.2f}s" for m in measurements))
+        
+        except TestException as e:
+            pytest.fail(f"测试执行失败: {str(e)}")
+        except Exception as e:
+            logger.error(f"测试意外失败: {str(e)}")
+            pytest.fail(f"测试意外失败: {str(e)}")
+    
     def _reset_to_inventory_page(self, driver):
         """重置到商品页面，确保测试环境一致"""
         try:
@@ -0,0 +1,85 @@
+"""
+会话上下文测试 - 两个线程同时执行用例时各自的会话状态互不干扰 (不需要浏览器)
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core import watchdog
+from core.action_timeline import action_timeline
+from core.session_context import session_contexts
+from core.watchdog import TestWatchdog
+
+def test_two_contexts_on_two_threads_stay_separate(monkeypatch):
+    """一个线程的用例卡住被看门狗终止，另一个线程的上下文、时间线、资源计数和回收状态不受影响"""
+    monkeypatch.setitem(watchdog.TEST_TIME_BUDGETS, "test_hang", 0.2)
+    test_watchdog = TestWatchdog(poll_interval=0.05)
+    # 用一个真实的子进程充当卡住的驱动进程，看门狗超时后将其结束
+    hung_process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    both_running = threading.Barrier(2)
+    results = {}
+    
+    def run(name, test_name, test_count, driver):
+        context = session_contexts.open(name)
+        try:
+            context.bind_driver(driver)
+            context.current_user = f"{name}_user"
+            context.begin_test(test_name)
+            action_timeline.clear()
+            test_watchdog.arm(context, f"{name}::{test_name}", test_name)
+            both_running.wait()
+            for index in range(test_count):
+                action_timeline.record("click", f"{name}-{index}", 0.01)
+                context.resources.sample(driver, test_name, context.current_user)
+                context.finish_test()
+            time.sleep(0.5)
+            test_watchdog.disarm(context)
+            results[name] = {
+                "context": session_contexts.current(),
+                "current_user": context.current_user,
+                "user_index": context.user_index,
+                "tests_since_recycle": context.resources.tests_since_recycle,
+                "pipeline": context.pipeline,
+                "timeline": [record["locator"] for record in action_timeline.snapshot()],
+                "recycle_reason": test_watchdog.take_recycle_reason(context),
+            }
+        finally:
+            session_contexts.close(context)
+    
+    threads = [
+        threading.Thread(target=run, args=("hung", "test_hang", 2,
+                                           SimpleNamespace(service=SimpleNamespace(process=hung_process)))),
+        threading.Thread(target=run, args=("healthy", "test_fast", 3,
+                                           SimpleNamespace(service=SimpleNamespace(process=None)))),
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+    finally:
+        if hung_process.poll() is None:
+            hung_process.kill()
+        hung_process.wait()
+    
+    hung, healthy = results["hung"], results["healthy"]
+    assert hung["context"] is not healthy["context"]
+    assert hung["pipeline"] is not healthy["pipeline"]
+    assert (hung["current_user"], healthy["current_user"]) == ("hung_user", "healthy_user")
+    assert (hung["user_index"], healthy["user_index"]) == (2, 3)
+    assert (hung["tests_since_recycle"], healthy["tests_since_recycle"]) == (2, 3)
+    assert hung["timeline"] == ["hung-0", "hung-1"]
+    assert healthy["timeline"] == ["healthy-0", "healthy-1", "healthy-2"]
+    
+    # 只有卡住的上下文被终止并需要重建浏览器
+    assert [event.node_id for event in test_watchdog.events] == ["hung::test_hang"]
+    assert "hung::test_hang" in hung["recycle_reason"]
+    assert healthy["recycle_reason"] is None
+    assert hung_process.returncode is not None
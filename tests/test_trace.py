@@ -0,0 +1,45 @@
+"""
+操作追踪测试 - TraceWriter写入的事件可由read_trace原样读回 (不需要浏览器)
+"""
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.logger_config import log_context
+from core.trace import TraceEvent, TraceWriter, read_trace
+
+def _write_events(filepath, monkeypatch):
+    monkeypatch.setattr(log_context, "worker_id", "gw1")
+    monkeypatch.setattr(log_context, "test_id", "test_login")
+    writer = TraceWriter()
+    writer.start(str(filepath))
+    writer.event("click", "#login-button", 0.25, "ok", 100.5)
+    writer.event("find", "css=.inventory_item;nth=2", 1.5, "timeout", 102.0)
+    monkeypatch.setattr(log_context, "test_id", "test_购物车")
+    writer.event("click", "#login-button", 0.125, "ok", 103.0)
+    writer.close()
+
+def test_read_trace_round_trip(tmp_path, monkeypatch):
+    """写入的事件按顺序读回，重复的字符串只写入一次但能正确还原"""
+    filepath = tmp_path / "trace.bin"
+    _write_events(filepath, monkeypatch)
+    
+    assert list(read_trace(str(filepath))) == [
+        TraceEvent(100.25, 0.25, "gw1", "test_login", "click", "#login-button", "ok"),
+        TraceEvent(100.5, 1.5, "gw1", "test_login", "find", "css=.inventory_item;nth=2", "timeout"),
+        TraceEvent(102.875, 0.125, "gw1", "test_购物车", "click", "#login-button", "ok"),
+    ]
+
+def test_read_trace_ignores_truncated_tail(tmp_path, monkeypatch):
+    """进程中途退出时末尾不完整的记录被忽略，之前的事件仍可读取"""
+    filepath = tmp_path / "trace.bin"
+    _write_events(filepath, monkeypatch)
+    with open(filepath, 'rb+') as f:
+        f.truncate(os.path.getsize(filepath) - 3)
+    
+    events = list(read_trace(str(filepath)))
+    
+    assert [(event.test_id, event.action) for event in events] == [("test_login", "click"), ("test_login", "find")]
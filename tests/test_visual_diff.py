@@ -0,0 +1,91 @@
+"""
+视觉对比测试 - 用合成的像素数组检查区块哈希和截图对比 (不需要浏览器，未安装numpy/Pillow时跳过)
+"""
+import io
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core import visual_diff
+from core.visual_diff import VisualComparator, tile_hashes
+
+TILE = 32
+
+def _page(height=96, width=128):
+    """红色按列、蓝色按行渐变的合成页面"""
+    pixels = np.zeros((height, width, 3), dtype=np.uint8)
+    pixels[..., 0] = (np.arange(width) * 255 // width)[None, :]
+    pixels[..., 2] = (np.arange(height) * 255 // height)[:, None]
+    return pixels
+
+def _with_patch(pixels):
+    """在第一个区块内画一个10x10的白色方块"""
+    changed = pixels.copy()
+    changed[10:20, 10:20] = (255, 255, 255)
+    return changed
+
+def _png(pixels):
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def _comparator(tmp_path):
+    return VisualComparator(baseline_dir=str(tmp_path / "baselines"), diff_dir=str(tmp_path / "diff"),
+                            baseline_user="standard_user", tile=TILE, tolerance=16, max_diff_ratio=0.001)
+
+def test_tile_hashes_change_only_for_modified_tile():
+    """不足一块的边缘补齐后计入块数，修改只影响所在区块的哈希"""
+    pixels = _page(height=100, width=150)
+    
+    hashes = tile_hashes(pixels, TILE)
+    changed = np.any(tile_hashes(_with_patch(pixels), TILE) != hashes, axis=2)
+    
+    assert hashes.shape == (4, 5, 11)
+    assert np.array_equal(tile_hashes(pixels.copy(), TILE), hashes)
+    assert changed.sum() == 1 and changed[0, 0]
+
+def test_compare_against_baseline(tmp_path):
+    """基准用户生成基准图，相同截图通过，区块内的差异超过阈值时判定为回归并保存差异图"""
+    comparator = _comparator(tmp_path)
+    baseline_png = _png(_page())
+    
+    assert comparator.compare("inventory", baseline_png, "visual_user").note.startswith("尚无基准图")
+    assert comparator.compare("inventory", baseline_png, "standard_user").note == "已生成基准图"
+    
+    # 新的对比器从磁盘读取基准图，并缓存块哈希
+    comparator = _comparator(tmp_path)
+    same = comparator.compare("inventory", baseline_png, "visual_user")
+    
+    assert same.passed and same.changed_tiles == 0 and same.total_tiles == 12
+    assert os.path.exists(tmp_path / "baselines" / "inventory.hashes.npz")
+    
+    regressed = comparator.compare("inventory", _png(_with_patch(_page())), "visual_user")
+    
+    assert not regressed.passed
+    assert (regressed.changed_tiles, regressed.diff_pixels) == (1, 100)
+    assert regressed.diff_ratio == pytest.approx(100 / (96 * 128))
+    assert os.path.exists(regressed.diff_image)
+    
+    resized = comparator.compare("inventory", _png(_page(width=160)), "visual_user")
+    
+    assert not resized.passed and "不一致" in resized.note
+
+def test_compare_skips_ignored_regions(tmp_path, monkeypatch):
+    """忽略区域内的像素差异不计入，区块哈希变化但对比通过"""
+    monkeypatch.setitem(visual_diff.VISUAL_IGNORE_REGIONS, "inventory", [(10, 10, 10, 10)])
+    comparator = _comparator(tmp_path)
+    comparator.compare("inventory", _png(_page()), "standard_user")
+    
+    result = comparator.compare("inventory", _png(_with_patch(_page())), "visual_user")
+    
+    assert result.passed
+    assert (result.changed_tiles, result.diff_pixels) == (1, 0)
+    assert result.diff_image is None